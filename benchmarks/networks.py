@@ -0,0 +1,55 @@
+# networks.py
+import math
+import numpy as np
+
+# stop and line counts from the example network up to a metropolitan one
+SIZES = {
+    "example": (15, 7),
+    "small": (100, 12),
+    "medium": (1000, 60),
+    "large": (5000, 250),
+}
+
+def synthetic_network(n_stops, n_lines, seed=0, canvas=(700, 650), line_length=(6, 25), departures=3):
+    '''grid street network with random non-self-crossing bus lines, as SimulationConfig(**topology) input'''
+    rng = np.random.default_rng(seed)
+    cols = math.ceil(math.sqrt(n_stops))
+    rows = math.ceil(n_stops / cols)
+    names = [f"S{i}" for i in range(n_stops)]
+    dx = canvas[0] / max(cols, 1)
+    dy = canvas[1] / max(rows, 1)
+    stop_locations = {name: ((i % cols + 0.5) * dx, (i // cols + 0.5) * dy) for i, name in enumerate(names)}
+
+    # each stop connects to its right and lower neighbour
+    neighbours = [[] for _ in range(n_stops)]
+    connections = []
+    for i in range(n_stops):
+        for j in (i + 1 if (i + 1) % cols else None, i + cols):
+            if j is None or j >= n_stops:
+                continue
+            connections.append((names[i], names[j], int(rng.integers(2, 7)), bool(rng.random() < 0.2)))
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+
+    bus_lines = []
+    for k in range(n_lines):
+        length = int(rng.integers(line_length[0], line_length[1] + 1))
+        path = [int(rng.integers(n_stops))]
+        visited = {path[0]}
+        while len(path) < length:
+            options = [j for j in neighbours[path[-1]] if j not in visited]
+            if not options:
+                break
+            path.append(int(rng.choice(options)))
+            visited.add(path[-1])
+        if len(path) < 2:
+            continue
+        starts = sorted(int(m) for m in rng.choice(np.arange(0, 600, 5), size=departures, replace=False))
+        bus_lines.append({
+            "name": f"L{k}",
+            "stops": [names[i] for i in path],
+            "schedule": [f"{m // 60:02d}:{m % 60:02d}" for m in starts],
+            "wait_time": int(rng.integers(2, 6)),
+            "capacity": int(rng.integers(25, 61)),
+        })
+    return {"stop_locations": stop_locations, "connections": connections, "bus_lines": bus_lines}
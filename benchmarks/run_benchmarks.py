@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from benchmarks.networks import SIZES, synthetic_network
+from src.transport_analytics.config import SimulationConfig
+from src.transport_analytics.models import TransportNet
+from src.transport_analytics.visualization import RealTimeMetrics
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RATES = ("events_per_s", "passengers_per_s", "ops_per_s")
+
+
+class EventCounter:
+    """Counts the simpy events an environment processes"""
+
+    def __init__(self, env):
+        self.count = 0
+        step = env.step
+
+        def counted_step():
+            self.count += 1
+            step()
+
+        env.step = counted_step
+
+
+def build_network(size, seed):
+    n_stops, n_lines = SIZES[size]
+    config = SimulationConfig(**synthetic_network(n_stops, n_lines, seed))
+    config.seed = seed
+    config.visualize = False
+    config.save_reports = False
+    config.status_output = "silent"
+
+    start = time.perf_counter()
+    tn = TransportNet(config)
+    tn.setup_transport_network()
+    return tn, time.perf_counter() - start
+
+
+def rate(count, seconds):
+    return count / seconds if seconds > 0 else None
+
+
+def bench_simulation(tn, duration, ops):
+    """Full headless run: vehicle movement, boarding and passenger generation"""
+    counter = EventCounter(tn.env)
+    start = time.perf_counter()
+    tn.run_batch(until=duration)
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": wall,
+        "events": counter.count,
+        "events_per_s": rate(counter.count, wall),
+        "passengers": tn.next_passenger_id,
+        "passengers_per_s": rate(tn.next_passenger_id, wall),
+        "completed_trips": len(tn.passengers.completed_rows()),
+    }
+
+
+def bench_passenger_creation(tn, duration, ops):
+    """Batched passenger spawning, including itinerary planning"""
+    tn.start_processes()
+    batch = 100
+    origins, destinations = tn.od_sampler.sample(tn.rng.od, batch * ops)
+    start = time.perf_counter()
+    for i in range(0, len(origins), batch):
+        tn.spawn_passengers(origins[i:i + batch], destinations[i:i + batch])
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": wall,
+        "passengers": len(origins),
+        "passengers_per_s": rate(len(origins), wall),
+    }
+
+
+def bench_metrics_update(tn, duration, ops):
+    """RealTimeMetrics.update_metrics on a network warmed up for the run duration"""
+    metrics = RealTimeMetrics(tn)
+    tn.run_batch(until=duration)
+    start = time.perf_counter()
+    for _ in range(ops):
+        metrics.update_metrics()
+    wall = time.perf_counter() - start
+    return {"wall_s": wall, "ops": ops, "ops_per_s": rate(ops, wall)}
+
+
+def bench_report_status(tn, duration, ops):
+    """One silent status report snapshot per op on a warmed up network"""
+    tn.run_batch(until=duration)
+    start = time.perf_counter()
+    for _ in range(ops):
+        tn.snapshots.take()
+    wall = time.perf_counter() - start
+    return {"wall_s": wall, "ops": ops, "ops_per_s": rate(ops, wall)}
+
+
+CASES = {
+    "simulation": bench_simulation,
+    "passenger_creation": bench_passenger_creation,
+    "metrics_update": bench_metrics_update,
+    "report_status": bench_report_status,
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, size, seed, duration, ops):
+    tn, setup = build_network(size, seed)
+    result = {
+        "case": case,
+        "size": size,
+        "stops": SIZES[size][0],
+        "lines": SIZES[size][1],
+        "seed": seed,
+        "duration": duration,
+        "setup_s": setup,
+    }
+    result.update(CASES[case](tn, duration, ops))
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_isolated(case, size, seed, duration, ops):
+    """Run one case in a fresh process so peak RSS belongs to that case alone"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(run_case, case, size, seed, duration, ops).result()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the rate ratios against an earlier results file, >1 is faster"""
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+
+    print(f"\n{'case':<20} {'size':<8} {'metric':<18} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for result in results:
+        old = baseline.get((result["case"], result["size"]))
+        if old is None:
+            continue
+        for metric in RATES:
+            if result.get(metric) and old.get(metric):
+                print(f"{result['case']:<20} {result['size']:<8} {metric:<18} "
+                      f"{old[metric]:>12.1f} {result[metric]:>12.1f} {result[metric] / old[metric]:>7.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths")
+    parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=["example", "small", "medium"],
+        help="synthetic network sizes to run (large has 5000 stops and takes minutes)"
+    )
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duration", type=int, default=600, help="simulated minutes per run, from midnight")
+    parser.add_argument("--ops", type=int, default=200, help="repetitions for the per-call cases")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for size in args.sizes:
+        for case in args.cases:
+            result = run_isolated(case, size, args.seed, args.duration, args.ops)
+            results.append(result)
+            rates = ", ".join(f"{m}={result[m]:.1f}" for m in RATES if result.get(m))
+            print(f"{case:<20} {size:<8} setup {result['setup_s']:.2f}s, run {result['wall_s']:.2f}s, {rates}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump({
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=4)
+    print(f"Results saved to: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
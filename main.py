@@ -2,9 +2,13 @@ from src.transport_analytics.models import TransportNet
 from src.transport_analytics.visualization import run_simulation_with_plots
 from src.transport_analytics.config import SimulationConfig
 from src.transport_analytics.reporting import SimulationReport
+from src.transport_analytics.gtfs import load_gtfs
+import argparse
 import pandas as pd
 
-stop_locations = pd.read_json(r"example_data/stop_locations.json")
+def load_stop_locations():
+    '''stop coordinates of the example network, read only when that network is used'''
+    return pd.read_json(r"example_data/stop_locations.json")
 
 connections = [
     ("A", "B", 5, False),
@@ -91,7 +95,15 @@ bus_lines = [
 ]
 
 if __name__ == "__main__":
-    config = SimulationConfig(stop_locations=stop_locations, connections=connections, bus_lines=bus_lines)
+    parser = argparse.ArgumentParser(description="Run the transport simulation")
+    parser.add_argument("--gtfs", help="GTFS feed (directory or zip) to use instead of the example network")
+    parser.add_argument("--service-date", help="simulate the GTFS trips running on this day (YYYYMMDD)")
+    args = parser.parse_args()
+
+    if args.gtfs:
+        config = SimulationConfig(**load_gtfs(args.gtfs, service_date=args.service_date))
+    else:
+        config = SimulationConfig(stop_locations=load_stop_locations(), connections=connections, bus_lines=bus_lines)
     config.save()
     
     tn = TransportNet(config)
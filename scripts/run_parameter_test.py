@@ -1,55 +1,142 @@
+import argparse
+import hashlib
 import json
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from datetime import datetime
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
+from src.transport_analytics import checkpoint, codec
 from src.transport_analytics.models import TransportNet
 from src.transport_analytics.config import SimulationConfig
 from src.transport_analytics.reporting import SimulationReport
+from src.transport_analytics.replication import ReplicationSet
+from src.transport_analytics.search import (
+    halving_horizons, latin_hypercube, peak_windows, space_from_grid, successive_halving
+)
+import numpy as np
 from src.transport_analytics.visualization import RealTimeMetrics
-from main import stop_locations, connections, bus_lines
+from main import load_stop_locations, connections, bus_lines
 
 
-def create_simulation_config(config_params):
-    config = SimulationConfig(
-        stop_locations=stop_locations,
-        connections=connections,
-        bus_lines=bus_lines
+# network topology shipped to each worker process once, see init_worker
+_worker_topology = None
+# config every scenario is copied from, built once per process
+_base_config = None
+# where in-flight runs save their checkpoints and every how many simulated minutes, None disables
+_checkpoint_dir = None
+_checkpoint_interval = None
+# encoded warm-up checkpoints by warm-up config hash, decoded afresh for every scenario forked from one
+_warm_starts = {}
+# summary KPIs aggregated over the replicas of a scenario
+KPIS = ("avg_satisfaction", "avg_total_delay", "avg_wait_time", "avg_vehicle_utilization")
+
+
+def init_worker(topology, checkpoint_dir=None, checkpoint_interval=None):
+    global _worker_topology, _base_config, _checkpoint_dir, _checkpoint_interval
+    _worker_topology = topology
+    _base_config = None
+    _checkpoint_dir = checkpoint_dir
+    _checkpoint_interval = checkpoint_interval
+
+
+def get_topology():
+    if _worker_topology is not None:
+        return _worker_topology
+    return {
+        "stop_locations": load_stop_locations(),
+        "connections": connections,
+        "bus_lines": bus_lines
+    }
+
+
+def get_base_config():
+    global _base_config
+    if _base_config is None:
+        _base_config = SimulationConfig(**get_topology())
+    return _base_config
+
+
+def create_simulation_config(config_params, duration=6 * 60):
+    return get_base_config().copy_with(
+        **{**config_params, "visualize": False, "simulation_duration": duration}
     )
-    
-    for param, value in config_params.items():
-        setattr(config, param, value)
-    
-    config.visualize = False
-    config.simulation_duration = 6 * 60
-    
-    return config
 
 
-def run_simulation(config):
+def dedupe_scenarios(scenarios_params_list):
+    """Drop parameter sets that produce an identical config, keeping the first"""
+    seen = set()
+    unique = []
+    for params in scenarios_params_list:
+        key = create_simulation_config(params).content_hash()
+        if key not in seen:
+            seen.add(key)
+            unique.append(params)
+    return unique
+
+
+def run_key(config_params, seed=None, replica=0, duration=6 * 60, warmup=0):
+    """Identifies one run of a sweep: the config it runs, its seed, its replica
+    and the warm-up it was forked from"""
+    config = create_simulation_config(config_params, duration)
+    key = [config.content_hash(), seed, replica] + ([warmup] if warmup else [])
+    return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+
+def effective_warmup(warmup, duration):
+    """A warm-up only pays off when the run goes on past it"""
+    return warmup if 0 < warmup < duration else 0
+
+
+def get_warm_start(seed, replica, warmup, duration):
+    """Checkpoint of the base config run for the warm-up minutes with this seed
+    and replica, shared by every scenario of this duration forked from it.
+    The warm-up stops short of the duration, so the run is not finished yet.
+
+    Each worker keeps the ones it ran; with a checkpoint directory they are
+    also saved there for the other workers and later sweeps.
+    """
+    config = create_simulation_config({}, duration)
+    config.seed = seed
+    config.replica = replica
+    config.save_reports = False
+    key = f"{config.content_hash()}_{warmup}"
+    if key not in _warm_starts:
+        path = os.path.join(_checkpoint_dir, f"warmup_{key}.ckpt") if _checkpoint_dir else None
+        if path and os.path.exists(path):
+            state = checkpoint.load(path)
+        else:
+            transport_net, _ = run_simulation(config, until=warmup)
+            state = transport_net.checkpoint()
+            if path:
+                checkpoint.save(path, state)
+        _warm_starts[key] = codec.encode(state)
+    return codec.decode(_warm_starts[key])
+
+
+def run_simulation(config, warm_start=None, until=None):
+    """Run one simulation up to until, the full duration by default, resuming
+    from config.checkpoint_path when a checkpoint is there and removing it once
+    the run is complete; otherwise continue from the warm_start state if given"""
     transport_net = TransportNet(config)
     transport_net.setup_transport_network()
     
     metrics_tracker = RealTimeMetrics(transport_net)
-    
-    for line in transport_net.bus_lines:
-        for departure in line.schedule:
-            transport_net.env.process(
-                transport_net.create_vehicle(line, departure)
-            )
-    
-    interval = config.passenger_generation_interval
-    transport_net.env.process(
-        transport_net.passenger_generator(interval=interval)
+    transport_net.checkpoint_extras["metrics"] = metrics_tracker
+    checkpoint_path = config.checkpoint_path
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        transport_net.restore_checkpoint(checkpoint_path)
+    elif warm_start is not None:
+        transport_net.restore(warm_start, strict=False)
+    transport_net.run_batch(
+        until=config.simulation_duration if until is None else until,
+        sample_interval=10,
+        samplers=[metrics_tracker.update_metrics]
     )
-    
-    minute = 0
-    while minute < config.simulation_duration:
-        transport_net.env.run(until=minute + 1)
-        minute += 1
-        if minute % 10 == 0:
-            metrics_tracker.update_metrics()
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
     
     return transport_net, metrics_tracker
 
@@ -60,9 +147,19 @@ def generate_simulation_report(config, metrics_tracker, transport_net):
     return report.finalize()
 
 
-def run_test_scenario(config_params, scenario_name):
-    config = create_simulation_config(config_params)
-    transport_net, metrics_tracker = run_simulation(config)
+def run_test_scenario(config_params, scenario_name, seed=None, replica=0,
+                      save_report=True, duration=6 * 60, warmup=0):
+    config = create_simulation_config(config_params, duration)
+    config.seed = seed
+    config.replica = replica
+    config.save_reports = config.save_reports and save_report
+    warmup = effective_warmup(warmup, duration)
+    if _checkpoint_dir and _checkpoint_interval:
+        key = run_key(config_params, seed, replica, duration, warmup)
+        config.checkpoint_path = os.path.join(_checkpoint_dir, f"{key}.ckpt")
+        config.checkpoint_interval = _checkpoint_interval
+    warm_start = get_warm_start(seed, replica, warmup, duration) if warmup else None
+    transport_net, metrics_tracker = run_simulation(config, warm_start)
     summary = generate_simulation_report(config, metrics_tracker, transport_net)
     
     summary["scenario_name"] = scenario_name
@@ -193,20 +290,302 @@ def generate_parameter_combinations(param_grid):
     return scenarios_params_list
 
 
-def execute_grid_search(scenarios_params_list):
+def build_scenario_name(index, params):
+    param_str_parts = []
+    for k, v in params.items():
+        param_str_parts.append(f"{k}={v}")
+    return f"Scenario_{index+1}: {'_'.join(param_str_parts)}"
+
+
+def run_scenario_chunk(chunk):
     results = []
-    for i, params in enumerate(scenarios_params_list):
-        param_str_parts = []
-        for k, v in params.items():
-            param_str_parts.append(f"{k}={v}")
-        scenario_name = f"Scenario_{i+1}: {'_'.join(param_str_parts)}"
-        
-        result = run_test_scenario(params, scenario_name)
+    for index, params, seed, *options in chunk:
+        # optional run_test_scenario keywords: replica, save_report, duration, warmup
+        options = options[0] if options else {}
+        result = run_test_scenario(
+            params, build_scenario_name(index, params), seed=seed, **options
+        )
+        result["scenario_index"] = index
+        result["seed"] = seed
+        result["replica"] = options.get("replica", 0)
         results.append(result)
-    
     return results
 
 
+class InlineExecutor:
+    """Runs submitted calls immediately, a stand-in for the pool with one worker"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+def create_executor(max_workers=None, topology=None, journal=None,
+                    checkpoint_dir=None, checkpoint_interval=None):
+    """Process pool whose workers hold the topology, or an inline executor for one worker.
+
+    With a journal, runs it already holds are answered from it and new ones are
+    recorded as they finish; with a checkpoint directory, runs checkpoint there
+    and resume from their latest checkpoint.
+    """
+    topology = topology if topology is not None else get_topology()
+    initargs = (topology, checkpoint_dir, checkpoint_interval)
+    if max_workers == 1:
+        init_worker(*initargs)
+        executor = InlineExecutor()
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=initargs
+        )
+    return JournaledExecutor(executor, journal) if journal is not None else executor
+
+
+class ResultsJournal:
+    """Append-only JSON lines file of finished runs by run key, so an
+    interrupted sweep can be rerun without repeating them"""
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the line being written when the sweep died
+                        continue
+                    self.results[entry["key"]] = entry["result"]
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def record(self, key, result):
+        line = json.dumps({"key": key, "result": result}, default=str)
+        with self.lock:
+            self.results[key] = result
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class JournaledExecutor:
+    """Wraps an executor of run_scenario_chunk calls so journaled runs are
+    not run again and finished ones are journaled"""
+
+    def __init__(self, executor, journal):
+        self.executor = executor
+        self.journal = journal
+
+    def __enter__(self):
+        self.executor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self.executor.__exit__(*exc)
+
+    def submit(self, fn, chunk):
+        keys = [task_key(task) for task in chunk]
+        cached = {}
+        for task, key in zip(chunk, keys):
+            result = self.journal.get(key)
+            # the same run may sit at another index of an edited grid
+            cached[key] = None if result is None else dict(result, scenario_index=task[0])
+        todo = [task for task, key in zip(chunk, keys) if cached[key] is None]
+        future = Future()
+        if not todo:
+            future.set_result([cached[key] for key in keys])
+            return future
+
+        def finished(inner):
+            try:
+                results = iter(inner.result())
+            except Exception as exc:
+                future.set_exception(exc)
+                return
+            merged = []
+            for key in keys:
+                if cached[key] is None:
+                    cached[key] = next(results)
+                    self.journal.record(key, cached[key])
+                merged.append(cached[key])
+            future.set_result(merged)
+
+        self.executor.submit(fn, todo).add_done_callback(finished)
+        return future
+
+
+def task_key(task):
+    index, params, seed, *options = task
+    options = options[0] if options else {}
+    duration = options.get("duration", 6 * 60)
+    warmup = effective_warmup(options.get("warmup", 0), duration)
+    return run_key(params, seed, options.get("replica", 0), duration, warmup)
+
+
+def iter_replicated_search(scenarios_params_list, max_workers=None, chunksize=1,
+                           base_seed=0, min_replicas=5, max_replicas=30,
+                           target="avg_satisfaction", max_half_width=1.0,
+                           confidence=0.95, journal=None, checkpoint_dir=None,
+                           checkpoint_interval=None, duration=6 * 60, warmup=0):
+    """Run seeded replicas of every scenario until the target KPI's confidence
+    interval is narrow enough, yielding each scenario's aggregate as it finishes.
+
+    Replica r of every scenario uses (base_seed, r), so scenarios are compared
+    on common random numbers. With a warm-up, replica r of every scenario is
+    forked from the same warm-up run of the base config.
+    """
+    replica_sets = [
+        ReplicationSet(KPIS, confidence, min_replicas, max_replicas, target, max_half_width)
+        for _ in scenarios_params_list
+    ]
+    pending = [0] * len(scenarios_params_list)
+    # results of a scenario's outstanding batch, added in replica order once it is complete
+    finished = [[] for _ in scenarios_params_list]
+
+    def submit_replicas(executor, index, count):
+        first = replica_sets[index].count + pending[index]
+        # replicated runs are only saved in aggregate
+        tasks = [
+            (index, scenarios_params_list[index], base_seed,
+             {"replica": replica, "save_report": False,
+              "duration": duration, "warmup": warmup})
+            for replica in range(first, first + count)
+        ]
+        pending[index] += count
+        return {
+            executor.submit(run_scenario_chunk, tasks[i:i + chunksize])
+            for i in range(0, len(tasks), chunksize)
+        }
+
+    with create_executor(max_workers, journal=journal,
+                         checkpoint_dir=checkpoint_dir,
+                         checkpoint_interval=checkpoint_interval) as executor:
+        futures = set()
+        for index in range(len(scenarios_params_list)):
+            futures |= submit_replicas(executor, index, replica_sets[index].additional_replicas())
+
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                results = future.result()
+                index = results[0]["scenario_index"]
+                finished[index].extend(results)
+                pending[index] -= len(results)
+                if pending[index]:
+                    continue
+
+                # completion order varies with the workers, replica order does not
+                for result in sorted(finished[index], key=lambda r: r["replica"]):
+                    replica_sets[index].add(result, result["replica"])
+                finished[index].clear()
+
+                more = replica_sets[index].additional_replicas()
+                if more:
+                    futures |= submit_replicas(executor, index, more)
+                    continue
+
+                params = scenarios_params_list[index]
+                summary = replica_sets[index].summary()
+                summary["scenario_name"] = build_scenario_name(index, params)
+                summary["config_params"] = params
+                summary["scenario_index"] = index
+                summary["seed"] = base_seed
+                yield summary
+
+
+def execute_replicated_search(scenarios_params_list, max_workers=None,
+                              chunksize=1, base_seed=0, **replication):
+    results = []
+    total = len(scenarios_params_list)
+    target = replication.get("target", "avg_satisfaction")
+    for result in iter_replicated_search(
+        scenarios_params_list, max_workers, chunksize, base_seed, **replication
+    ):
+        results.append(result)
+        half_width = result[f"{target}_half_width"]
+        precision = f"±{half_width:.2f}" if half_width is not None else "no interval"
+        print(f"[{len(results)}/{total}] {result['scenario_name']} "
+              f"({result['replicas']} replicas, {target} {precision})")
+
+    results.sort(key=lambda x: x["scenario_index"])
+    return results
+
+
+def execute_adaptive_search(param_grid, max_workers=None, chunksize=1,
+                            base_seed=0, samples=27, eta=3, rungs=3,
+                            horizon=24 * 60, target="avg_satisfaction",
+                            journal=None, checkpoint_dir=None,
+                            checkpoint_interval=None, warmup=0):
+    """Latin hypercube samples over the grid's ranges, pruned by successive
+    halving: every sample runs on a short window and only the best 1/eta of
+    each rung goes on to a window eta times longer, ending at the full horizon.
+
+    Short windows are placed over the peak hours. A run forks from a shared
+    warm-up of the base config at the window start, so the sample's parameters
+    only apply inside the window.
+    """
+    candidates = list(enumerate(
+        latin_hypercube(space_from_grid(param_grid), samples, np.random.default_rng(base_seed))
+    ))
+    windows = peak_windows(
+        halving_horizons(horizon, eta, rungs), horizon, get_base_config().peak_hours
+    )
+
+    with create_executor(max_workers, journal=journal,
+                         checkpoint_dir=checkpoint_dir,
+                         checkpoint_interval=checkpoint_interval) as executor:
+        def evaluate(survivors, window):
+            start, end = window
+            tasks = [
+                (index, params, base_seed,
+                 {"duration": end, "save_report": False, "warmup": max(start, warmup)})
+                for index, params in survivors
+            ]
+            futures = [
+                executor.submit(run_scenario_chunk, tasks[i:i + chunksize])
+                for i in range(0, len(tasks), chunksize)
+            ]
+            by_index = {
+                result["scenario_index"]: result
+                for future in futures for result in future.result()
+            }
+            print(f"  {len(tasks)} scenarios on minutes {start}-{end} done")
+            return [by_index[index] for index, _ in survivors]
+
+        rungs_run = successive_halving(candidates, evaluate, windows, eta, target)
+
+    # each window's shared warm-up runs once per worker and is not counted
+    simulated = sum((end - start) * len(ranked) for (start, end), ranked in rungs_run)
+    print(f"Simulated {simulated} minutes, "
+          f"{simulated / (samples * horizon):.0%} of running every sample on the full horizon")
+
+    # the final rung best first, plus every run of every rung for the results file
+    results = [summary for _, summary in rungs_run[-1][1]]
+    history = [summary for _, ranked in rungs_run for _, summary in ranked]
+    return results, history
+
+
 def save_results_to_file(results):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     comparison_file = f"reports/parameter_comparison_{timestamp}.json"
@@ -261,6 +640,10 @@ def format_result_row(result, keys):
         f"{wait_time:<10.2f}",
         f"{utilization:<12.2f}"
     ])
+
+    half_width = result.get('avg_satisfaction_half_width')
+    if half_width is not None:
+        row_parts.append(f"±{half_width:.2f} ({result['replicas']} runs)")
     
     return " ".join(row_parts)
 
@@ -279,6 +662,8 @@ def display_results_summary(results, keys, param_headers_map):
     )
     
     header = format_results_header(keys, param_headers_map)
+    if results_sorted[0].get('avg_satisfaction_half_width') is not None:
+        header += " Satisfaction CI"
     print(f"\n{header}")
     print("-" * len(header))
     
@@ -293,17 +678,118 @@ def display_results_summary(results, keys, param_headers_map):
     return results_sorted[0]
 
 
-def display_best_scenario(best_scenario):
+def overlapping_scenarios(results, best_scenario, metric='avg_satisfaction'):
+    """Scenarios whose confidence interval overlaps the best one's, i.e. not clearly worse"""
+    best_ci = best_scenario.get(f'{metric}_ci')
+    if best_ci is None:
+        return []
+    return [
+        result for result in results
+        if result is not best_scenario and result.get(f'{metric}_ci')
+        and result[f'{metric}_ci'][1] >= best_ci[0]
+    ]
+
+
+def display_best_scenario(best_scenario, results=()):
     print("\n" + "="*60)
     print("BEST SCENARIO")
     print("="*60)
     print(f"Parameters: {best_scenario.get('config_params')}")
     print(f"Avg Satisfaction: {best_scenario.get('avg_satisfaction', 0):.2f}%")
+    if best_scenario.get('avg_satisfaction_ci'):
+        low, high = best_scenario['avg_satisfaction_ci']
+        print(f"  CI: [{low:.2f}, {high:.2f}] over {best_scenario['replicas']} replicas")
+        ties = overlapping_scenarios(results, best_scenario)
+        if ties:
+            print(f"  {len(ties)} other scenario(s) overlap this interval and are not clearly worse")
     print(f"Avg Delay: {best_scenario.get('avg_total_delay', 0):.2f} min")
     print(f"Avg Wait Time: {best_scenario.get('avg_wait_time', 0):.2f} min")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run parameter grid search")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=2,
+        help="scenarios dispatched to a worker per task"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="base seed, replica r of every scenario runs with (seed, r)"
+    )
+    parser.add_argument(
+        "--search", choices=("grid", "adaptive"), default="grid",
+        help="exhaustive grid with replicas, or latin hypercube samples pruned by successive halving"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=27,
+        help="adaptive search: latin hypercube samples over the grid's ranges"
+    )
+    parser.add_argument(
+        "--eta", type=int, default=3,
+        help="adaptive search: keep the best 1/eta per rung, each rung eta times longer"
+    )
+    parser.add_argument(
+        "--rungs", type=int, default=3,
+        help="adaptive search: number of successive halving rungs"
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=24 * 60,
+        help="adaptive search: simulated minutes of the final rung"
+    )
+    parser.add_argument(
+        "--duration", type=int, default=6 * 60,
+        help="grid search: simulated minutes of every run"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=0,
+        help="fork every run from a shared run of the base config up to this minute, "
+             "the scenario's parameters apply from there on (0 starts every run empty)"
+    )
+    parser.add_argument(
+        "--min-replicas", type=int, default=5,
+        help="replicas every scenario runs before the stopping rule applies"
+    )
+    parser.add_argument(
+        "--max-replicas", type=int, default=30,
+        help="replica budget per scenario"
+    )
+    parser.add_argument(
+        "--target", default="avg_satisfaction", choices=KPIS,
+        help="KPI whose confidence interval decides when to stop"
+    )
+    parser.add_argument(
+        "--ci-width", type=float, default=1.0,
+        help="stop once the target KPI's CI half-width is at most this"
+    )
+    parser.add_argument(
+        "--confidence", type=float, default=0.95,
+        help="confidence level of the intervals"
+    )
+    parser.add_argument(
+        "--journal", default="reports/sweep_journal.jsonl",
+        help="finished runs are appended here and skipped when the sweep is rerun"
+    )
+    parser.add_argument(
+        "--no-journal", action="store_true",
+        help="run every scenario even if the journal holds its result"
+    )
+    parser.add_argument(
+        "--checkpoint-dir", default="reports/checkpoints",
+        help="in-flight runs checkpoint here and resume from it after a crash"
+    )
+    parser.add_argument(
+        "--checkpoint-interval", type=int, default=60,
+        help="simulated minutes between checkpoints, 0 disables them"
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     param_grid = {
         "passenger_generation_interval": [8, 12],
         "peak_multiplier": [1.5, 2.0],
@@ -313,20 +799,65 @@ def main():
         "busy_route_factor": [1.3, 1.6]
     }
     
-    scenarios_params_list = generate_parameter_combinations(param_grid)
+    param_headers_map = get_parameter_headers_map()
+    keys = list(param_grid.keys())
+    journal = None if args.no_journal else ResultsJournal(args.journal)
+    if journal is not None:
+        print(f"Journal {args.journal} holds {len(journal)} finished runs")
+    resume = {
+        "journal": journal,
+        "checkpoint_dir": args.checkpoint_dir if args.checkpoint_interval else None,
+        "checkpoint_interval": args.checkpoint_interval or None,
+    }
+
+    if args.search == "adaptive":
+        print(f"Starting adaptive search with {args.samples} samples...")
+        results, history = execute_adaptive_search(
+            param_grid,
+            max_workers=args.workers,
+            chunksize=args.chunksize,
+            base_seed=args.seed,
+            samples=args.samples,
+            eta=args.eta,
+            rungs=args.rungs,
+            horizon=args.horizon,
+            target=args.target,
+            warmup=args.warmup,
+            **resume
+        )
+        comparison_file = save_results_to_file(history)
+        best_scenario = display_results_summary(results, keys, param_headers_map)
+        if best_scenario:
+            display_best_scenario(best_scenario, results)
+        print(f"\nDetailed results saved to: {comparison_file}")
+        return
+
+    scenarios_params_list = dedupe_scenarios(
+        generate_parameter_combinations(param_grid)
+    )
     total_scenarios = len(scenarios_params_list)
     print(f"Starting grid search with {total_scenarios} scenarios...")
     
-    results = execute_grid_search(scenarios_params_list)
+    results = execute_replicated_search(
+        scenarios_params_list,
+        max_workers=args.workers,
+        chunksize=args.chunksize,
+        base_seed=args.seed,
+        min_replicas=args.min_replicas,
+        max_replicas=args.max_replicas,
+        target=args.target,
+        max_half_width=args.ci_width,
+        confidence=args.confidence,
+        duration=args.duration,
+        warmup=args.warmup,
+        **resume
+    )
     comparison_file = save_results_to_file(results)
     
-    param_headers_map = get_parameter_headers_map()
-    keys = list(param_grid.keys())
-    
     best_scenario = display_results_summary(results, keys, param_headers_map)
     
     if best_scenario:
-        display_best_scenario(best_scenario)
+        display_best_scenario(best_scenario, results)
     
     print(f"\nDetailed results saved to: {comparison_file}")
     
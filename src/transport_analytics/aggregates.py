@@ -0,0 +1,143 @@
+# aggregates.py
+import heapq
+import math
+
+class SpawnTimeAggregate:
+    '''running count and spawn-time sums for a group of passengers, split at the age where satisfaction reaches zero'''
+
+    def __init__(self, decay):
+        self.decay = decay
+        self.horizon = 100 / decay if decay > 0 else math.inf
+        self.count = 0
+        self.spawn_sum = 0.0
+
+        # passengers young enough to still have satisfaction left, binned by spawn time
+        self.fresh_count = 0
+        self.fresh_spawn_sum = 0.0
+        self.bins = {}
+        self.heap = []
+
+    def add(self, spawn_time, count=1):
+        self.count += count
+        self.spawn_sum += spawn_time * count
+        self.fresh_count += count
+        self.fresh_spawn_sum += spawn_time * count
+        if spawn_time in self.bins:
+            self.bins[spawn_time] += count
+        else:
+            self.bins[spawn_time] = count
+            heapq.heappush(self.heap, spawn_time)
+
+    def remove(self, spawn_time):
+        self.count -= 1
+        self.spawn_sum -= spawn_time
+        # passengers already past the horizon were dropped from the bins by advance
+        if self.bins.get(spawn_time):
+            self.bins[spawn_time] -= 1
+            self.fresh_count -= 1
+            self.fresh_spawn_sum -= spawn_time
+
+    def advance(self, now):
+        '''moves bins that aged past the horizon out of the fresh sums; amortised O(1) per bin'''
+        cutoff = now - self.horizon
+        while self.heap and self.heap[0] <= cutoff:
+            spawn_time = heapq.heappop(self.heap)
+            count = self.bins.pop(spawn_time)
+            self.fresh_count -= count
+            self.fresh_spawn_sum -= spawn_time * count
+
+    def get_state(self):
+        return {
+            "decay": self.decay,
+            "count": self.count,
+            "spawn_sum": self.spawn_sum,
+            "fresh_count": self.fresh_count,
+            "fresh_spawn_sum": self.fresh_spawn_sum,
+            "bins": list(self.bins.items()),
+            "heap": list(self.heap),
+        }
+
+    def set_state(self, state):
+        self.count = state["count"]
+        self.spawn_sum = state["spawn_sum"]
+        self.fresh_count = state["fresh_count"]
+        self.fresh_spawn_sum = state["fresh_spawn_sum"]
+        self.bins = dict(state["bins"])
+        self.heap = list(state["heap"])
+
+    def total_age(self, now):
+        return self.count * now - self.spawn_sum
+
+    def total_satisfaction(self, now):
+        self.advance(now)
+        return self.fresh_count * 100 - self.decay * (self.fresh_count * now - self.fresh_spawn_sum)
+
+
+class SystemAggregates:
+    '''aggregates kept up to date at spawn, board and alight events so every metric is O(1) to sample'''
+
+    def __init__(self, decay_waiting=0.5, decay_traveling=0.2):
+        self.waiting = SpawnTimeAggregate(decay_waiting)
+        self.onboard = SpawnTimeAggregate(decay_traveling)
+        # onboard passenger counts per vehicle capacity, utilisation is sum(count / capacity)
+        self.onboard_by_capacity = {}
+
+    def on_spawn(self, spawn_time, count=1):
+        self.waiting.add(spawn_time, count)
+
+    def on_board(self, spawn_time, capacity):
+        self.waiting.remove(spawn_time)
+        self.onboard.add(spawn_time)
+        self.onboard_by_capacity[capacity] = self.onboard_by_capacity.get(capacity, 0) + 1
+
+    def on_alight(self, spawn_time, capacity):
+        self.onboard.remove(spawn_time)
+        self.onboard_by_capacity[capacity] -= 1
+
+    def on_transfer(self, spawn_time, capacity):
+        # a transferring rider waits at the stop again until the next vehicle picks them up
+        self.on_alight(spawn_time, capacity)
+        self.waiting.add(spawn_time)
+
+    def get_state(self):
+        return {
+            "waiting": self.waiting.get_state(),
+            "onboard": self.onboard.get_state(),
+            "onboard_by_capacity": list(self.onboard_by_capacity.items()),
+        }
+
+    def set_state(self, state):
+        self.waiting.set_state(state["waiting"])
+        self.onboard.set_state(state["onboard"])
+        self.onboard_by_capacity = dict(state["onboard_by_capacity"])
+
+    def rebuild(self, waiting_spawn_times, onboard_spawn_times):
+        '''recounts waiting and onboard passengers from their spawn times, keeping each group's decay'''
+        self.waiting = SpawnTimeAggregate(self.waiting.decay)
+        self.onboard = SpawnTimeAggregate(self.onboard.decay)
+        for spawn_time in waiting_spawn_times:
+            self.waiting.add(spawn_time)
+        for spawn_time in onboard_spawn_times:
+            self.onboard.add(spawn_time)
+
+    def passengers_in_system(self):
+        return self.waiting.count + self.onboard.count
+
+    def satisfaction(self, now):
+        count = self.passengers_in_system()
+        if count == 0:
+            return 100
+        return (self.waiting.total_satisfaction(now) + self.onboard.total_satisfaction(now)) / count
+
+    def total_delay(self, now):
+        return self.waiting.total_age(now) + self.onboard.total_age(now)
+
+    def avg_wait_time(self, now):
+        count = self.passengers_in_system()
+        return self.total_delay(now) / count if count > 0 else 0
+
+    def vehicle_utilization(self, vehicle_count):
+        if not vehicle_count:
+            return 0
+        load = sum(count / capacity for capacity, count in self.onboard_by_capacity.items())
+        return load * 100 / vehicle_count
@@ -0,0 +1,32 @@
+# checkpoint.py
+import os
+from src.transport_analytics import codec
+
+CHECKPOINT_MAGIC = b"SIMCKPT"
+# bump when the captured state changes shape; older checkpoints are refused rather than misread
+CHECKPOINT_VERSION = 4
+
+def save(path, state):
+    '''writes a TransportNet.checkpoint() state atomically, so a crash mid-write keeps the previous checkpoint'''
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + codec.encode(state))
+    os.replace(tmp_path, path)
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError(f"{path} is not a simulation checkpoint")
+    version = data[len(CHECKPOINT_MAGIC)]
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"checkpoint version {version} is not supported (expected {CHECKPOINT_VERSION})")
+    return codec.decode(data[len(CHECKPOINT_MAGIC) + 1:])
+
+def pending_order(env):
+    '''(time, priority, event id) of every scheduled event by id(event), the order simpy will process them in'''
+    # simpy has no public view of its event queue
+    return {id(event): (time, priority, eid) for time, priority, eid, event in env._queue}
@@ -0,0 +1,109 @@
+# codec.py
+import io
+import struct
+import numpy as np
+
+# one tag byte per value, then a fixed size payload or a length prefix
+NONE, TRUE, FALSE = b"N", b"T", b"F"
+INT, BIGINT, FLOAT = b"i", b"I", b"f"
+STR, BYTES = b"s", b"b"
+LIST, TUPLE, DICT = b"l", b"t", b"d"
+ARRAY = b"a"
+
+INT64 = struct.Struct("<q")
+FLOAT64 = struct.Struct("<d")
+LENGTH = struct.Struct("<I")
+
+def encode(value, canonical=False):
+    '''pickle-free binary encoding of plain python values; canonical sorts dict keys so equal values give equal bytes'''
+    out = []
+    _encode(value, out, canonical)
+    return b"".join(out)
+
+def _encode(value, out, canonical):
+    if value is None:
+        out.append(NONE)
+    elif value is True:
+        out.append(TRUE)
+    elif value is False:
+        out.append(FALSE)
+    elif isinstance(value, int):
+        if -2**63 <= value < 2**63:
+            out.append(INT + INT64.pack(value))
+        else:
+            digits = str(value).encode()
+            out.append(BIGINT + LENGTH.pack(len(digits)) + digits)
+    elif isinstance(value, float):
+        out.append(FLOAT + FLOAT64.pack(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(STR + LENGTH.pack(len(data)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(BYTES + LENGTH.pack(len(value)) + bytes(value))
+    elif isinstance(value, (list, tuple)):
+        out.append((TUPLE if isinstance(value, tuple) else LIST) + LENGTH.pack(len(value)))
+        for item in value:
+            _encode(item, out, canonical)
+    elif isinstance(value, dict):
+        items = value.items()
+        if canonical:
+            items = sorted(items, key=lambda item: (type(item[0]).__name__, str(item[0])))
+        out.append(DICT + LENGTH.pack(len(value)))
+        for key, item in items:
+            _encode(key, out, canonical)
+            _encode(item, out, canonical)
+    elif isinstance(value, np.ndarray):
+        # numpy's own format, which keeps structured dtypes and refuses object arrays
+        buffer = io.BytesIO()
+        np.save(buffer, value, allow_pickle=False)
+        data = buffer.getvalue()
+        out.append(ARRAY + LENGTH.pack(len(data)) + data)
+    elif hasattr(value, "item"):
+        # numpy scalars
+        _encode(value.item(), out, canonical)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__}")
+
+def decode(data):
+    value, offset = _decode(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError(f"{len(data) - offset} trailing bytes after encoded value")
+    return value
+
+def _decode(data, offset):
+    tag = bytes(data[offset:offset + 1])
+    offset += 1
+    if tag == NONE:
+        return None, offset
+    if tag == TRUE:
+        return True, offset
+    if tag == FALSE:
+        return False, offset
+    if tag == INT:
+        return INT64.unpack_from(data, offset)[0], offset + INT64.size
+    if tag == FLOAT:
+        return FLOAT64.unpack_from(data, offset)[0], offset + FLOAT64.size
+    if tag not in (BIGINT, STR, BYTES, LIST, TUPLE, DICT, ARRAY):
+        raise ValueError(f"unknown tag {tag!r} at offset {offset - 1}")
+
+    length = LENGTH.unpack_from(data, offset)[0]
+    offset += LENGTH.size
+    if tag == BIGINT:
+        return int(bytes(data[offset:offset + length])), offset + length
+    if tag == STR:
+        return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+    if tag == BYTES:
+        return bytes(data[offset:offset + length]), offset + length
+    if tag == ARRAY:
+        return np.load(io.BytesIO(bytes(data[offset:offset + length])), allow_pickle=False), offset + length
+    if tag in (LIST, TUPLE):
+        items = []
+        for _ in range(length):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return (tuple(items) if tag == TUPLE else items), offset
+    result = {}
+    for _ in range(length):
+        key, offset = _decode(data, offset)
+        result[key], offset = _decode(data, offset)
+    return result, offset
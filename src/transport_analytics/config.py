@@ -1,8 +1,15 @@
 # config.py
-import json, os
+import copy, hashlib, json, os
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Union
+from src.transport_analytics import codec
+
+# bump when a setting changes meaning; from_dict refuses newer versions
+CONFIG_VERSION = 1
+BINARY_MAGIC = b"SIMCFG"
+# settings that json turns into lists
+TUPLE_FIELDS = ("peak_hours",)
 
 class SimulationConfig:
     def __init__(self, 
@@ -18,6 +25,8 @@ class SimulationConfig:
         self.passenger_generation_interval = 5
         self.peak_hours = (7*60, 9*60, 16*60, 18*60)  # morning and evening peak
         self.peak_multiplier = 2  
+        self.passengers_per_spawn = 5  # passengers drawn in one batch per spawn event
+        self.od_matrix = None  # optional {origin: {destination: weight}} demand, uniform when None
         # self.night_interval_range = (10, 30)  # night time passenger interval range
         self.satisfaction_decay_waiting = 0.5  # satisfaction loss per minute waiting
         self.satisfaction_decay_traveling = 0.2  # satisfaction loss per minute traveling
@@ -26,7 +35,29 @@ class SimulationConfig:
         self.simulation_duration = 60*24  
         self.rush_hour_traffic_factor = 1.5 
         self.busy_route_factor = 1.3  # travel time multiplier for busy streets
+        self.travel_time_bin_minutes = 15  # resolution of the time-dependent travel time table
+        self.travel_time_profile = None  # optional CSV of from, to, start, end, multiplier overrides
+        self.journey_planner = True  # plan transfers over the line timetable, False rides only direct lines
+        self.journey_bin_minutes = 15  # itineraries are cached per OD pair and departure bin of this size
+        self.max_transfers = 3
+        self.seed = None  # master seed for all random streams, None draws fresh entropy
+        self.replica = 0  # replica number, gives independent streams for the same seed
       
+        self.trajectory_sample_interval = 0  # minutes between in-transit position samples, 0 samples every minute
+        self.trajectory_retention = None  # keep only the newest N position records, None keeps all
+        self.persist_run = False  # stream positions, queue snapshots and trips to disk during run_batch
+        self.persist_interval = 60  # minutes between flushes to the run store
+        self.event_log_level = "debug"  # debug, info or off; events cost nothing until a sink is attached
+        self.event_log_file = None  # optional path for a binary event log, closed when run_batch reaches simulation_duration
+        self.snapshot_interval = 1  # minutes between stop queue snapshots in the status report
+        self.snapshot_delta = False  # only snapshot stops whose queue changed since the previous snapshot
+        self.snapshot_retention = None  # keep only the newest N snapshots, None keeps all
+        self.status_output = "console"  # console or silent; silent still records snapshots
+        self.profiling = False  # time and count events per subsystem, printed and exported with the report
+        self.profile_allocations = False  # also trace net allocations per subsystem with tracemalloc (slow)
+        self.checkpoint_interval = None  # minutes between checkpoints saved by run_batch, None never saves
+        self.checkpoint_path = None  # checkpoint file, overwritten at every interval
+
         self.visualize = True
         self.plot_metrics = True
         self.animation_speed = 30  
@@ -44,31 +75,94 @@ class SimulationConfig:
     #     self.peak_multiplier = multiplier
         
     
-    def save(self, filename=None):
+    def to_dict(self):
+        """plain, json compatible view of every setting, tagged with the format version"""
+        data = dict(self.__dict__)
+        if isinstance(self.stop_locations, pd.DataFrame):
+            data["stop_locations"] = {stop: tuple(self.stop_locations[stop].tolist()) for stop in self.stop_locations.columns}
+        if isinstance(self.od_matrix, pd.DataFrame):
+            data["od_matrix"] = self.od_matrix.to_dict(orient="index")
+        data["version"] = CONFIG_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """rebuilds a config from to_dict output; settings missing from older versions keep their defaults"""
+        data = dict(data)
+        version = data.pop("version", 0)
+        if version > CONFIG_VERSION:
+            raise ValueError(f"config version {version} is newer than supported version {CONFIG_VERSION}")
+        config = cls(
+            stop_locations={stop: tuple(xy) for stop, xy in data.pop("stop_locations").items()},
+            connections=[tuple(conn) for conn in data.pop("connections")],
+            bus_lines=data.pop("bus_lines"),
+        )
+        for key, value in data.items():
+            setattr(config, key, tuple(value) if key in TUPLE_FIELDS and value is not None else value)
+        return config
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=4)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_bytes(self):
+        return BINARY_MAGIC + codec.encode(self.to_dict())
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data.startswith(BINARY_MAGIC):
+            raise ValueError("not a binary simulation config")
+        return cls.from_dict(codec.decode(memoryview(data)[len(BINARY_MAGIC):]))
+
+    def content_hash(self):
+        """hash of every setting, equal for configs that would run the same simulation"""
+        data = self.to_dict()
+        return hashlib.sha1(codec.encode(data, canonical=True)).hexdigest()
+
+    def network_hash(self):
+        """hash of the stops, connections and lines alone, equal for configs that only tune parameters"""
+        data = self.to_dict()
+        network = {key: data[key] for key in ("stop_locations", "connections", "bus_lines")}
+        return hashlib.sha1(codec.encode(network, canonical=True)).hexdigest()
+
+    def copy_with(self, **overrides):
+        """shallow copy with some settings replaced; the network topology is shared, not copied"""
+        config = copy.copy(self)
+        for key, value in overrides.items():
+            if not hasattr(config, key):
+                raise AttributeError(f"unknown config setting {key!r}")
+            setattr(config, key, value)
+        return config
+
+    def save(self, filename=None, binary=False):
         """save configuration to file"""
         if not self.save_reports:
             return
             
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"config_{timestamp}.json"
+            filename = f"config_{timestamp}.{'bin' if binary else 'json'}"
             
         os.makedirs(self.report_directory, exist_ok=True)
         filepath = os.path.join(self.report_directory, filename)
         
-        with open(filepath, 'w') as f:
-            config_dict = self.__dict__.copy()
-            if isinstance(self.stop_locations, pd.DataFrame):
-                config_dict['stop_locations'] = self.stop_locations.to_dict()
-            json.dump(config_dict, f, indent=4)
+        if binary:
+            with open(filepath, 'wb') as f:
+                f.write(self.to_bytes())
+        else:
+            with open(filepath, 'w') as f:
+                f.write(self.to_json())
             
         return filepath
     
-    # def load(self, filepath):
-    #     """load configuration from file"""
-    #     with open(filepath, 'r') as f:
-    #         data = json.load(f)
-    #         for key, value in data.items():
-    #             setattr(self, key, value)
-    #     return self
-    
\ No newline at end of file
+    @classmethod
+    def load(cls, filepath):
+        """load configuration from a file written by save, json or binary"""
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        if data.startswith(BINARY_MAGIC):
+            return cls.from_bytes(data)
+        return cls.from_json(data.decode("utf-8"))
@@ -0,0 +1,78 @@
+# demand.py
+import numpy as np
+
+class ODSampler:
+    '''draws origin/destination stop id pairs in bulk, uniformly over distinct stops or from an OD demand matrix
+
+    components labels the connected part of the network each stop is in, pairs are only drawn within one
+    '''
+
+    def __init__(self, stop_ids, od_matrix=None, components=None):
+        self.stop_ids = np.asarray(stop_ids, dtype=np.int32)
+        self.components = None
+        if components is not None and len(set(components)) > 1:
+            self.components = np.asarray(components)
+            self.build_groups()
+        self.cdf = None
+        if od_matrix is not None:
+            self.cdf = self.build_cdf(od_matrix)
+
+    def build_groups(self):
+        '''orders the stops by component, every slot knows where its component starts and how many stops it has'''
+        self.members = np.argsort(self.components, kind="stable")
+        _, first, counts = np.unique(self.components[self.members], return_index=True, return_counts=True)
+        self.group_start = np.repeat(first, counts)
+        self.group_size = np.repeat(counts, counts)
+        # a stop alone in its component has nowhere to go
+        self.origin_slots = np.flatnonzero(self.group_size > 1)
+        if not len(self.origin_slots):
+            raise ValueError("no two stops are connected")
+
+    def build_cdf(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(self.stop_ids)
+        if weights.shape != (n, n):
+            raise ValueError(f"OD matrix has shape {weights.shape}, expected {(n, n)}")
+
+        weights = weights.copy()
+        np.fill_diagonal(weights, 0)
+        if self.components is not None:
+            weights[self.components[:, None] != self.components[None, :]] = 0
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("OD matrix has no demand off the diagonal")
+
+        # cumulative distribution over the flattened matrix, computed once
+        return np.cumsum(weights.ravel()) / total
+
+    @classmethod
+    def from_mapping(cls, registry, stops, od_matrix, components=None):
+        '''builds a sampler from {origin: {destination: weight}} keyed by stop names (or a DataFrame with origins as index)'''
+        if hasattr(od_matrix, "to_dict"):
+            od_matrix = od_matrix.to_dict(orient="index")
+
+        position = {stop: i for i, stop in enumerate(stops)}
+        weights = np.zeros((len(stops), len(stops)))
+        for origin, row in od_matrix.items():
+            for destination, weight in row.items():
+                weights[position[origin], position[destination]] = weight
+        return cls([registry.id_of(stop) for stop in stops], weights, components)
+
+    def sample(self, rng, size):
+        '''returns two arrays of stop ids; origin and destination always differ'''
+        n = len(self.stop_ids)
+        if self.cdf is None and self.components is not None:
+            slots = self.origin_slots[rng.integers(0, len(self.origin_slots), size=size)]
+            start, count = self.group_start[slots], self.group_size[slots]
+            # the same non-zero offset trick, wrapped within the origin's component
+            targets = start + (slots - start + rng.integers(1, count)) % count
+            return self.stop_ids[self.members[slots]], self.stop_ids[self.members[targets]]
+        if self.cdf is None:
+            origins = rng.integers(0, n, size=size)
+            # a non-zero offset keeps destinations uniform over the other stops
+            destinations = (origins + rng.integers(1, n, size=size)) % n
+        else:
+            cells = np.searchsorted(self.cdf, rng.random(size), side="right")
+            cells = np.minimum(cells, n * n - 1)
+            origins, destinations = np.divmod(cells, n)
+        return self.stop_ids[origins], self.stop_ids[destinations]
@@ -0,0 +1,163 @@
+# events.py
+import struct
+import sys
+from collections import deque
+from enum import IntEnum
+
+class Level(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    OFF = 100
+
+class EventType(IntEnum):
+    SPAWN = 0           # passenger, origin stop, destination stop
+    BOARD = 1           # passenger, stop, vehicle
+    ALIGHT = 2          # passenger, stop, vehicle
+    DEPART = 3          # vehicle, from stop, to stop
+    ARRIVE = 4          # vehicle, stop, exiting, boarding
+    TERMINAL_WAIT = 5   # vehicle, stop, minutes left, load
+    RETIRE = 6          # vehicle, stop
+    TRANSFER = 7        # passenger, stop, vehicle
+
+EVENT_LEVELS = {
+    EventType.SPAWN: Level.DEBUG,
+    EventType.BOARD: Level.DEBUG,
+    EventType.ALIGHT: Level.DEBUG,
+    EventType.DEPART: Level.DEBUG,
+    EventType.ARRIVE: Level.INFO,
+    EventType.TERMINAL_WAIT: Level.DEBUG,
+    EventType.RETIRE: Level.INFO,
+    EventType.TRANSFER: Level.DEBUG,
+}
+
+class EventLog:
+    '''structured event log; events are (time, type, int fields) and only sinks ever format them'''
+
+    def __init__(self, level=Level.INFO, sinks=()):
+        self.sinks = list(sinks)
+        self.level = level
+        self.refresh()
+
+    def refresh(self):
+        # call sites check enabled[event_type] first, so a disabled event costs one list lookup
+        self.enabled = [bool(self.sinks) and EVENT_LEVELS[t] >= self.level for t in EventType]
+
+    def set_level(self, level):
+        self.level = Level(level)
+        self.refresh()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        self.refresh()
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        self.refresh()
+
+    def emit(self, event_type, time, *fields):
+        for sink in self.sinks:
+            sink.write(time, event_type, fields)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class EventFormatter:
+    '''turns raw events into the human readable messages the console used to show'''
+
+    def __init__(self, transport_net):
+        self.tn = transport_net
+
+    def __call__(self, time, event_type, fields):
+        stops = self.tn.stops.names
+        vehicles = self.tn.trajectories.vehicle_ids
+        if event_type == EventType.SPAWN:
+            pid, origin, destination = fields
+            return f"Passenger{pid} appears at {stops[origin]} -> {stops[destination]}"
+        if event_type == EventType.BOARD:
+            pid, stop, vehicle = fields
+            return f"Passenger{pid} boards {vehicles[vehicle]} at {stops[stop]}"
+        if event_type == EventType.ALIGHT:
+            pid, stop, vehicle = fields
+            return f"Passenger{pid} gets off {vehicles[vehicle]} at {stops[stop]}"
+        if event_type == EventType.DEPART:
+            vehicle, current, following = fields
+            return f"{vehicles[vehicle]} departing from {stops[current]} -> {stops[following]}"
+        if event_type == EventType.ARRIVE:
+            vehicle, stop, exiting, boarding = fields
+            return f"{vehicles[vehicle]} arrived at {stops[stop]}: exiting {exiting}, boarding {boarding}"
+        if event_type == EventType.TERMINAL_WAIT:
+            vehicle, stop, remaining, load = fields
+            return f"{vehicles[vehicle]} waiting at {stops[stop]} ({remaining}m left), passengers: {load}"
+        if event_type == EventType.TRANSFER:
+            pid, stop, vehicle = fields
+            return f"Passenger{pid} transfers from {vehicles[vehicle]} at {stops[stop]}"
+        if event_type == EventType.RETIRE:
+            vehicle, stop = fields
+            return f"{vehicles[vehicle]} retired at {stops[stop]}"
+        return f"{EventType(event_type).name} {fields}"
+
+
+class RingBufferSink:
+    '''keeps the newest raw events in memory until drained'''
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def write(self, time, event_type, fields):
+        self.events.append((time, event_type, fields))
+
+    def drain(self):
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    '''formats and prints every event as it arrives'''
+
+    def __init__(self, formatter, stream=None):
+        self.formatter = formatter
+        self.stream = stream if stream is not None else sys.stdout
+
+    def write(self, time, event_type, fields):
+        print(self.formatter(time, event_type, fields), file=self.stream)
+
+    def close(self):
+        pass
+
+
+# time, event type, number of fields, then that many int64 fields
+RECORD_HEADER = struct.Struct("<dBB")
+
+class BinaryFileSink:
+    '''appends events to a compact binary file, read back with read_binary_log'''
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def write(self, time, event_type, fields):
+        self.file.write(RECORD_HEADER.pack(time, event_type, len(fields)))
+        self.file.write(struct.pack(f"<{len(fields)}q", *fields))
+
+    def close(self):
+        # the file is complete once closed, later events are an error rather than silently lost
+        self.file.close()
+
+
+def read_binary_log(path):
+    '''yields (time, event type, fields) tuples from a file written by BinaryFileSink'''
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        time, event_type, count = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        fields = struct.unpack_from(f"<{count}q", data, offset)
+        offset += 8 * count
+        yield time, EventType(event_type), fields
@@ -0,0 +1,271 @@
+# gtfs.py
+import csv
+import datetime
+import hashlib
+import io
+import os
+import zipfile
+from array import array
+import numpy as np
+
+FEED_FILES = ("stops.txt", "routes.txt", "trips.txt", "stop_times.txt")
+# optional, they say which service_id runs on which day
+CALENDAR_FILES = ("calendar.txt", "calendar_dates.txt")
+CACHE_VERSION = 2
+
+class GTFSFeed:
+    '''a GTFS feed as a directory or zip archive, read one csv row at a time'''
+
+    def __init__(self, path):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path) if os.path.isfile(path) else False
+
+    def has(self, name):
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                return name in archive.namelist()
+        return os.path.exists(os.path.join(self.path, name))
+
+    def rows(self, name):
+        '''yields each row of a feed file as a dict keyed by the header'''
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                with archive.open(name) as raw:
+                    yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        else:
+            with open(os.path.join(self.path, name), encoding="utf-8-sig", newline="") as f:
+                yield from csv.DictReader(f)
+
+    def hash(self):
+        '''content hash of the files the loader reads, used as the cache key'''
+        digest = hashlib.sha1()
+        if self.is_zip:
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        for name in FEED_FILES + tuple(name for name in CALENDAR_FILES if self.has(name)):
+            with open(os.path.join(self.path, name), "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+
+def parse_time(value):
+    '''minutes after midnight of a GTFS HH:MM:SS time, which may run past 24:00; None when empty'''
+    if not value:
+        return None
+    hours, mins, secs = value.strip().split(":")
+    return int(hours) * 60 + int(mins) + int(secs) / 60
+
+
+def active_services(feed, date):
+    '''service_ids running on a date (a datetime.date or YYYYMMDD), from calendar.txt and its calendar_dates.txt exceptions'''
+    if isinstance(date, str):
+        date = datetime.datetime.strptime(date, "%Y%m%d").date()
+    day = date.strftime("%Y%m%d")
+    weekday = date.strftime("%A").lower()
+
+    services = set()
+    if feed.has("calendar.txt"):
+        for row in feed.rows("calendar.txt"):
+            if row["start_date"] <= day <= row["end_date"] and row.get(weekday) == "1":
+                services.add(row["service_id"])
+    if feed.has("calendar_dates.txt"):
+        for row in feed.rows("calendar_dates.txt"):
+            if row["date"] != day:
+                continue
+            # exception_type 1 adds the service for the day, 2 removes it
+            if row["exception_type"] == "1":
+                services.add(row["service_id"])
+            elif row["exception_type"] == "2":
+                services.discard(row["service_id"])
+    return services
+
+
+class ParsedNetwork:
+    '''the parts of a feed the simulation needs, held as flat arrays so they can be cached without pickle'''
+
+    FIELDS = ("stop_ids", "lat", "lon", "line_names", "line_offsets", "line_stops",
+              "schedule_offsets", "schedule_minutes", "connection_from", "connection_to", "connection_time")
+
+    def __init__(self, **arrays):
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_feed(cls, feed, service_ids=None):
+        '''service_ids keeps only the trips of those services, None keeps every trip in the feed'''
+        # stops, indexed in file order
+        stop_index = {}
+        stop_ids, lat, lon = [], array("d"), array("d")
+        for row in feed.rows("stops.txt"):
+            if not row.get("stop_lat") or not row.get("stop_lon"):
+                continue
+            stop_index[row["stop_id"]] = len(stop_ids)
+            stop_ids.append(row["stop_id"])
+            lat.append(float(row["stop_lat"]))
+            lon.append(float(row["stop_lon"]))
+
+        route_names = {}
+        for row in feed.rows("routes.txt"):
+            route_names[row["route_id"]] = row.get("route_short_name") or row.get("route_long_name") or row["route_id"]
+
+        trip_index = {}
+        trip_routes = []
+        for row in feed.rows("trips.txt"):
+            if service_ids is not None and row.get("service_id") not in service_ids:
+                continue
+            trip_index[row["trip_id"]] = len(trip_routes)
+            trip_routes.append(row["route_id"])
+
+        # stop times go straight into typed columns, sorted once afterwards
+        trips, sequences, stops = array("l"), array("l"), array("l")
+        arrivals, departures = array("d"), array("d")
+        for row in feed.rows("stop_times.txt"):
+            trip = trip_index.get(row["trip_id"])
+            stop = stop_index.get(row["stop_id"])
+            if trip is None or stop is None:
+                continue
+            arrival = parse_time(row.get("arrival_time"))
+            departure = parse_time(row.get("departure_time"))
+            trips.append(trip)
+            sequences.append(int(row["stop_sequence"]))
+            stops.append(stop)
+            arrivals.append(np.nan if arrival is None else arrival)
+            departures.append(np.nan if departure is None else departure)
+
+        trips = np.asarray(trips, dtype=np.int64)
+        order = np.lexsort((np.asarray(sequences, dtype=np.int64), trips))
+        trips = trips[order]
+        stops = np.asarray(stops, dtype=np.int64)[order]
+        arrivals = np.asarray(arrivals)[order]
+        departures = np.asarray(departures)[order]
+        departures = np.where(np.isnan(departures), arrivals, departures)
+
+        # link times between consecutive stops of the same trip, averaged per stop pair in both directions
+        same_trip = trips[1:] == trips[:-1]
+        link_from, link_to = stops[:-1][same_trip], stops[1:][same_trip]
+        link_time = (arrivals[1:] - departures[:-1])[same_trip]
+        timed = ~np.isnan(link_time)
+        first, second = np.minimum(link_from, link_to), np.maximum(link_from, link_to)
+        pairs, inverse = np.unique(first * len(stop_ids) + second, return_inverse=True)
+        totals = np.bincount(inverse, weights=np.where(timed, link_time, 0), minlength=len(pairs))
+        counts = np.bincount(inverse, weights=timed, minlength=len(pairs))
+        connection_time = np.divide(totals, counts, out=np.ones(len(pairs)), where=counts > 0)
+
+        # every distinct stop pattern of a route becomes one line, its trips' first departures the schedule
+        patterns = {}
+        route_patterns = {}
+        line_names, line_stops, schedules = [], [], []
+        bounds = np.flatnonzero(np.diff(trips)) + 1
+        for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(trips)]))):
+            if end - start < 2:
+                continue
+            route = trip_routes[trips[start]]
+            key = (route, tuple(stops[start:end].tolist()))
+            line = patterns.get(key)
+            if line is None:
+                line = patterns[key] = len(line_names)
+                name = route_names.get(route, route)
+                count = route_patterns[route] = route_patterns.get(route, 0) + 1
+                line_names.append(name if count == 1 else f"{name}_{count}")
+                line_stops.append(key[1])
+                schedules.append([])
+            # every trip keeps its departure, trips leaving in the same minute included
+            if not np.isnan(departures[start]):
+                schedules[line].append(int(departures[start]))
+
+        schedules = [sorted(s) for s in schedules]
+        return cls(
+            stop_ids=np.array(stop_ids, dtype=str),
+            lat=np.asarray(lat),
+            lon=np.asarray(lon),
+            line_names=np.array(line_names, dtype=str),
+            line_offsets=np.cumsum([0] + [len(s) for s in line_stops]),
+            line_stops=np.array([stop for s in line_stops for stop in s], dtype=np.int64),
+            schedule_offsets=np.cumsum([0] + [len(s) for s in schedules]),
+            schedule_minutes=np.array([m for s in schedules for m in s], dtype=np.int64),
+            connection_from=pairs // max(len(stop_ids), 1),
+            connection_to=pairs % max(len(stop_ids), 1),
+            connection_time=connection_time,
+        )
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, version=CACHE_VERSION, **{name: getattr(self, name) for name in self.FIELDS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != CACHE_VERSION:
+                return None
+            return cls(**{name: data[name] for name in cls.FIELDS})
+
+    def to_topology(self, capacity=60, wait_time=0, canvas=(700, 650), margin=25):
+        '''stop_locations, connections and bus_lines ready for SimulationConfig(**topology)'''
+        stop_ids = self.stop_ids.tolist()
+        # only stops served by some line enter the network
+        served = np.unique(self.line_stops)
+        x, y = self.lon, self.lat
+        if canvas is not None and len(served):
+            # project onto the renderer's canvas with equal scale on both axes, north up
+            width, height = canvas
+            span = max(np.ptp(self.lon[served]), np.ptp(self.lat[served])) or 1
+            scale = min(width - 2 * margin, height - 2 * margin) / span
+            x = margin + (self.lon - self.lon[served].min()) * scale
+            y = margin + (self.lat[served].max() - self.lat) * scale
+        stop_locations = {stop_ids[i]: (float(x[i]), float(y[i])) for i in served.tolist()}
+
+        connections = [
+            (stop_ids[a], stop_ids[b], max(1, round(float(t))), False)
+            for a, b, t in zip(self.connection_from.tolist(), self.connection_to.tolist(), self.connection_time.tolist())
+        ]
+
+        bus_lines = []
+        for i, name in enumerate(self.line_names.tolist()):
+            stops = self.line_stops[self.line_offsets[i]:self.line_offsets[i + 1]].tolist()
+            minutes = self.schedule_minutes[self.schedule_offsets[i]:self.schedule_offsets[i + 1]].tolist()
+            bus_lines.append({
+                "name": name,
+                "stops": [stop_ids[s] for s in stops],
+                "schedule": [f"{m // 60:02d}:{m % 60:02d}" for m in minutes],
+                "wait_time": wait_time,
+                "capacity": capacity,
+                # every GTFS trip is a single run, so vehicles retire at its last stop
+                "one_way": True,
+            })
+        return {"stop_locations": stop_locations, "connections": connections, "bus_lines": bus_lines}
+
+
+def load_gtfs(path, cache_dir=None, use_cache=True, service_date=None, service_ids=None, **topology_options):
+    '''parses a GTFS feed into SimulationConfig topology, reusing a binary cache keyed by the feed hash
+
+    a feed lists every service pattern (weekdays, weekends, holidays), service_date keeps the trips running
+    on that day and service_ids the trips of those services; with neither every trip ends up in one day
+    '''
+    feed = GTFSFeed(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".gtfs_cache")
+    if service_date is not None:
+        service_ids = active_services(feed, service_date)
+        if not service_ids:
+            raise ValueError(f"no service of the feed runs on {service_date}")
+    key = feed.hash()
+    if service_ids is not None:
+        service_ids = set(service_ids)
+        key += "_" + hashlib.sha1("\n".join(sorted(service_ids)).encode()).hexdigest()[:12]
+
+    network = None
+    cache_path = None
+    if use_cache:
+        cache_path = os.path.join(cache_dir, f"{key}.npz")
+        if os.path.exists(cache_path):
+            network = ParsedNetwork.load(cache_path)
+    if network is None:
+        network = ParsedNetwork.from_feed(feed, service_ids)
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            network.save(cache_path)
+    return network.to_topology(**topology_options)
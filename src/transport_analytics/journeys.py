@@ -0,0 +1,171 @@
+# journeys.py
+import math
+from bisect import bisect_left
+import numpy as np
+
+class Pattern:
+    '''one bus line in one direction: its stop ids and a trip x position table of boarding and arrival times'''
+
+    def __init__(self, line, direction, stops, boards, arrivals):
+        self.line = line
+        self.direction = direction
+        self.stops = stops
+        # inf marks a position a trip cannot be boarded at
+        self.boards = boards.tolist()
+        self.arrivals = arrivals.tolist()
+        # per position, boardable trips sorted by boarding time for bisect lookups
+        self.departures = []
+        for column in boards.T:
+            order = [trip for trip in np.argsort(column, kind="stable").tolist() if column[trip] < np.inf]
+            self.departures.append(([float(column[trip]) for trip in order], order))
+
+    def earliest_trip(self, position, time):
+        '''(boarding time, trip) of the first trip boardable at a position no earlier than time, or None'''
+        times, trips = self.departures[position]
+        i = bisect_left(times, time)
+        return (times[i], trips[i]) if i < len(times) else None
+
+
+class JourneyPlanner:
+    '''round-based (RAPTOR) earliest arrival search over the bus line timetable
+
+    itineraries are the stops a passenger gets off at, transfers first and the destination last,
+    cached per origin, destination and departure time bin
+    '''
+
+    def __init__(self, patterns, bin_minutes=15, max_transfers=3):
+        self.patterns = patterns
+        self.bin_minutes = bin_minutes
+        self.max_transfers = max_transfers
+        self.patterns_at = {}
+        for pattern in patterns:
+            seen = set()
+            for position, stop in enumerate(pattern.stops):
+                if stop not in seen:
+                    seen.add(stop)
+                    self.patterns_at.setdefault(stop, []).append((pattern, position))
+        self.cache = {}
+
+    @classmethod
+    def from_lines(cls, bus_lines, registry, travel_times, horizon, bin_minutes=15, max_transfers=3):
+        '''expands every scheduled vehicle of every line into timed trips, following Vehicle.vehicle_process'''
+        patterns = []
+        for line in bus_lines:
+            ids = [registry.register(stop) for stop in line.stops]
+            trips = {1: [], -1: []}
+            rows = {
+                1: [travel_times.edge_index.get((ids[i], ids[i + 1])) for i in range(len(ids) - 1)],
+                -1: [travel_times.edge_index.get((ids[i], ids[i - 1])) for i in range(len(ids) - 1, 0, -1)],
+            }
+            if len(ids) < 2 or None in rows[1] or None in rows[-1]:
+                continue
+            for departure in line.schedule:
+                for direction, boards, arrivals in cls.vehicle_trips(line, rows, departure, travel_times, horizon):
+                    trips[direction].append((boards, arrivals))
+            for direction, stops in ((1, ids), (-1, ids[::-1])):
+                if trips[direction]:
+                    boards, arrivals = (np.array(column) for column in zip(*trips[direction]))
+                    patterns.append(Pattern(line.name, direction, tuple(stops), boards, arrivals))
+        return cls(patterns, bin_minutes, max_transfers)
+
+    @staticmethod
+    def vehicle_trips(line, rows, departure, travel_times, horizon):
+        n = len(line.stops)
+        time = departure
+        direction = 1
+        legs = 0
+        terminal_board = np.inf
+        while time < horizon:
+            boards = np.full(n, np.inf)
+            arrivals = np.full(n, np.inf)
+            # the first leg leaves the depot without boarding, later legs board during the terminal wait
+            boards[0] = terminal_board
+            for k, row in enumerate(rows[direction]):
+                time += travel_times.lookup(row, time)
+                arrivals[k + 1] = time
+                if k + 1 < n - 1:
+                    boards[k + 1] = time
+                time += 1
+            legs += 1
+            yield direction, boards, arrivals
+
+            if line.one_way or (line.round_trips is not None and legs >= 2 * line.round_trips):
+                return
+            if line.service_end is not None and time >= line.service_end:
+                return
+            terminal_board = time + line.wait_time - 1 if line.wait_time > 0 else np.inf
+            time += line.wait_time
+            direction = -direction
+
+    def plan(self, origin, destination, now):
+        '''itinerary of stop ids for a passenger leaving origin at now; a direct trip when no timetable journey exists'''
+        key = (origin, destination, int(now) // self.bin_minutes)
+        itinerary = self.cache.get(key)
+        if itinerary is None:
+            itinerary = self.search(origin, destination, key[2] * self.bin_minutes)
+            self.cache[key] = itinerary
+        return itinerary
+
+    def search(self, origin, destination, departure):
+        inf = math.inf
+        best = {origin: departure}
+        # labels[k] is the earliest arrival at each stop using at most k rides
+        labels = [{origin: departure}]
+        parents = [{}]
+        marked = {origin}
+
+        for _ in range(self.max_transfers + 1):
+            previous = labels[-1]
+            current = dict(previous)
+            parent = {}
+
+            queue = {}
+            for stop in marked:
+                for pattern, position in self.patterns_at.get(stop, ()):
+                    if position < queue.get(pattern, inf):
+                        queue[pattern] = position
+            marked = set()
+
+            for pattern, start in queue.items():
+                stops = pattern.stops
+                arrivals = None
+                boards = None
+                boarded_at = None
+                for position in range(start, len(stops)):
+                    stop = stops[position]
+                    if arrivals is not None:
+                        arrival = arrivals[position]
+                        if arrival < best.get(stop, inf) and arrival < best.get(destination, inf):
+                            best[stop] = current[stop] = arrival
+                            parent[stop] = boarded_at
+                            marked.add(stop)
+
+                    # a stop reached in the previous round may catch an earlier trip of this pattern
+                    ready = previous.get(stop)
+                    if ready is not None and (boards is None or ready < boards[position]):
+                        found = pattern.earliest_trip(position, ready)
+                        if found is not None and (boards is None or found[0] < boards[position]):
+                            boards = pattern.boards[found[1]]
+                            arrivals = pattern.arrivals[found[1]]
+                            boarded_at = stop
+
+            labels.append(current)
+            parents.append(parent)
+            if not marked:
+                break
+
+        if destination not in best:
+            return (destination,)
+
+        # fewest rides among the journeys with the earliest arrival
+        arrival = best[destination]
+        rounds = next(k for k, label in enumerate(labels) if label.get(destination) == arrival)
+        itinerary = []
+        stop = destination
+        while stop != origin:
+            while stop not in parents[rounds]:
+                rounds -= 1
+            itinerary.append(stop)
+            stop = parents[rounds][stop]
+            rounds -= 1
+        return tuple(reversed(itinerary))
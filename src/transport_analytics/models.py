@@ -1,8 +1,23 @@
+import math
 import simpy
 import networkx as nx
-import random
+import numpy as np
 import time
 import threading
+from src.transport_analytics.routing import RoutingTable
+from src.transport_analytics.travel_time import TravelTimeModel
+from src.transport_analytics.journeys import JourneyPlanner
+from src.transport_analytics.rng import RandomStreams
+from src.transport_analytics.demand import ODSampler
+from src.transport_analytics.passengers import PassengerStore
+from src.transport_analytics.aggregates import SystemAggregates
+from src.transport_analytics.trajectory import TrajectoryRecorder
+from src.transport_analytics.storage import RunStore, SNAPSHOT_DTYPE
+from src.transport_analytics.events import EventLog, EventType, EventFormatter, Level, RingBufferSink, BinaryFileSink
+from src.transport_analytics.stops import StopRegistry, PassengerQueue, RouteIndex
+from src.transport_analytics.snapshots import SnapshotService, ConsoleStatusSink
+from src.transport_analytics.profiling import Profiler
+from src.transport_analytics import checkpoint
 
 def get_time(now):
     minutes = int(now) % 1440
@@ -15,38 +30,120 @@ def time_to_minutes(time_str):
     return hours * 60 + mins
 
 class Passenger:
+    '''lightweight handle onto one row of the network's columnar passenger store'''
+    __slots__ = ("id", "row", "store", "route", "destination_id", "itinerary", "leg", "target_id")
+
     def __init__(self, id, origin, destination, spawn_time, transport_net):
-        self.satisfaction = 100
         self.id = id
-        self.origin = origin
-        self.destination = destination
-        self.spawn_time = spawn_time
-        self.status = "waiting"
-        self.route = nx.dijkstra_path(transport_net.graph, origin, destination, weight='travel_time')
-
-        #cache routes
-        path_key = (origin, destination)
-        if path_key in transport_net.path_cache:
-            self.route = transport_net.path_cache[path_key]
-        else:
-            self.route = nx.dijkstra_path(transport_net.graph, origin, destination, weight='travel_time')
-            transport_net.path_cache[path_key] = self.route
+        self.store = transport_net.passengers
+        # the destination id is read on every boarding decision, so the handle keeps a copy
+        self.destination_id = transport_net.stops.register(destination)
+        self.row = self.store.add(
+            id if isinstance(id, int) else len(self.store),
+            transport_net.stops.register(origin),
+            self.destination_id,
+            spawn_time)
+        # routes are shared per OD pair through the path cache, never copied
+        self.route = transport_net.get_route(origin, destination)
+        self.set_itinerary((self.destination_id,))
+
+    @classmethod
+    def from_row(cls, transport_net, row, route=None, itinerary=None):
+        '''wraps an existing store row without adding a new record'''
+        p = cls.__new__(cls)
+        p.store = transport_net.passengers
+        p.row = row
+        p.id = int(p.store.id[row])
+        p.destination_id = int(p.store.destination[row])
+        p.route = route if route is not None else transport_net.get_route(p.origin, p.destination)
+        p.set_itinerary(itinerary or (p.destination_id,))
+        return p
+
+    def get_state(self):
+        return [self.row, list(self.itinerary), self.leg]
+
+    @classmethod
+    def from_state(cls, transport_net, state):
+        row, itinerary, leg = state
+        p = cls.from_row(transport_net, row, itinerary=tuple(itinerary))
+        p.leg = leg
+        p.target_id = p.itinerary[leg]
+        return p
+
+    def set_itinerary(self, itinerary):
+        '''stop ids the passenger gets off at, transfer stops first and the destination last'''
+        self.itinerary = itinerary
+        self.leg = 0
+        # queues and vehicles only look at the stop ending the current leg
+        self.target_id = itinerary[0]
+
+    def advance(self):
+        '''moves on to the next leg after reaching a transfer stop'''
+        self.leg += 1
+        self.target_id = self.itinerary[self.leg]
+
+    @property
+    def transfers(self):
+        return len(self.itinerary) - 1
+
+    @property
+    def origin(self):
+        return self.store.registry.names[self.store.origin[self.row]]
+
+    @property
+    def destination(self):
+        return self.store.registry.names[self.store.destination[self.row]]
+
+    @property
+    def spawn_time(self):
+        return float(self.store.spawn_time[self.row])
+
+    @property
+    def satisfaction(self):
+        return float(self.store.satisfaction[self.row])
+
+    @property
+    def status(self):
+        if self.store.board_time[self.row] != self.store.board_time[self.row]:
+            return "waiting"
+        if self.store.alight_time[self.row] != self.store.alight_time[self.row]:
+            return "traveling"
+        return "arrived"
 
     # def deduct_from_satisfaction(self):
     #     if self.satisfaction > 0:
     #         self.satisfaction -= 1
 
 class Vehicle:
-    def __init__(self, id, stops, transport_net, vehicle_capacity=30, wait_time=15):
+    # everything a checkpoint needs besides the riders, who are saved as passenger handle states
+    STATE_FIELDS = (
+        "id", "line", "route", "vehicle_capacity", "wait_time", "service_end", "round_trips",
+        "current_stop", "position_index", "progress", "direction", "in_transit", "link_departure",
+        "link_travel_time", "distance_traveled", "start_time", "legs_completed", "passengers_carried",
+        "stage", "wake_time", "remaining_wait", "one_way",
+    )
+
+    def __init__(self, id, stops, transport_net, vehicle_capacity=30, wait_time=15, service_end=None, round_trips=None,
+                 one_way=False, route_index=None):
         self.id = id
+        self.line = None
         self.route = stops
+        self.route_ids = [transport_net.stops.register(stop) for stop in stops]
+        # vehicles of a line share its index, a vehicle without one builds its own
+        self.route_index = route_index if route_index is not None else RouteIndex(self.route_ids)
         self.transport_net = transport_net
+        self.track_idx = transport_net.trajectories.register(id, vehicle_capacity)
+        self.link_rows = self.build_link_rows()
         self.current_stop = stops[0]
         self.passengers = []
         self.vehicle_capacity = vehicle_capacity
         self.position_index = 0
         self.progress = 0.0
         self.direction = 1
+        # the link being driven, positions along it are interpolated on demand
+        self.in_transit = False
+        self.link_departure = 0.0
+        self.link_travel_time = 0.0
         self.wait_time = wait_time
 
         self.distance_traveled = 0
@@ -54,137 +151,228 @@ class Vehicle:
         self.scheduled_arrivals = {}  # Track scheduled vs actual arrivals
         self.arrival_deviation = []
 
+        # service end: the vehicle retires at the first terminal reached after either limit
+        self.service_end = service_end
+        self.round_trips = round_trips
+        # a one-way run retires at the end of its first leg instead of turning around
+        self.one_way = one_way
+        self.legs_completed = 0
+        self.passengers_carried = 0
+
+        # what the vehicle process is waiting on, so a checkpoint can resume it mid-step
+        self.process = None
+        self.stage = None
+        self.wake_time = 0.0
+        self.remaining_wait = 0
+
+    def get_state(self):
+        state = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        state["route"] = list(self.route)
+        state["passengers"] = [p.get_state() for p in self.passengers]
+        return state
+
+    def set_state(self, state, restore_passenger):
+        for name in self.STATE_FIELDS:
+            if name not in ("id", "route"):
+                setattr(self, name, state[name])
+        self.passengers = [restore_passenger(p) for p in state["passengers"]]
+
+    def build_link_rows(self):
+        '''travel time table rows of the route links, indexed by direction and the position the link starts at'''
+        model = self.transport_net.travel_times
+        if model is None:
+            return None
+        ids = self.route_ids
+        forward = [model.edge_index.get((ids[i], ids[i + 1])) for i in range(len(ids) - 1)]
+        backward = [None] + [model.edge_index.get((ids[i], ids[i - 1])) for i in range(1, len(ids))]
+        return {1: forward, -1: backward}
+
+    def is_out_of_service(self, now):
+        if self.one_way:
+            return True
+        if self.round_trips is not None and self.legs_completed >= 2 * self.round_trips:
+            return True
+        return self.service_end is not None and now >= self.service_end
+
     def has_delay(self, current_stop, next_stop, current_minute):
+        model = self.transport_net.travel_times
+        if model is not None:
+            return model.travel_time(current_stop, next_stop, current_minute)
+        # without a travel time model fall back to the fixed rush hour windows
         is_rush = (420 <= current_minute <= 540) or (960 <= current_minute <= 1080)
         base_time = self.transport_net.graph[current_stop][next_stop]["travel_time"]
         is_busy = self.transport_net.graph[current_stop][next_stop]["busy"]
         return base_time * 1.5 if is_rush or is_busy else base_time
 
-    def record_position(self, env, stop_info, lat, lon, next_stop, in_transit=False, progress=0):
-
-        destination_counts = {}
-        for p in self.passengers:
-            if p.destination not in destination_counts:
-                destination_counts[p.destination] = 0
-            destination_counts[p.destination] += 1
-
-        self.transport_net.bus_tracks[self.id].append({
-            "time": int(env.now),
-            "stop": stop_info,
-            "lat": lat,
-            "lon": lon,
-            "direction": self.direction,
-            "passenger_count": len(self.passengers),
-            "vehicle_capacity": self.vehicle_capacity,
-            "destinations": dict(sorted(destination_counts.items())),
-            "next_stop": next_stop,
-            "in_transit": in_transit,
-            "progress": progress if in_transit else 0
-        })
-
-    def vehicle_process(self, env):
+    def record_position(self, env, stop, lat, lon, next_stop, in_transit=False, progress=0):
+        '''writes a trajectory sample; destination histograms are derived later from the passenger store'''
+        stops = self.transport_net.stops
+        self.transport_net.trajectories.record(
+            env.now, self.track_idx, lat, lon, len(self.passengers), self.direction,
+            stops.id_of(stop),
+            -1 if next_stop == "Terminal" else stops.id_of(next_stop),
+            in_transit, progress)
+
+    def vehicle_process(self, env, resume=None):
+        '''drives the route leg after leg; resume is the stage a vehicle restored from a checkpoint was suspended in'''
+        if resume is not None:
+            yield from self.resume_stage(env, resume)
         while True:
-            if self.direction == 1:
-                path_sequence = range(len(self.route) - 1)
-            else:
-                path_sequence = range(len(self.route) - 1, 0, -1)
-            for i in path_sequence:
-                current_stop = self.route[i]
-                if self.direction == 1:
-                    next_stop = self.route[i + 1]
-                else:
-                    next_stop = self.route[i - 1]
-
-                if self.direction != 1:
-                    self.transport_net.log_event(f"{self.id} departing from {current_stop} -> {next_stop}")
-                if not self.transport_net.graph.has_edge(current_stop, next_stop):
-                    raise KeyError(f"no connection between {current_stop} and {next_stop}")
-
-                travel_time = self.has_delay(current_stop, next_stop, env.now % 1440)
-
-                steps = 10
-                for step in range(steps):
-                    self.position_index = i
-                    self.progress = step / steps
-
-                    # record position during movement
-                    if current_stop in self.transport_net.stop_locations and next_stop in self.transport_net.stop_locations:
-                        lat, lon = self.get_coordinates()
-                        self.record_position(env,f"{current_stop} -> {next_stop}", lat, lon, next_stop, in_transit=True, progress=self.progress)
-
-                    yield env.timeout(travel_time / steps)
-
-                self.current_stop = next_stop
-                self.transport_net.log_event(f"{self.id} arrived at {next_stop}")
-
-                lat, lon = self.transport_net.stop_locations.get(next_stop, (None, None))
-
-                if self.direction == 1 and i + 2 < len(self.route):
-                    next_stop_value = self.route[i + 2]
-                elif self.direction == -1 and i - 2 >= 0:
-                    next_stop_value = self.route[i - 2]
-                else:
-                    next_stop_value = "Terminal"
-
-                # record position at the stop
-                self.record_position(env, next_stop, lat, lon, next_stop_value, in_transit=False)
-
-                exiting = [p for p in self.passengers if p.destination == next_stop]
-                exiting_count = len(exiting)
-                for p in exiting:
-                    self.transport_net.log_event(f"{p.id} gets off at {next_stop}")
-                    self.passengers.remove(p)
-                    self.transport_net.completed_passengers.append(p)
-
-                waiting = self.transport_net.passenger_queues[next_stop]
-                boarding = []
-
-                for p in waiting:
-                    if p.destination in self.route:
-                        passenger_idx = self.route.index(p.destination)
-                        stop_idx = self.route.index(next_stop)
-                        if (self.direction == 1 and passenger_idx > stop_idx) or (self.direction == -1 and passenger_idx < stop_idx):
-                            if len(self.passengers) < self.vehicle_capacity:
-                                boarding.append(p)
-                                self.passengers.append(p)
-                                self.transport_net.log_event(f"{p.id} boards at {next_stop}")
-
-                for p in boarding:
-                    self.transport_net.passenger_queues[next_stop].remove(p)
-
-                boarding_count = len(boarding)
-                self.transport_net.log_event(f"{self.id} arrived at {next_stop}: exiting {exiting_count}, boarding {boarding_count}")
-
-                # wait at each stop for one minute
-                self.transport_net.log_event(f"{self.id} is at {self.current_stop}")
-                yield env.timeout(1)
+            yield from self.drive_leg(env)
 
             # last stop
+            self.legs_completed += 1
+            if self.is_out_of_service(env.now):
+                self.transport_net.retire_vehicle(self)
+                return
+
             if len(self.route) > 1:
-                # board up to capacity
-                new_board = 0
-                q = self.transport_net.passenger_queues[self.current_stop]
-                while q and len(self.passengers) < self.vehicle_capacity:
-                    p = q.pop(0)
-                    self.passengers.append(p)
-                    new_board += 1
-                    self.transport_net.log_event(f"{p.id} boards at {self.current_stop}")
-
-                # boarding during wait
-                remaining_wait = self.wait_time
-                while remaining_wait > 0:
-                    q = self.transport_net.passenger_queues[self.current_stop]
-                    while q and len(self.passengers) < self.vehicle_capacity:
-                        p = q.pop(0)
-                        self.passengers.append(p)
-                        self.transport_net.log_event(f"{p.id} boards bus {self.id} at {self.current_stop} during wait")
-                    self.transport_net.log_event(
-                        f"{self.id} waiting at {self.current_stop} ({remaining_wait}m left), passengers: {len(self.passengers)}")
-                    yield env.timeout(1)
-                    remaining_wait -= 1
+                yield from self.terminal_wait(env, self.wait_time)
 
             self.direction *= -1
 
+    def resume_stage(self, env, stage):
+        '''finishes the step the vehicle was in when the checkpoint was taken'''
+        yield env.timeout(self.wake_time - env.now)
+        if stage == "transit":
+            self.arrive(env, self.position_index)
+            self.stage, self.wake_time = "dwell", env.now + 1
+            yield env.timeout(1)
+        elif stage == "terminal":
+            yield from self.terminal_wait(env, self.remaining_wait - 1, board_first=False)
+            self.direction *= -1
+
+    def drive_leg(self, env):
+        '''drives link after link from the current position to the terminal ahead'''
+        events = self.transport_net.events
+        terminal = len(self.route) - 1 if self.direction == 1 else 0
+        while self.position_index != terminal:
+            i = self.position_index
+            current_stop = self.route[i]
+            next_stop = self.route[i + self.direction]
+
+            if events.enabled[EventType.DEPART]:
+                events.emit(EventType.DEPART, env.now, self.track_idx, self.route_ids[i], self.route_ids[i + self.direction])
+            if not self.transport_net.graph.has_edge(current_stop, next_stop):
+                raise KeyError(f"no connection between {current_stop} and {next_stop}")
+
+            # the graph has no lengths, so distance is measured in free-flow travel minutes
+            model = self.transport_net.travel_times
+            if model is not None and self.link_rows is not None:
+                row = self.link_rows[self.direction][i]
+                travel_time = model.lookup(row, env.now)
+                self.distance_traveled += model.base[row]
+            else:
+                travel_time = self.has_delay(current_stop, next_stop, env.now % 1440)
+                self.distance_traveled += self.transport_net.graph[current_stop][next_stop]["travel_time"]
+
+            # one timeout per link, position_at interpolates along it when asked
+            self.progress = 0.0
+            self.link_departure = env.now
+            self.link_travel_time = travel_time
+            self.in_transit = True
+            self.stage, self.wake_time = "transit", env.now + travel_time
+            yield env.timeout(travel_time)
+            self.arrive(env, i)
+
+            # wait at each stop for one minute
+            self.stage, self.wake_time = "dwell", env.now + 1
+            yield env.timeout(1)
+
+    def arrive(self, env, i):
+        '''reaches the end of the link starting at position i: records the stop, lets riders off and boards'''
+        events = self.transport_net.events
+        self.in_transit = False
+        self.position_index = i + self.direction
+        next_stop = self.route[i + self.direction]
+        self.current_stop = next_stop
+
+        lat, lon = self.transport_net.stop_locations.get(next_stop, (None, None))
+
+        if self.direction == 1 and i + 2 < len(self.route):
+            next_stop_value = self.route[i + 2]
+        elif self.direction == -1 and i - 2 >= 0:
+            next_stop_value = self.route[i - 2]
+        else:
+            next_stop_value = "Terminal"
+
+        # record position at the stop
+        self.record_position(env, next_stop, lat, lon, next_stop_value, in_transit=False)
+
+        next_stop_id = self.route_ids[i + self.direction]
+        # only riders heading further along the route in this direction can board
+        ahead = self.route_index.ahead(i + self.direction, self.direction)
+        exiting = [p for p in self.passengers if p.target_id == next_stop_id]
+        exiting_count = len(exiting)
+        if exiting:
+            self.passengers = [p for p in self.passengers if p.target_id != next_stop_id]
+        store = self.transport_net.passengers
+        aggregates = self.transport_net.aggregates
+        queue = self.transport_net.passenger_queues[next_stop]
+        for p in exiting:
+            if p.target_id != p.destination_id:
+                p.advance()
+                if p.target_id in ahead:
+                    # the next leg continues on this vehicle
+                    self.passengers.append(p)
+                    exiting_count -= 1
+                    continue
+                if events.enabled[EventType.TRANSFER]:
+                    events.emit(EventType.TRANSFER, env.now, p.id, next_stop_id, self.track_idx)
+                aggregates.on_transfer(store.spawn_time[p.row], self.vehicle_capacity)
+                queue.append(p)
+                continue
+            if events.enabled[EventType.ALIGHT]:
+                events.emit(EventType.ALIGHT, env.now, p.id, next_stop_id, self.track_idx)
+            store.alight(p.row, env.now)
+            aggregates.on_alight(store.spawn_time[p.row], self.vehicle_capacity)
+
+        boarding = self.board_passengers(queue, ahead, env.now, next_stop_id)
+        if events.enabled[EventType.ARRIVE]:
+            events.emit(EventType.ARRIVE, env.now, self.track_idx, next_stop_id, exiting_count, len(boarding))
+
+    def terminal_wait(self, env, remaining_wait, board_first=True):
+        '''boards riders heading back along the route while waiting out the turnaround at the terminal'''
+        events = self.transport_net.events
+        q = self.transport_net.passenger_queues[self.current_stop]
+        terminal = len(self.route) - 1 if self.direction == 1 else 0
+        terminal_id = self.route_ids[terminal]
+        ahead = self.route_index.ahead(terminal, -self.direction)
+        if board_first:
+            # board up to capacity, anyone heading back along the route is eligible
+            self.board_passengers(q, ahead, env.now, terminal_id)
+
+        # boarding during wait
+        while remaining_wait > 0:
+            self.board_passengers(q, ahead, env.now, terminal_id)
+            if events.enabled[EventType.TERMINAL_WAIT]:
+                events.emit(EventType.TERMINAL_WAIT, env.now, self.track_idx, terminal_id, remaining_wait, len(self.passengers))
+            self.stage, self.wake_time, self.remaining_wait = "terminal", env.now + 1, remaining_wait
+            yield env.timeout(1)
+            remaining_wait -= 1
+
+    def board_passengers(self, queue, ahead, now, stop_id):
+        '''moves eligible riders from a stop queue onto the vehicle, up to its free capacity'''
+        boarding = queue.pop_for(ahead, self.vehicle_capacity - len(self.passengers))
+        store = self.transport_net.passengers
+        aggregates = self.transport_net.aggregates
+        events = self.transport_net.events
+        for p in boarding:
+            store.board(p.row, now, self.track_idx)
+            aggregates.on_board(store.spawn_time[p.row], self.vehicle_capacity)
+            if events.enabled[EventType.BOARD]:
+                events.emit(EventType.BOARD, now, p.id, stop_id, self.track_idx)
+        self.passengers_carried += len(boarding)
+        self.passengers.extend(boarding)
+        return boarding
+
+    def position_at(self, now):
+        '''coordinates at a simulated time, interpolated from the departure and travel time of the current link'''
+        if self.in_transit and self.link_travel_time > 0:
+            self.progress = min(1.0, (now - self.link_departure) / self.link_travel_time)
+        else:
+            self.progress = 0.0
+        return self.get_coordinates()
 
     def get_coordinates(self):
         idx = self.position_index
@@ -207,12 +395,18 @@ class Vehicle:
         return x, y
 
 class BusLine:
-    def __init__(self, name, stops, schedule, capacity, wait_time=5):
+    def __init__(self, name, stops, stop_ids, schedule, capacity, wait_time=5, service_end=None, round_trips=None,
+                 one_way=False):
         self.name = name
         self.stops = stops
         self.schedule = [time_to_minutes(t) for t in schedule]
         self.capacity = capacity
         self.wait_time = wait_time
+        self.service_end = time_to_minutes(service_end) if service_end is not None else None
+        self.round_trips = round_trips
+        self.one_way = one_way
+        # keyed by stop id like the queues vehicles board from, built once and shared by every departure
+        self.route_index = RouteIndex(stop_ids)
        
 
 class TransportNet:
@@ -220,20 +414,47 @@ class TransportNet:
         self.graph = nx.DiGraph()
         self.config = config
         self.vehicles = []
+        self.retired_vehicles = []
         self.env = simpy.Environment()
+        if config is not None:
+            self.rng = RandomStreams(config.seed, config.replica)
+        else:
+            self.rng = RandomStreams()
+        self.stops = StopRegistry()
         self.passenger_queues = {}
-        self.log_buffer = []
+        self.events = EventLog(Level.DEBUG)
+        self.event_buffer = None
         self.last_logged_minute = -1
         self.simulation_running = False
+        self.processes_started = False
+        self.finished = False
         self.bus_lines = []
         self.stop_locations = {}
-        self.bus_tracks = {}
-        self.stop_snapshots = {}
-
-        self.completed_passengers = []
-
-        self.completed_passengers = []
+        self.trajectories = TrajectoryRecorder(self.stops)
+        self.bus_tracks = self.trajectories
+        self.run_store = None
+        self.snapshots = SnapshotService(self)
+        self.stop_snapshots = self.snapshots.snapshots
+
+        self.passengers = PassengerStore(self.stops)
+        self.aggregates = SystemAggregates()
+        self.trajectories.passenger_store = self.passengers
         self.path_cache = {}
+        self.routing = None
+        self.od_sampler = None
+        self.travel_times = None
+        self.journeys = None
+        self.profiler = None
+        self.next_passenger_id = 0
+
+        # process handles and next wake times, what a checkpoint needs to restart each process
+        self.departures = []
+        self.loop_processes = {}
+        self.next_wake = {}
+        self.samplers = []
+        self.sample_interval = None
+        # objects with get_state/set_state saved along with the network, such as a metrics tracker
+        self.checkpoint_extras = {}
 
     def setup_transport_network(self):
         # add stop locations
@@ -242,6 +463,27 @@ class TransportNet:
         # initialise params from config
         self.satisfaction_decay_waiting = self.config.satisfaction_decay_waiting
         self.satisfaction_decay_traveling = self.config.satisfaction_decay_traveling
+        self.passengers.decay_waiting = self.satisfaction_decay_waiting
+        self.passengers.decay_traveling = self.satisfaction_decay_traveling
+        self.aggregates = SystemAggregates(self.satisfaction_decay_waiting, self.satisfaction_decay_traveling)
+        self.trajectories = TrajectoryRecorder(
+            self.stops,
+            sample_interval=self.config.trajectory_sample_interval,
+            retention=self.config.trajectory_retention)
+        self.trajectories.passenger_store = self.passengers
+        self.bus_tracks = self.trajectories
+
+        self.events.set_level(Level[self.config.event_log_level.upper()])
+        if self.config.event_log_file:
+            self.events.add_sink(BinaryFileSink(self.config.event_log_file))
+        self.snapshots = SnapshotService(
+            self,
+            interval=self.config.snapshot_interval,
+            delta=self.config.snapshot_delta,
+            retention=self.config.snapshot_retention)
+        self.stop_snapshots = self.snapshots.snapshots
+        if self.config.profiling:
+            self.profiler = Profiler(allocations=self.config.profile_allocations)
         self.rush_hour_traffic_factor = self.config.rush_hour_traffic_factor
         self.busy_route_factor = self.config.busy_route_factor
     
@@ -249,6 +491,9 @@ class TransportNet:
         for conn in self.config.connections:
             self.add_connection(conn[0], conn[1], conn[2], busy=conn[3])
         
+        # per-edge, per-time-bin travel times, built once the edges exist
+        self.travel_times = TravelTimeModel.from_config(self.graph, self.stops, self.config)
+
         # add buslines & capacity
         for line_config in self.config.bus_lines:
             self.add_bus_line(
@@ -256,123 +501,482 @@ class TransportNet:
                 stops=line_config["stops"],
                 schedule=line_config["schedule"],
                 capacity=line_config.get("capacity", 60),
-                wait_time=line_config["wait_time"]
+                wait_time=line_config["wait_time"],
+                service_end=line_config.get("service_end"),
+                round_trips=line_config.get("round_trips"),
+                one_way=line_config.get("one_way", False)
             )
-        
+
+        # all-pairs routing table, each origin's row is built the first time a route leaves from it
+        self.routing = RoutingTable(self.graph, self.stops)
+        self.od_sampler = self.build_od_sampler()
+        if self.config.journey_planner:
+            self.journeys = JourneyPlanner.from_lines(
+                self.bus_lines, self.stops, self.travel_times, self.config.simulation_duration,
+                self.config.journey_bin_minutes, self.config.max_transfers)
+
+    def build_od_sampler(self):
+        '''OD pairs are drawn within connected parts of the network, a feed can have islands no line links'''
+        stops = list(self.graph.nodes())
+        component_of = {stop: i for i, component in enumerate(nx.strongly_connected_components(self.graph))
+                        for stop in component}
+        components = [component_of[stop] for stop in stops]
+        od_matrix = self.config.od_matrix
+        if od_matrix is not None:
+            return ODSampler.from_mapping(self.stops, stops, od_matrix, components)
+        return ODSampler([self.stops.register(stop) for stop in stops], components=components)
+
+    def spawn_passengers(self, origins, destinations):
+        '''materialises a batch of passengers from arrays of origin and destination stop ids and queues them'''
+        names = self.stops.names
+        now = self.env.now
+        first_id = self.next_passenger_id
+        self.next_passenger_id += len(origins)
+        rows = self.passengers.add_batch(range(first_id, self.next_passenger_id), origins, destinations, now)
+        self.aggregates.on_spawn(now, len(rows))
+
+        spawned = []
+        journeys = self.journeys
+        for row, origin, destination in zip(rows, origins.tolist(), destinations.tolist()):
+            itinerary = journeys.plan(origin, destination, now) if journeys is not None else None
+            p = Passenger.from_row(self, row, self.get_route(names[origin], names[destination]), itinerary)
+            self.passenger_queues[names[origin]].append(p)
+            if self.events.enabled[EventType.SPAWN]:
+                self.events.emit(EventType.SPAWN, now, p.id, origin, destination)
+            spawned.append(p)
+        return spawned
+
+    @property
+    def completed_passengers(self):
+        '''handles for every passenger that finished a trip, rebuilt from the passenger store'''
+        return [Passenger.from_row(self, row) for row in self.passengers.completed_rows().tolist()]
 
     def add_connection(self, A, B, travel_time, busy=False):
         '''defines a new connection between stops on a busline'''
         self.graph.add_edge(A, B, travel_time=travel_time, busy=busy)
         self.graph.add_edge(B, A, travel_time=travel_time, busy=busy)
-        if A not in self.passenger_queues:
-            self.passenger_queues[A] = []
-        if B not in self.passenger_queues:
-            self.passenger_queues[B] = []
-
-    def add_bus_line(self, name, stops, schedule, capacity, wait_time=5):
+        for stop in (A, B):
+            if stop not in self.passenger_queues:
+                self.stops.register(stop)
+                self.passenger_queues[stop] = PassengerQueue()
+        # topology changed, the routing table and the connected parts OD pairs come from are rebuilt from scratch
+        self.routing = None
+        self.od_sampler = None
+        self.path_cache.clear()
+        if self.travel_times is not None:
+            # appended rows leave existing indices alone, so vehicles' cached link rows stay valid
+            model = self.travel_times
+            multipliers = model.config_row(self.config, busy)
+            rows = [model.add_edge(a, b, travel_time, multipliers) for a, b in ((A, B), (B, A))]
+            if model.profile is not None:
+                model.apply_profile(((model.registry.id_of(a), model.registry.id_of(b)), row)
+                                    for (a, b), row in zip(((A, B), (B, A)), rows))
+
+    def update_travel_time(self, A, B, travel_time):
+        '''changes the travel time of an existing connection and refreshes only the affected routing rows'''
+        old_time = self.graph[A][B]["travel_time"]
+        self.graph[A][B]["travel_time"] = travel_time
+        self.graph[B][A]["travel_time"] = travel_time
+        if self.travel_times is not None:
+            self.travel_times.set_base(A, B, travel_time)
+            self.travel_times.set_base(B, A, travel_time)
+        if self.routing is None:
+            return
+
+        affected = self.routing.update_edge(A, B, old_time, travel_time)
+        affected |= self.routing.update_edge(B, A, old_time, travel_time)
+        if affected:
+            self.path_cache = {key: route for key, route in self.path_cache.items() if affected.isdisjoint(route)}
+
+    def get_route(self, origin, destination):
+        '''looks up the shortest route between two stops, building the routing table on first use'''
+        path_key = (origin, destination)
+        route = self.path_cache.get(path_key)
+        if route is None:
+            if self.routing is None:
+                self.routing = RoutingTable(self.graph, self.stops)
+            route = self.routing.route(origin, destination)
+            self.path_cache[path_key] = route
+        return route
+
+    def add_bus_line(self, name, stops, schedule, capacity, wait_time=5, service_end=None, round_trips=None, one_way=False):
         '''defines a new busline in the simulation'''
-        self.bus_lines.append(BusLine(name, stops, schedule, capacity, wait_time))
+        stop_ids = [self.stops.register(stop) for stop in stops]
+        self.bus_lines.append(BusLine(name, stops, stop_ids, schedule, capacity, wait_time, service_end, round_trips, one_way))
 
     def schedule_vehicles(self):
-        for line in self.bus_lines:
+        for index, line in enumerate(self.bus_lines):
             for dep_time in line.schedule:
-                self.env.process(self.create_vehicle(line, dep_time))
+                self.schedule_departure(index, dep_time)
 
-    def create_vehicle(self, line, departure_time):
-        yield self.env.timeout(departure_time)
-        vehicle_id = f"{line.name}_{get_time(departure_time)}"
+    def schedule_departure(self, line_index, departure_time, delay=None):
+        line = self.bus_lines[line_index]
+        process = self.start_process(self.create_vehicle(line, departure_time, delay), "vehicles", line.name)
+        self.departures.append((process, line_index, departure_time))
 
-        vehicle = Vehicle(vehicle_id, line.stops, self, wait_time=line.wait_time)
+    def create_vehicle(self, line, departure_time, delay=None):
+        yield self.env.timeout(departure_time if delay is None else delay)
+        vehicle_id = f"{line.name}_{get_time(departure_time)}"
+        # trips of a line leaving in the same minute are numbered so each keeps its own track
+        repeat = 1
+        while vehicle_id in self.trajectories:
+            repeat += 1
+            vehicle_id = f"{line.name}_{get_time(departure_time)}_{repeat}"
+
+        vehicle = Vehicle(vehicle_id, line.stops, self, wait_time=line.wait_time,
+                          service_end=line.service_end, round_trips=line.round_trips, one_way=line.one_way,
+                          route_index=line.route_index)
+        vehicle.line = line.name
         self.vehicles.append(vehicle)
-        self.bus_tracks[vehicle_id] = []
-        self.env.process(vehicle.vehicle_process(self.env))
+        vehicle.process = self.start_process(vehicle.vehicle_process(self.env), "vehicles", line.name)
+
+    def retire_vehicle(self, vehicle):
+        '''takes a vehicle out of the active list and archives a summary of its service'''
+        self.vehicles.remove(vehicle)
+        self.retired_vehicles.append({
+            "id": vehicle.id,
+            "start_time": vehicle.start_time,
+            "end_time": self.env.now,
+            "round_trips": vehicle.legs_completed / 2,
+            "distance_traveled": vehicle.distance_traveled,
+            "passengers_carried": vehicle.passengers_carried,
+            "vehicle_capacity": vehicle.vehicle_capacity,
+        })
+        if self.events.enabled[EventType.RETIRE]:
+            self.events.emit(EventType.RETIRE, self.env.now, vehicle.track_idx, self.stops.id_of(vehicle.current_stop))
 
-    def passenger_generator(self, interval=5, peak_hours=(7*60, 9*60, 16*60, 18*60)):
+    def passenger_generator(self, interval=5, peak_hours=(7*60, 9*60, 16*60, 18*60), resume_at=None):
         '''generates passengers on the stops; number of generated passengers depends on the hour - rush hours yield more passengers'''
-        id = 0
+        if self.od_sampler is None:
+            self.od_sampler = self.build_od_sampler()
+        batch_size = self.config.passengers_per_spawn
+
+        if resume_at is not None:
+            # restored from a checkpoint, the interval up to this spawn was drawn before it was taken
+            yield self.env.timeout(resume_at - self.env.now)
+            origins, destinations = self.od_sampler.sample(self.rng.od, batch_size)
+            self.spawn_passengers(origins, destinations)
 
         while True:
             current_minute = self.env.now % 1440
             is_peak = (peak_hours[0] <= current_minute <= peak_hours[1]) or (peak_hours[2] <= current_minute <= peak_hours[3])
             is_night = 0 <= current_minute <= 4 * 60
             
+            arrivals = self.rng.arrivals
             if is_peak:
-                spawn_interval = random.randint(1, max(1, interval // 2))
+                spawn_interval = int(arrivals.integers(1, max(1, interval // 2), endpoint=True))
             elif is_night:
-                spawn_interval = random.randint(10, 30)
+                spawn_interval = int(arrivals.integers(10, 30, endpoint=True))
             else:
-                spawn_interval = random.randint(5, 10)
+                spawn_interval = int(arrivals.integers(5, 10, endpoint=True))
             
+            self.next_wake["passenger_generator"] = self.env.now + spawn_interval
             yield self.env.timeout(spawn_interval)
 
-            for _ in range(5):
-                origin, destination = random.sample(list(self.graph.nodes()), 2)
-                p = Passenger(f"Passenger{id}", origin, destination, self.env.now, transport_net=self)
-                self.passenger_queues[origin].append(p)
-                self.log_event(f"{p.id} appears at {origin} -> {destination}")
-                id += 1
+            # the whole batch of arrivals for this interval is drawn in one call
+            origins, destinations = self.od_sampler.sample(self.rng.od, batch_size)
+            self.spawn_passengers(origins, destinations)
+
+    def report_status(self, resume_at=None):
+        yield from self.snapshots.process(resume_at)
+
+    def drain_event_messages(self):
+        '''formats and clears the events buffered for console reports'''
+        if self.event_buffer is None:
+            return []
+        formatter = EventFormatter(self)
+        return [formatter(*event) for event in self.event_buffer.drain()]
 
-    def report_status(self):
+    def start_processes(self, report=False):
+        '''starts vehicle scheduling and passenger generation, plus the console status report if requested'''
+        self.processes_started = True
+        self.schedule_vehicles()
+        self.start_loop("passenger_generator")
+        self.start_loop("trajectories")
+        if report:
+            self.start_loop("report_status")
+
+    def start_loop(self, name, resume_at=None):
+        '''starts one of the network's periodic processes, at resume_at when restoring a checkpoint'''
+        if name == "passenger_generator":
+            generator = self.passenger_generator(
+                interval=self.config.passenger_generation_interval,
+                peak_hours=self.config.peak_hours,
+                resume_at=resume_at)
+        elif name == "trajectories":
+            generator = self.trajectory_process(self.config.trajectory_sample_interval or 1, resume_at)
+        elif name == "report_status":
+            if self.event_buffer is None:
+                self.event_buffer = self.events.add_sink(RingBufferSink())
+            if self.config is None or self.config.status_output != "silent":
+                self.snapshots.sink = ConsoleStatusSink(self)
+            generator = self.report_status(resume_at)
+        elif name == "metrics":
+            generator = self.sampling_process(self.sample_interval, resume_at)
+        else:
+            raise ValueError(f"unknown process {name}")
+        self.loop_processes[name] = self.start_process(generator, name)
+
+    def start_process(self, generator, subsystem, *frames):
+        '''env.process, wrapped so the profiler charges its time to the subsystem when profiling is on'''
+        if self.profiler is not None:
+            generator = self.profiler.wrap(generator, subsystem, *frames)
+        return self.env.process(generator)
+
+    def advance(self, until):
+        '''env.run up to until, timed by the profiler when profiling is on'''
+        if self.profiler is None:
+            self.env.run(until=until)
+        else:
+            self.profiler.run(self.env, until)
+
+    def trajectory_process(self, interval, resume_at=None):
+        '''samples the interpolated position of every vehicle between stops once per interval'''
+        locations = self.stop_locations
+        if resume_at is not None:
+            yield self.env.timeout(resume_at - self.env.now)
         while True:
-            print(f"\n=== Status Report at {get_time(self.env.now)} ===")
-
-            # record passenger queue information for visualization
-            current_time = int(self.env.now)
-            self.stop_snapshots[current_time] = {}
-
-            # report on bus stops
-            for stop in sorted(self.passenger_queues):
-                passengers = self.passenger_queues[stop]
-                dest_counts = {}
-                for p in passengers:
-                    if p.destination not in dest_counts:
-                        dest_counts[p.destination] = 0
-                    dest_counts[p.destination] += 1
-                dest_str = ", ".join([f"{k}: {v}" for k, v in dest_counts.items()])
-                passengers_info = "No passengers"
-                if len(dest_counts) > 0:
-                    passengers_info = f"{len(passengers)} waiting - {dest_str}"
-                print(f"Bus stop {stop}: {passengers_info}")
-
-                # store for visualization
-                self.stop_snapshots[current_time][stop] = {
-                    "count": len(passengers),
-                    "destinations": dict(sorted(dest_counts.items()))
-                }
-
-            # report on vehicles
+            now = self.env.now
             for vehicle in self.vehicles:
-                print(f"Line {vehicle.id}: {vehicle.current_stop}, direction: {vehicle.direction}, "
-                      f"passengers: {len(vehicle.passengers)}/{vehicle.vehicle_capacity}")
-            if self.log_buffer:
-                print("\n--- Log Buffer ---")
-                for msg in self.log_buffer:
-                    print(msg)
-                self.log_buffer.clear()
-            print("================================\n")
-            yield self.env.timeout(1)
-
-    def log_event(self, message):
-        self.log_buffer.append(message)
+                if not vehicle.in_transit:
+                    continue
+                current_stop = vehicle.route[vehicle.position_index]
+                next_stop = vehicle.route[vehicle.position_index + vehicle.direction]
+                if current_stop in locations and next_stop in locations:
+                    lat, lon = vehicle.position_at(now)
+                    vehicle.record_position(self.env, current_stop, lat, lon, next_stop, in_transit=True, progress=vehicle.progress)
+            self.next_wake["trajectories"] = now + interval
+            yield self.env.timeout(interval)
+
+    def sampling_process(self, interval, resume_at=None):
+        '''calls every hook in samplers once per interval of simulated time'''
+        if resume_at is not None:
+            yield self.env.timeout(resume_at - self.env.now)
+            for sampler in self.samplers:
+                sampler()
+        while True:
+            self.next_wake["metrics"] = self.env.now + interval
+            yield self.env.timeout(interval)
+            for sampler in self.samplers:
+                sampler()
+
+    def run_batch(self, until=None, sample_interval=10, samplers=()):
+        '''runs the simulation headless up to the horizon - no printing, sleeping or threads
+
+        with checkpoint_interval and checkpoint_path set, the run stops at every multiple of the interval
+        to save a checkpoint there
+        '''
+        if until is None:
+            until = self.config.simulation_duration
+        if not self.processes_started:
+            self.start_processes()
+        if self.config.persist_run and self.run_store is None:
+            self.attach_store(RunStore.create(self.config.report_directory), self.config.persist_interval)
+        if samplers:
+            # samplers replace those of an earlier call, a restored run keeps its sampling cadence
+            self.samplers = list(samplers)
+            if "metrics" not in self.loop_processes:
+                self.sample_interval = sample_interval
+                self.start_loop("metrics")
+
+        interval = self.config.checkpoint_interval
+        if interval and self.config.checkpoint_path:
+            while self.env.now < until:
+                boundary = min(until, (self.env.now // interval + 1) * interval)
+                self.advance(boundary)
+                if boundary < until:
+                    self.save_checkpoint(self.config.checkpoint_path)
+        elif self.env.now < until:
+            self.advance(until)
+
+        if self.env.now >= self.config.simulation_duration:
+            self.finish()
+        elif self.run_store is not None:
+            self.flush_store()
+        return self
+
+    def finish(self):
+        '''ends a batch run that reached simulation_duration: the samplers take their last sample, the run store
+        gets its last flush and is closed, and so are the event log's sinks, such as the binary event file'''
+        if self.finished:
+            return self
+        self.finished = True
+        # env.run(until) stops short of the events at the horizon, the sampling loop never fires there
+        for sampler in self.samplers:
+            sampler()
+        if self.run_store is not None:
+            self.flush_store()
+            self.run_store.close()
+        self.events.close()
+        return self
+
+    def checkpoint(self):
+        '''the dynamic state of the run as plain values: clock, random streams, passengers, queues, vehicles
+        and where every process is suspended; take it between env.run calls, not from inside a process'''
+        order = checkpoint.pending_order(self.env)
+
+        def wake_order(process):
+            return order.get(id(process.target), (math.inf,))
+
+        processes = []
+        for process, line_index, departure_time in self.departures:
+            if process.is_alive:
+                processes.append((wake_order(process), "departure", [line_index, departure_time]))
+        for i, vehicle in enumerate(self.vehicles):
+            if vehicle.process is not None and vehicle.process.is_alive:
+                processes.append((wake_order(vehicle.process), "vehicle", i))
+        # the snapshot service keeps its own next wake-up
+        next_wake = dict(self.next_wake, report_status=self.snapshots.next_take)
+        for name, process in self.loop_processes.items():
+            if process.is_alive:
+                processes.append((wake_order(process), name, next_wake.get(name)))
+        # restarting in the order simpy would have resumed them keeps ties at equal times deterministic
+        processes.sort(key=lambda entry: entry[0])
+
+        return {
+            "config_hash": self.config.content_hash(),
+            "network_hash": self.config.network_hash(),
+            "now": self.env.now,
+            "rng": self.rng.get_state(),
+            "next_passenger_id": self.next_passenger_id,
+            "passengers": self.passengers.get_state(),
+            "queues": {stop: queue.get_state() for stop, queue in self.passenger_queues.items()},
+            "vehicles": [vehicle.get_state() for vehicle in self.vehicles],
+            "retired_vehicles": self.retired_vehicles,
+            "aggregates": self.aggregates.get_state(),
+            "trajectories": self.trajectories.get_state(),
+            "snapshots": self.snapshots.get_state(),
+            "sample_interval": self.sample_interval,
+            "processes": [[kind, payload] for _, kind, payload in processes],
+            "extras": {name: extra.get_state() for name, extra in self.checkpoint_extras.items()},
+        }
+
+    def restore(self, state, strict=True):
+        '''loads a checkpoint into a network set up from the same config, before any of its processes started;
+        strict refuses a checkpoint taken under a different config, otherwise only the network has to match
+        and the settings of this config apply from the checkpoint time on'''
+        if self.processes_started:
+            raise RuntimeError("restore needs a network whose processes have not started")
+        if state["network_hash"] != self.config.network_hash():
+            raise ValueError("checkpoint was taken on a different network")
+        if strict and state["config_hash"] != self.config.content_hash():
+            raise ValueError("checkpoint was taken with a different configuration")
+
+        self.env = simpy.Environment(initial_time=state["now"])
+        self.rng.set_state(state["rng"])
+        self.next_passenger_id = state["next_passenger_id"]
+        self.passengers.set_state(state["passengers"])
+        self.aggregates.set_state(state["aggregates"])
+        self.trajectories.set_state(state["trajectories"])
+        self.snapshots.set_state(state["snapshots"])
+        self.retired_vehicles = list(state["retired_vehicles"])
+
+        def restore_passenger(passenger_state):
+            return Passenger.from_state(self, passenger_state)
+
+        for stop, queue_state in state["queues"].items():
+            self.passenger_queues.setdefault(stop, PassengerQueue()).set_state(queue_state, restore_passenger)
+
+        self.vehicles = []
+        lines = {line.name: line for line in self.bus_lines}
+        for vehicle_state in state["vehicles"]:
+            line = lines.get(vehicle_state["line"])
+            vehicle = Vehicle(vehicle_state["id"], vehicle_state["route"], self,
+                              vehicle_capacity=vehicle_state["vehicle_capacity"],
+                              route_index=line.route_index if line is not None else None)
+            vehicle.set_state(vehicle_state, restore_passenger)
+            self.vehicles.append(vehicle)
+
+        saved = state["aggregates"]
+        if (saved["waiting"]["decay"], saved["onboard"]["decay"]) != (self.satisfaction_decay_waiting,
+                                                                      self.satisfaction_decay_traveling):
+            # the saved bins were aged out under the old decay's horizon, recount the riders under the new one
+            self.aggregates.rebuild(
+                [p.spawn_time for queue in self.passenger_queues.values() for p in queue],
+                [p.spawn_time for vehicle in self.vehicles for p in vehicle.passengers])
+
+        for name, extra_state in state["extras"].items():
+            if name in self.checkpoint_extras:
+                self.checkpoint_extras[name].set_state(extra_state)
+
+        # every process comes back suspended where it was, in its original wake-up order
+        self.processes_started = True
+        self.sample_interval = state["sample_interval"]
+        now = self.env.now
+        for kind, payload in state["processes"]:
+            if kind == "departure":
+                line_index, departure_time = payload
+                self.schedule_departure(line_index, departure_time, delay=departure_time - now)
+            elif kind == "vehicle":
+                vehicle = self.vehicles[payload]
+                vehicle.process = self.start_process(
+                    vehicle.vehicle_process(self.env, resume=vehicle.stage), "vehicles", vehicle.line or vehicle.id)
+            else:
+                self.start_loop(kind, resume_at=payload)
+        return self
+
+    def fork(self, state=None, **overrides):
+        '''a new network continuing this run, or the checkpoint state, under the config with overrides applied
+
+        warm up once and fork every scenario from it instead of simulating the same quiet hours for each;
+        overrides take effect from the fork time, the warm-up itself ran under this network's config
+        '''
+        fork = TransportNet(self.config.copy_with(**overrides))
+        fork.setup_transport_network()
+        return fork.restore(self.checkpoint() if state is None else state, strict=False)
+
+    def save_checkpoint(self, path):
+        checkpoint.save(path, self.checkpoint())
+        return path
+
+    def restore_checkpoint(self, path, strict=True):
+        return self.restore(checkpoint.load(path), strict)
+
+    def attach_store(self, store, interval=60):
+        '''streams positions, stop queue snapshots and finished trips to a RunStore every interval minutes'''
+        self.run_store = store
+        self.start_process(self.persist_process(interval), "persistence")
+        return store
+
+    def persist_process(self, interval):
+        while True:
+            yield self.env.timeout(interval)
+            if self.run_store.closed:
+                return
+            self.flush_store()
+
+    def flush_store(self):
+        '''moves everything recorded since the last flush out of memory and into the run store'''
+        store = self.run_store
+        snapshot = np.empty(len(self.passenger_queues), dtype=SNAPSHOT_DTYPE)
+        for i, (stop, queue) in enumerate(self.passenger_queues.items()):
+            snapshot[i] = (self.env.now, self.stops.id_of(stop), len(queue))
+        store.append("stop_snapshots", snapshot)
+        store.append("positions", self.trajectories.drain())
+
+        # finished trips leave the passenger store, riders still in the system keep valid handles
+        live = [p for queue in self.passenger_queues.values() for p in queue]
+        live += [p for vehicle in self.vehicles for p in vehicle.passengers]
+        store.append("trips", self.passengers.compact(live))
+
+        store.sync(stops=list(self.stops.names), vehicle_ids=list(self.trajectories.vehicle_ids), sim_time=self.env.now)
 
     def run_env(self):
         for v in self.vehicles:
-            self.env.process(v.vehicle_process(self.env))
-        self.env.process(self.passenger_generator())
-        self.env.process(self.report_status())
-        self.schedule_vehicles()
+            v.process = self.start_process(v.vehicle_process(self.env), "vehicles")
+        self.start_processes(report=True)
 
         def clock_tick():
             while self.simulation_running:
-                self.env.run(until=self.env.now + 1)
+                self.advance(self.env.now + 1)
 
                 print(f"[{get_time(self.env.now)}]", end='')
 
-                if self.log_buffer:
+                messages = self.drain_event_messages()
+                if messages:
                     print()
-                    for msg in self.log_buffer:
+                    for msg in messages:
                         print(msg)
-                    self.log_buffer = []
                 else:
                     print(" ...")
 
@@ -0,0 +1,131 @@
+# passengers.py
+import numpy as np
+
+COLUMNS = {
+    "id": np.int64,
+    "origin": np.int32,
+    "destination": np.int32,
+    "spawn_time": np.float64,
+    "board_time": np.float64,
+    "alight_time": np.float64,
+    "satisfaction": np.float32,
+    "vehicle": np.int32,  # trajectory index of the vehicle ridden, -1 before boarding
+}
+
+RECORD_DTYPE = np.dtype([(name, dtype) for name, dtype in COLUMNS.items()])
+
+class PassengerStore:
+    '''columnar table of passenger records; stop columns hold registry ids and unset times are NaN'''
+
+    def __init__(self, registry, capacity=1024, decay_waiting=0.5, decay_traveling=0.2):
+        self.registry = registry
+        self.decay_waiting = decay_waiting
+        self.decay_traveling = decay_traveling
+        self.size = 0
+        self.capacity = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self.reserve(capacity)
+
+    def reserve(self, capacity):
+        '''grows every column to hold at least capacity rows, doubling to keep appends amortised O(1)'''
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for name, dtype in COLUMNS.items():
+            column = np.empty(capacity, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def add(self, id, origin, destination, spawn_time):
+        '''appends one passenger and returns its row'''
+        row = self.size
+        self.reserve(row + 1)
+        self.id[row] = id
+        self.origin[row] = origin
+        self.destination[row] = destination
+        self.spawn_time[row] = spawn_time
+        self.board_time[row] = np.nan
+        self.alight_time[row] = np.nan
+        self.satisfaction[row] = 100
+        self.vehicle[row] = -1
+        self.size += 1
+        return row
+
+    def add_batch(self, ids, origins, destinations, spawn_time):
+        '''appends a batch of passengers spawned at the same time and returns their rows'''
+        start = self.size
+        stop = start + len(origins)
+        self.reserve(stop)
+        self.id[start:stop] = ids
+        self.origin[start:stop] = origins
+        self.destination[start:stop] = destinations
+        self.spawn_time[start:stop] = spawn_time
+        self.board_time[start:stop] = np.nan
+        self.alight_time[start:stop] = np.nan
+        self.satisfaction[start:stop] = 100
+        self.vehicle[start:stop] = -1
+        self.size = stop
+        return range(start, stop)
+
+    def board(self, row, time, vehicle=-1):
+        '''sets the vehicle ridden; a transfer keeps the first board time, so waiting is only counted before it'''
+        if self.board_time[row] != self.board_time[row]:
+            self.board_time[row] = time
+        self.vehicle[row] = vehicle
+
+    def alight(self, row, time):
+        '''closes the trip and stores the final satisfaction score'''
+        self.alight_time[row] = time
+        spawn = self.spawn_time[row]
+        board = self.board_time[row]
+        if np.isnan(board):
+            board = spawn
+        score = 100 - (board - spawn) * self.decay_waiting - (time - board) * self.decay_traveling
+        self.satisfaction[row] = max(0.0, score)
+
+    def column(self, name):
+        '''view of the filled part of a column, no copy'''
+        return getattr(self, name)[:self.size]
+
+    def compact(self, handles):
+        '''removes finished trips from the columns and returns them as records; live handles get their new rows'''
+        n = self.size
+        done = ~np.isnan(self.alight_time[:n])
+        finished = np.empty(int(done.sum()), dtype=RECORD_DTYPE)
+        for name in COLUMNS:
+            finished[name] = getattr(self, name)[:n][done]
+        if not len(finished):
+            return finished
+
+        keep = np.flatnonzero(~done)
+        new_rows = np.full(n, -1, dtype=np.int64)
+        new_rows[keep] = np.arange(len(keep))
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self.size = len(keep)
+
+        for handle in handles:
+            handle.row = int(new_rows[handle.row])
+        return finished
+
+    def get_state(self):
+        return {"size": self.size, "columns": {name: self.column(name).copy() for name in COLUMNS}}
+
+    def set_state(self, state):
+        self.size = 0
+        self.reserve(state["size"])
+        for name in COLUMNS:
+            getattr(self, name)[:state["size"]] = state["columns"][name]
+        self.size = state["size"]
+
+    def completed_rows(self):
+        return np.flatnonzero(~np.isnan(self.alight_time[:self.size]))
+
+    def __len__(self):
+        return self.size
+
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
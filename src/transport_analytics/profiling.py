@@ -0,0 +1,148 @@
+# profiling.py
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+class SubsystemStats:
+    __slots__ = ("processes", "events", "wall", "allocated")
+
+    def __init__(self):
+        self.processes = 0
+        self.events = 0
+        self.wall = 0.0
+        self.allocated = 0
+
+
+class Profiler:
+    '''opt-in counters for simpy processes: wall time, resumes and net allocated bytes per subsystem
+
+    processes are wrapped when they start, so a network without a profiler pays nothing per event
+    '''
+
+    SCHEDULER = "simpy scheduler"
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.stats = {}
+        # folded stack -> seconds, the input format of flamegraph.pl and speedscope
+        self.stacks = {}
+        # wall time spent inside env.run, the part not in any process is simpy's own
+        self.elapsed = 0.0
+
+    def subsystem(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = SubsystemStats()
+        return stats
+
+    def wrap(self, generator, subsystem, *frames):
+        '''a generator that drives the process generator and charges every resume to the subsystem'''
+        stats = self.subsystem(subsystem)
+        stats.processes += 1
+        stack = ";".join(("simulation", subsystem, generator.__name__) + frames)
+        self.stacks.setdefault(stack, 0.0)
+        return self._drive(generator, stats, stack)
+
+    def _drive(self, generator, stats, stack):
+        clock = time.perf_counter
+        traced = tracemalloc.get_traced_memory if self.allocations else None
+        stacks = self.stacks
+        value, error = None, None
+        while True:
+            before = traced()[0] if traced else 0
+            start = clock()
+            try:
+                event = generator.send(value) if error is None else generator.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                elapsed = clock() - start
+                stats.events += 1
+                stats.wall += elapsed
+                stacks[stack] += elapsed
+                if traced:
+                    stats.allocated += traced()[0] - before
+
+            # failed events and interrupts are passed on to the wrapped process
+            try:
+                value, error = (yield event), None
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException as exc:
+                value, error = None, exc
+
+    def section(self, subsystem):
+        '''times code that runs outside simpy, such as the metrics update of the GUI loop'''
+        return _Section(self, self.subsystem(subsystem), f"simulation;{subsystem}")
+
+    def run(self, env, until):
+        start = time.perf_counter()
+        try:
+            env.run(until=until)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def rows(self):
+        '''(subsystem, stats) sorted by wall time, with the scheduler overhead as its own row'''
+        rows = sorted(self.stats.items(), key=lambda item: item[1].wall, reverse=True)
+        scheduler = SubsystemStats()
+        scheduler.wall = max(0.0, self.elapsed - sum(s.wall for _, s in rows if s.processes))
+        return rows + [(self.SCHEDULER, scheduler)]
+
+    def table(self):
+        rows = self.rows()
+        total = sum(stats.wall for _, stats in rows) or 1.0
+        lines = [
+            f"{'subsystem':<22} {'processes':>9} {'events':>9} {'wall s':>9} {'share':>7} {'us/event':>9}"
+            + (f" {'net alloc kB':>12}" if self.allocations else ""),
+        ]
+        for name, stats in rows:
+            per_event = f"{stats.wall / stats.events * 1e6:9.1f}" if stats.events else f"{'-':>9}"
+            line = (f"{name:<22} {stats.processes:>9} {stats.events:>9} {stats.wall:>9.3f} "
+                    f"{stats.wall / total:>7.1%} {per_event}")
+            if self.allocations:
+                line += f" {stats.allocated / 1024:>12.1f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def report(self):
+        print("\n=== PROFILE ===")
+        print(self.table())
+        print("===============")
+
+    def folded(self):
+        '''stack lines weighted in microseconds'''
+        stacks = dict(self.stacks)
+        stacks[f"simulation;{self.SCHEDULER}"] = self.rows()[-1][1].wall
+        return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in stacks.items() if seconds > 0]
+
+    def export_folded(self, directory):
+        '''writes the folded stacks next to the reports, for flamegraph.pl or speedscope; returns the path'''
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded")
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
+        return path
+
+
+class _Section:
+    __slots__ = ("profiler", "stats", "stack", "start")
+
+    def __init__(self, profiler, stats, stack):
+        self.profiler = profiler
+        self.stats = stats
+        self.stack = stack
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.stats.events += 1
+        self.stats.wall += elapsed
+        self.profiler.stacks[self.stack] = self.profiler.stacks.get(self.stack, 0.0) + elapsed
+        return False
@@ -0,0 +1,112 @@
+# replication.py
+import math
+from statistics import NormalDist
+
+def t_quantile(p, df):
+    '''quantile of Student's t distribution; exact for 1 and 2 degrees of freedom, Hill's expansion above'''
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    terms = (
+        (z**3 + z) / 4,
+        (5 * z**5 + 16 * z**3 + 3 * z) / 96,
+        (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384,
+        (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160,
+    )
+    return z + sum(term / df**(k + 1) for k, term in enumerate(terms))
+
+
+class KPIStats:
+    '''running mean and variance of one KPI over replicas (Welford), with a t confidence interval'''
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence=0.95):
+        if self.count < 2:
+            return math.inf
+        return t_quantile(0.5 + confidence / 2, self.count - 1) * self.std / math.sqrt(self.count)
+
+    def interval(self, confidence=0.95):
+        half_width = self.half_width(confidence)
+        return (self.mean - half_width, self.mean + half_width)
+
+
+class ReplicationSet:
+    '''the replicas of one scenario: per-KPI statistics and the rule deciding how many more to run
+
+    replicas are added until the target KPI's confidence interval half-width is at most max_half_width,
+    never fewer than min_replicas and never more than max_replicas
+    '''
+
+    def __init__(self, kpis, confidence=0.95, min_replicas=5, max_replicas=30, target=None, max_half_width=1.0):
+        self.kpis = tuple(kpis)
+        self.confidence = confidence
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.target = target or self.kpis[0]
+        self.max_half_width = max_half_width
+        self.stats = {kpi: KPIStats() for kpi in self.kpis}
+        self.samples = {kpi: [] for kpi in self.kpis}
+        self.replicas = []
+
+    @property
+    def count(self):
+        return len(self.replicas)
+
+    def add(self, summary, replica=None):
+        '''adds the report summary of one finished replica; KPIs it lacks count as 0'''
+        self.replicas.append(replica)
+        for kpi in self.kpis:
+            value = float(summary.get(kpi) or 0.0)
+            self.stats[kpi].add(value)
+            self.samples[kpi].append(value)
+
+    def half_width(self, kpi=None):
+        return self.stats[kpi or self.target].half_width(self.confidence)
+
+    def converged(self):
+        return self.count >= self.min_replicas and self.half_width() <= self.max_half_width
+
+    def additional_replicas(self):
+        '''how many more replicas to run, 0 once the interval is narrow enough or the budget is spent'''
+        remaining = self.max_replicas - self.count
+        if remaining <= 0 or self.converged():
+            return 0
+        if self.count < self.min_replicas:
+            return min(self.min_replicas - self.count, remaining)
+        # replicas the current variance estimate needs for the target width
+        stats = self.stats[self.target]
+        quantile = t_quantile(0.5 + self.confidence / 2, stats.count - 1)
+        needed = math.ceil((quantile * stats.std / self.max_half_width) ** 2)
+        return max(1, min(needed - self.count, remaining))
+
+    def summary(self):
+        '''per KPI mean under the KPI's own name, plus its std, interval and half-width'''
+        result = {"replicas": self.count, "converged": self.converged()}
+        for kpi, stats in self.stats.items():
+            low, high = stats.interval(self.confidence)
+            result[kpi] = stats.mean
+            result[f"{kpi}_std"] = stats.std
+            result[f"{kpi}_ci"] = [low, high] if stats.count > 1 else None
+            result[f"{kpi}_half_width"] = self.half_width(kpi) if stats.count > 1 else None
+        result["samples"] = self.samples
+        return result
@@ -14,6 +14,7 @@ class SimulationReport:
         self.start_time = None
         self.end_time = None
         self.summary = {}
+        self.profile_path = None
 
     def set_start_time(self):
         """Call this when simulation actually starts"""
@@ -23,7 +24,12 @@ class SimulationReport:
         '''collect final statistics and generate report'''
         self.end_time = datetime.now()
         self.calculate_summary()
+        profiler = self.tn.profiler
+        if profiler is not None:
+            profiler.report()
         if self.config.save_reports:
+            if profiler is not None:
+                self.profile_path = profiler.export_folded(self.config.report_directory)
             self.save_report()
             self.generate_plots()
         return self.summary
@@ -42,6 +48,7 @@ class SimulationReport:
         for vehicle in self.tn.vehicles:
             total_passengers += len(vehicle.passengers)
         self.summary["total_passengers"] = total_passengers
+        self.summary["retired_vehicles"] = len(self.tn.retired_vehicles)
 
         # average metrics (those with plots)
         def avg(data):
@@ -65,6 +72,7 @@ class SimulationReport:
         """Save simplified report to JSON file"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"report_{timestamp}.json"
+        os.makedirs(self.config.report_directory, exist_ok=True)
         filepath = os.path.join(self.config.report_directory, filename)
 
         report_data = {
@@ -76,9 +84,13 @@ class SimulationReport:
                 "satisfaction_decay_waiting": self.config.satisfaction_decay_waiting,
                 "satisfaction_decay_traveling": self.config.satisfaction_decay_traveling,
                 "rush_hour_traffic_factor": self.config.rush_hour_traffic_factor,
-                "busy_route_factor": self.config.busy_route_factor
+                "busy_route_factor": self.config.busy_route_factor,
+                "seed": int(self.tn.rng.seed),
+                "replica": self.tn.rng.replica
             },
             "summary": self.summary,
+            "run_store": self.tn.run_store.path if self.tn.run_store is not None else None,
+            "profile": self.profile_path,
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None
         }
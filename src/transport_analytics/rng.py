@@ -0,0 +1,31 @@
+# rng.py
+import numpy as np
+
+# every stream is always derived, so adding draws to one subsystem never shifts the others
+# delays has no consumer yet, it is reserved so a delay model can draw from it without shifting arrivals or od
+STREAM_NAMES = ("arrivals", "od", "delays")
+
+class RandomStreams:
+    '''independent numpy generators per subsystem, derived from one master seed and a replica number'''
+
+    def __init__(self, seed=None, replica=0):
+        root = np.random.SeedSequence(seed, spawn_key=(replica,))
+        # keep the drawn entropy so an unseeded run can still be reproduced
+        self.seed = root.entropy
+        self.replica = replica
+
+        children = root.spawn(len(STREAM_NAMES))
+        self.streams = {
+            name: np.random.Generator(np.random.PCG64(child))
+            for name, child in zip(STREAM_NAMES, children)
+        }
+        self.arrivals = self.streams["arrivals"]
+        self.od = self.streams["od"]
+        self.delays = self.streams["delays"]
+
+    def get_state(self):
+        return {name: gen.bit_generator.state for name, gen in self.streams.items()}
+
+    def set_state(self, state):
+        for name, gen in self.streams.items():
+            gen.bit_generator.state = state[name]
@@ -0,0 +1,116 @@
+# routing.py
+import networkx as nx
+import numpy as np
+from src.transport_analytics.stops import StopRegistry
+
+class RoutingTable:
+    '''all-pairs shortest path table over the street graph, stored as a next-hop matrix keyed by stop index
+
+    rows are filled by one dijkstra each, all at once by build() or on first use by route and travel_time
+    '''
+
+    def __init__(self, graph, registry=None, weight="travel_time"):
+        self.graph = graph
+        self.weight = weight
+
+        # rows and columns follow the stop registry ids
+        self.registry = registry if registry is not None else StopRegistry()
+        for stop in graph.nodes():
+            self.registry.register(stop)
+        # the table covers the stops known at construction, later registrations are not routable
+        self.stops = list(self.registry.names)
+        self.index = dict(self.registry.ids)
+
+        n = len(self.stops)
+        # left uninitialised, a row is only read once built, so untouched rows cost no memory
+        self.next_hop = np.empty((n, n), dtype=np.int32)
+        # predecessor of each stop on the shortest path tree of the row, so a route needs only its origin's row
+        self.prev = np.empty((n, n), dtype=np.int32)
+        self.dist = np.empty((n, n), dtype=np.float64)
+        self.built = np.zeros(n, dtype=bool)
+        self.rebuilds = 0
+
+    def build(self):
+        '''run one dijkstra per source and fill every row of the table'''
+        for stop in self.graph.nodes():
+            self.build_row(self.index[stop])
+        return self
+
+    def build_row(self, row):
+        source = self.stops[row]
+        pred, dist = nx.dijkstra_predecessor_and_distance(self.graph, source, weight=self.weight)
+
+        hops = self.next_hop[row]
+        prevs = self.prev[row]
+        dists = self.dist[row]
+        hops.fill(-1)
+        prevs.fill(-1)
+        dists.fill(np.inf)
+
+        # dist is filled in settle order, so a node's predecessor always has its hop resolved first
+        for stop, d in dist.items():
+            col = self.index[stop]
+            dists[col] = d
+            if stop == source:
+                hops[col] = col
+                prevs[col] = col
+            elif pred[stop][0] == source:
+                hops[col] = col
+                prevs[col] = row
+            else:
+                prevs[col] = self.index[pred[stop][0]]
+                hops[col] = hops[prevs[col]]
+        self.built[row] = True
+        self.rebuilds += 1
+
+    def ensure_row(self, row):
+        if not self.built[row]:
+            self.build_row(row)
+
+    def position(self, stop):
+        '''row and column of a stop, NetworkXNoPath for a stop the table was not built with'''
+        row = self.index.get(stop)
+        if row is None:
+            raise nx.NetworkXNoPath(f"{stop} is not in the routing table")
+        return row
+
+    def route(self, origin, destination):
+        '''returns the stop sequence from origin to destination, traced back through the origin's row'''
+        src = self.position(origin)
+        dst = self.position(destination)
+        self.ensure_row(src)
+        if self.next_hop[src, dst] < 0:
+            raise nx.NetworkXNoPath(f"no route between {origin} and {destination}")
+
+        prevs = self.prev[src]
+        route = [destination]
+        cur = dst
+        while cur != src:
+            cur = int(prevs[cur])
+            route.append(self.stops[cur])
+        route.reverse()
+        return route
+
+    def travel_time(self, origin, destination):
+        src = self.position(origin)
+        self.ensure_row(src)
+        return float(self.dist[src, self.position(destination)])
+
+    def update_edge(self, A, B, old_weight, new_weight):
+        '''rebuilds only the rows whose shortest paths can be affected by a changed edge weight; returns their stops'''
+        u = self.index[A]
+        v = self.index[B]
+        # rows not built yet will see the new weight when they are
+        reachable = self.built & np.isfinite(self.dist[:, u])
+
+        if new_weight > old_weight:
+            # only sources whose shortest path tree uses the edge can get worse
+            affected = reachable & (self.dist[:, u] + old_weight <= self.dist[:, v] + 1e-9)
+        else:
+            # only sources that can now reach B faster through the edge can get better
+            affected = reachable & (self.dist[:, u] + new_weight <= self.dist[:, v] + 1e-9)
+
+        rows = np.flatnonzero(affected)
+        for row in rows:
+            self.build_row(row)
+        return {self.stops[row] for row in rows}
@@ -0,0 +1,71 @@
+# search.py
+import numpy as np
+
+# summary KPIs where higher is better, the others are minimised
+MAXIMIZE = ("avg_satisfaction", "avg_vehicle_utilization", "avg_on_time_performance", "avg_cost_efficiency")
+
+def space_from_grid(param_grid):
+    '''{name: (low, high, integer)} spanning the values a grid lists for each parameter'''
+    return {
+        name: (min(values), max(values), all(isinstance(v, int) for v in values))
+        for name, values in param_grid.items()
+    }
+
+def latin_hypercube(space, n, rng):
+    '''n parameter sets with exactly one sample in each of n equal slices of every range'''
+    columns = {}
+    for name, (low, high, integer) in space.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        values = low + u * (high - low)
+        columns[name] = np.rint(values).astype(int).tolist() if integer else np.round(values, 3).tolist()
+    return [{name: columns[name][i] for name in space} for i in range(n)]
+
+def halving_horizons(final, eta=3, rungs=3):
+    '''simulated minutes per rung, each eta times longer than the one before and ending at final'''
+    return [max(1, round(final / eta ** (rungs - 1 - k))) for k in range(rungs)]
+
+def peak_windows(lengths, final, peak_hours):
+    '''(start, end) minutes for each rung length, placed where it overlaps the peak_hours windows most
+
+    a rung as long as the final horizon runs from minute 0; shorter ones would otherwise only see the
+    quiet night and rank candidates that differ in their peak behaviour on noise
+    '''
+    peaks = list(zip(peak_hours[0::2], peak_hours[1::2]))
+
+    def overlap(start, length):
+        return sum(max(0, min(end, start + length) - max(begin, start)) for begin, end in peaks)
+
+    windows = []
+    for length in lengths:
+        if length >= final or not peaks:
+            windows.append((0, min(length, final)))
+            continue
+        # the best window starts at a peak or ends at one, ties go to starting with the peak
+        starts = [begin for begin, _ in peaks] + [end - length for _, end in peaks]
+        starts = list(dict.fromkeys(min(max(0, s), final - length) for s in starts))
+        start = max(starts, key=lambda s: overlap(s, length))
+        windows.append((start, start + length))
+    return windows
+
+def successive_halving(candidates, evaluate, horizons, eta=3, target="avg_satisfaction"):
+    '''runs every candidate on the shortest horizon and keeps the best 1/eta for the next, longer one
+
+    evaluate(candidates, horizon) returns one report summary per candidate; returns a list of
+    (horizon, [(candidate, summary), ...] best first) per rung
+    '''
+    maximize = target in MAXIMIZE
+    worst = -np.inf if maximize else np.inf
+
+    def score(item):
+        value = item[1].get(target)
+        return worst if value is None else value
+
+    rungs = []
+    survivors = list(candidates)
+    for k, horizon in enumerate(horizons):
+        summaries = evaluate(survivors, horizon)
+        ranked = sorted(zip(survivors, summaries), key=score, reverse=maximize)
+        rungs.append((horizon, ranked))
+        if k < len(horizons) - 1:
+            survivors = [candidate for candidate, _ in ranked[:max(1, len(ranked) // eta)]]
+    return rungs
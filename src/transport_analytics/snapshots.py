@@ -0,0 +1,108 @@
+# snapshots.py
+import sys
+from collections import OrderedDict
+
+class SnapshotService:
+    '''periodic stop queue snapshots with a configurable cadence, output sink and bounded retention'''
+
+    def __init__(self, transport_net, interval=1, sink=None, delta=False, retention=None):
+        self.tn = transport_net
+        self.interval = interval
+        self.sink = sink  # None is silent
+        # delta snapshots only hold the stops whose queue changed since the previous snapshot
+        self.delta = delta
+        self.retention = retention
+        self.snapshots = OrderedDict()
+        self.versions = {}
+        # state just before the oldest retained snapshot, so deltas can be replayed after eviction
+        self.base = {}
+        self.next_take = None
+
+    def stop_entry(self, queue):
+        names = self.tn.stops.names
+        counts = queue.counts()
+        return {
+            "count": len(queue),
+            "destinations": {names[d]: counts[d] for d in sorted(counts, key=lambda d: names[d]) if counts[d]},
+        }
+
+    def take(self):
+        current_time = int(self.tn.env.now)
+        snapshot = {}
+        for stop, queue in self.tn.passenger_queues.items():
+            if self.delta and self.versions.get(stop) == queue.version:
+                continue
+            self.versions[stop] = queue.version
+            snapshot[stop] = self.stop_entry(queue)
+
+        self.snapshots[current_time] = snapshot
+        if self.retention is not None:
+            while len(self.snapshots) > self.retention:
+                _, evicted = self.snapshots.popitem(last=False)
+                self.base.update(evicted)
+
+        if self.sink is not None:
+            self.sink(current_time, snapshot)
+        return snapshot
+
+    def state_at(self, time):
+        '''full per-stop state at a snapshot time, replaying deltas over the retained window'''
+        if not self.delta:
+            return self.snapshots[time]
+        state = dict(self.base)
+        for snapshot_time, snapshot in self.snapshots.items():
+            if snapshot_time > time:
+                break
+            state.update(snapshot)
+        return state
+
+    def get_state(self):
+        return {"snapshots": list(self.snapshots.items()), "versions": dict(self.versions), "base": dict(self.base)}
+
+    def set_state(self, state):
+        self.snapshots.clear()
+        self.snapshots.update(state["snapshots"])
+        self.versions = dict(state["versions"])
+        self.base = dict(state["base"])
+
+    def process(self, resume_at=None):
+        '''takes a snapshot every interval; resume_at is the next snapshot time of a run restored from a checkpoint'''
+        env = self.tn.env
+        if resume_at is not None:
+            yield env.timeout(resume_at - env.now)
+        while True:
+            self.take()
+            self.next_take = env.now + self.interval
+            yield env.timeout(self.interval)
+
+
+class ConsoleStatusSink:
+    '''prints the status report: the snapshot stops, active vehicles and buffered events'''
+
+    def __init__(self, transport_net, stream=None):
+        self.tn = transport_net
+        self.stream = stream if stream is not None else sys.stdout
+
+    def __call__(self, time, snapshot):
+        from src.transport_analytics.models import get_time
+
+        out = self.stream
+        print(f"\n=== Status Report at {get_time(time)} ===", file=out)
+        for stop in sorted(snapshot):
+            entry = snapshot[stop]
+            passengers_info = "No passengers"
+            if entry["destinations"]:
+                dest_str = ", ".join(f"{k}: {v}" for k, v in entry["destinations"].items())
+                passengers_info = f"{entry['count']} waiting - {dest_str}"
+            print(f"Bus stop {stop}: {passengers_info}", file=out)
+
+        for vehicle in self.tn.vehicles:
+            print(f"Line {vehicle.id}: {vehicle.current_stop}, direction: {vehicle.direction}, "
+                  f"passengers: {len(vehicle.passengers)}/{vehicle.vehicle_capacity}", file=out)
+
+        messages = self.tn.drain_event_messages()
+        if messages:
+            print("\n--- Log Buffer ---", file=out)
+            for msg in messages:
+                print(msg, file=out)
+        print("================================\n", file=out)
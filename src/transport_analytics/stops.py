@@ -0,0 +1,152 @@
+# stops.py
+import heapq
+from itertools import islice
+from collections import deque
+
+class StopRegistry:
+    '''maps stop names to dense integer ids and back'''
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def register(self, name):
+        '''returns the id of a stop, assigning the next free one if the stop is new'''
+        stop_id = self.ids.get(name)
+        if stop_id is None:
+            stop_id = len(self.names)
+            self.ids[name] = stop_id
+            self.names.append(name)
+        return stop_id
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def name_of(self, stop_id):
+        return self.names[stop_id]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+class PassengerQueue:
+    '''fifo queue of passengers waiting at one stop, bucketed by the stop id ending their current leg'''
+
+    def __init__(self):
+        self.buckets = {}
+        self.size = 0
+        self._seq = 0
+        # bumped on every change so snapshots can tell which queues moved
+        self.version = 0
+
+    def append(self, passenger):
+        bucket = self.buckets.get(passenger.target_id)
+        if bucket is None:
+            bucket = self.buckets[passenger.target_id] = deque()
+        bucket.append((self._seq, passenger))
+        self._seq += 1
+        self.size += 1
+        self.version += 1
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __iter__(self):
+        '''iterates waiting passengers in arrival order'''
+        for _, passenger in heapq.merge(*self.buckets.values()):
+            yield passenger
+
+    def counts(self):
+        '''number of waiting passengers per next stop id, the destination unless they transfer on the way'''
+        return {dest: len(bucket) for dest, bucket in self.buckets.items()}
+
+    def get_state(self):
+        '''buckets with each waiting passenger's arrival number and handle state'''
+        return {
+            "seq": self._seq,
+            "version": self.version,
+            "buckets": [[dest, [[seq, p.get_state()] for seq, p in bucket]] for dest, bucket in self.buckets.items()],
+        }
+
+    def set_state(self, state, restore_passenger):
+        '''rebuilds the queue, restore_passenger turns a saved handle state back into a passenger'''
+        self.buckets = {
+            dest: deque((seq, restore_passenger(p)) for seq, p in bucket)
+            for dest, bucket in state["buckets"]
+        }
+        self.size = sum(len(bucket) for bucket in self.buckets.values())
+        self._seq = state["seq"]
+        self.version = state["version"]
+
+    def pop_for(self, destinations, limit):
+        '''removes up to limit passengers heading to any of the given stop ids, oldest first'''
+        if limit <= 0 or not self.size:
+            return []
+
+        # with a set of stops ahead, scan whichever side is smaller
+        if isinstance(destinations, (set, frozenset)) and len(self.buckets) < len(destinations):
+            destinations = [dest for dest in self.buckets if dest in destinations]
+
+        eligible = []
+        available = 0
+        for dest in destinations:
+            bucket = self.buckets.get(dest)
+            if bucket:
+                eligible.append((dest, bucket))
+                available += len(bucket)
+        if not eligible:
+            return []
+
+        if available <= limit:
+            # everyone fits, drain the buckets whole
+            boarding = [p for _, bucket in eligible for _, p in bucket]
+            for dest, _ in eligible:
+                del self.buckets[dest]
+        else:
+            # merge the buckets by arrival order and take the oldest riders
+            taken = list(islice(heapq.merge(*(bucket for _, bucket in eligible)), limit))
+            last_seq = taken[-1][0]
+            for dest, bucket in eligible:
+                while bucket and bucket[0][0] <= last_seq:
+                    bucket.popleft()
+                if not bucket:
+                    del self.buckets[dest]
+            boarding = [p for _, p in taken]
+
+        self.size -= len(boarding)
+        self.version += 1
+        return boarding
+
+
+class RouteIndex:
+    '''precomputed stop positions along a route and the stops lying ahead of each position in both directions'''
+
+    def __init__(self, stops):
+        self.positions = {}
+        for i, stop in enumerate(stops):
+            self.positions.setdefault(stop, i)
+
+        n = len(stops)
+        self.ahead_sets = {
+            1: [frozenset(stops[i + 1:]) for i in range(n)],
+            -1: [frozenset(stops[:i]) for i in range(n)],
+        }
+
+    def position(self, stop):
+        return self.positions[stop]
+
+    def ahead(self, position, direction):
+        '''stops strictly beyond the given position when travelling in direction (1 or -1)'''
+        return self.ahead_sets[direction][position]
+
+    def is_ahead(self, stop, position, direction):
+        return stop in self.ahead_sets[direction][position]
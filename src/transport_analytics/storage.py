@@ -0,0 +1,108 @@
+# storage.py
+import json
+import os
+from datetime import datetime
+import numpy as np
+from src.transport_analytics.passengers import RECORD_DTYPE
+from src.transport_analytics.trajectory import TRACK_DTYPE
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("stop", np.int32),
+    ("count", np.int32),
+])
+
+TABLES = {
+    "positions": TRACK_DTYPE,
+    "stop_snapshots": SNAPSHOT_DTYPE,
+    "trips": RECORD_DTYPE,
+}
+
+MANIFEST = "manifest.json"
+
+class RunStore:
+    '''append-only binary tables for one simulation run, flushed in chunks while the simulation runs'''
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.counts = {name: 0 for name in TABLES}
+        self.files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name in TABLES}
+        # a manifest of an unfinished or crashed run says so
+        self.metadata = {"complete": False}
+        self.closed = False
+
+    @classmethod
+    def create(cls, report_directory, run_name=None):
+        if run_name is None:
+            run_name = datetime.now().strftime("run_%Y%m%d_%H%M%S")
+        return cls(os.path.join(report_directory, "runs", run_name))
+
+    def append(self, table, records):
+        '''writes a chunk of records, which must already have the table's dtype'''
+        if len(records) == 0:
+            return
+        records = np.ascontiguousarray(records, dtype=TABLES[table])
+        self.files[table].write(records.tobytes())
+        self.counts[table] += len(records)
+
+    def sync(self, **metadata):
+        '''flushes the data files and rewrites the manifest, so a partial run is always readable'''
+        self.metadata.update(metadata)
+        for f in self.files.values():
+            f.flush()
+        manifest = {
+            "tables": {name: {"dtype": TABLES[name].descr, "count": self.counts[name]} for name in TABLES},
+            **self.metadata,
+        }
+        tmp_path = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+
+    def close(self, **metadata):
+        '''final sync, marking the run complete, then closes the data files'''
+        if self.closed:
+            return
+        self.sync(complete=True, **metadata)
+        for f in self.files.values():
+            f.close()
+        self.closed = True
+
+
+class RunReader:
+    '''opens a stored run; every table is a read-only memory map, nothing is copied into RAM'''
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.stops = self.manifest.get("stops", [])
+        self.vehicle_ids = self.manifest.get("vehicle_ids", [])
+        self.complete = self.manifest.get("complete", False)
+
+        for name, dtype in TABLES.items():
+            count = self.manifest["tables"][name]["count"]
+            if count:
+                table = np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(count,))
+            else:
+                table = np.empty(0, dtype=dtype)
+            setattr(self, name, table)
+
+    def vehicle_positions(self, vehicle_id):
+        return self.positions[self.positions["vehicle"] == self.vehicle_ids.index(vehicle_id)]
+
+    def queue_lengths(self, stop):
+        snapshots = self.stop_snapshots[self.stop_snapshots["stop"] == self.stops.index(stop)]
+        return snapshots["time"], snapshots["count"]
+
+    def destinations(self, vehicle_id, time):
+        '''destination histogram on board a vehicle at a given time, rebuilt from the stored trips'''
+        trips = self.trips
+        onboard = (
+            (trips["vehicle"] == self.vehicle_ids.index(vehicle_id))
+            & (trips["board_time"] < time)
+            & ~(trips["alight_time"] < time)
+        )
+        dest_ids, counts = np.unique(trips["destination"][onboard], return_counts=True)
+        return {self.stops[d]: int(c) for d, c in zip(dest_ids.tolist(), counts.tolist())}
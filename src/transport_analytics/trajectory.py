@@ -0,0 +1,178 @@
+# trajectory.py
+import numpy as np
+
+TRACK_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("vehicle", np.int32),
+    ("lat", np.float64),
+    ("lon", np.float64),
+    ("load", np.int32),
+    ("direction", np.int8),
+    ("progress", np.float32),
+    ("in_transit", np.bool_),
+    ("stop", np.int32),
+    ("next_stop", np.int32),  # -1 marks the terminal
+])
+
+class TrajectoryRecorder:
+    '''vehicle positions written into a preallocated structured array, optionally kept as a ring buffer'''
+
+    def __init__(self, registry, sample_interval=0, retention=None, capacity=4096):
+        self.registry = registry
+        # minimum simulated minutes between two in-transit samples of the same vehicle, stops are always kept
+        self.sample_interval = sample_interval
+        # with a retention the buffer keeps only the newest records and overwrites the oldest
+        self.retention = retention
+        self.records = np.empty(retention or capacity, dtype=TRACK_DTYPE)
+        self.count = 0
+        self.total = 0
+        self.drained = 0
+
+        self.vehicle_ids = []
+        self.vehicle_index = {}
+        self.capacities = []
+        self.last_sample = []
+        self.passenger_store = None
+
+    def register(self, vehicle_id, capacity):
+        '''returns the index used for the vehicle in the vehicle column'''
+        idx = self.vehicle_index.get(vehicle_id)
+        if idx is None:
+            idx = len(self.vehicle_ids)
+            self.vehicle_index[vehicle_id] = idx
+            self.vehicle_ids.append(vehicle_id)
+            self.capacities.append(capacity)
+            self.last_sample.append(-np.inf)
+        return idx
+
+    def get_state(self):
+        # a ring buffer is saved whole, its write position follows from total
+        records = self.records if self.retention else self.records[:self.count]
+        return {
+            "records": records.copy(),
+            "count": self.count,
+            "total": self.total,
+            "drained": self.drained,
+            "vehicle_ids": list(self.vehicle_ids),
+            "capacities": list(self.capacities),
+            "last_sample": list(self.last_sample),
+        }
+
+    def set_state(self, state):
+        records = state["records"]
+        if self.retention:
+            self.records = records.copy()
+        else:
+            self.records = np.empty(max(len(self.records), 2 * len(records)), dtype=TRACK_DTYPE)
+            self.records[:len(records)] = records
+        self.count = state["count"]
+        self.total = state["total"]
+        self.drained = state["drained"]
+        self.vehicle_ids = list(state["vehicle_ids"])
+        self.vehicle_index = {vehicle_id: i for i, vehicle_id in enumerate(self.vehicle_ids)}
+        self.capacities = list(state["capacities"])
+        self.last_sample = list(state["last_sample"])
+
+    def due(self, vehicle, time):
+        '''whether an in-transit sample of the vehicle would be kept at this time'''
+        return time - self.last_sample[vehicle] >= self.sample_interval
+
+    def record(self, time, vehicle, lat, lon, load, direction, stop, next_stop, in_transit=False, progress=0.0):
+        if in_transit:
+            if not self.due(vehicle, time):
+                return
+            self.last_sample[vehicle] = time
+
+        if self.retention:
+            pos = self.total % self.retention
+            self.count = min(self.count + 1, self.retention)
+        else:
+            pos = self.count
+            if pos == len(self.records):
+                grown = np.empty(2 * len(self.records), dtype=TRACK_DTYPE)
+                grown[:pos] = self.records
+                self.records = grown
+            self.count += 1
+        self.total += 1
+
+        self.records[pos] = (
+            time, vehicle,
+            np.nan if lat is None else lat,
+            np.nan if lon is None else lon,
+            load, direction, progress if in_transit else 0.0, in_transit, stop, next_stop)
+
+    def view(self):
+        '''retained records in chronological order; a zero-copy view unless the ring buffer has wrapped'''
+        if self.retention and self.total > self.retention:
+            pos = self.total % self.retention
+            return np.concatenate((self.records[pos:], self.records[:pos]))
+        return self.records[:self.count]
+
+    def drain(self):
+        '''returns the records written since the last drain; without a retention the buffer is emptied for reuse'''
+        new = min(self.total - self.drained, self.count)
+        self.drained = self.total
+        chunk = self.view()[self.count - new:].copy()
+        if not self.retention:
+            self.count = 0
+        return chunk
+
+    def destinations(self, vehicle, time):
+        '''destination histogram of riders on board at a recorded time, computed from the passenger store on demand'''
+        store = self.passenger_store
+        if store is None:
+            return {}
+        n = store.size
+        # a stop record is written before anyone alights or boards there
+        onboard = (
+            (store.vehicle[:n] == vehicle)
+            & (store.board_time[:n] < time)
+            & ~(store.alight_time[:n] < time)
+        )
+        dest_ids, counts = np.unique(store.destination[:n][onboard], return_counts=True)
+        names = self.registry.names
+        return {names[d]: int(c) for d, c in sorted(zip(dest_ids.tolist(), counts.tolist()), key=lambda x: names[x[0]])}
+
+    def track(self, vehicle_id, destinations=False):
+        '''records of one vehicle as dicts in the historical bus_tracks layout'''
+        vehicle = self.vehicle_index[vehicle_id]
+        records = self.view()
+        records = records[records["vehicle"] == vehicle]
+        names = self.registry.names
+
+        track = []
+        for r in records:
+            stop = names[r["stop"]]
+            next_stop = names[r["next_stop"]] if r["next_stop"] >= 0 else "Terminal"
+            entry = {
+                "time": int(r["time"]),
+                "stop": f"{stop} -> {next_stop}" if r["in_transit"] else stop,
+                "lat": None if np.isnan(r["lat"]) else float(r["lat"]),
+                "lon": None if np.isnan(r["lon"]) else float(r["lon"]),
+                "direction": int(r["direction"]),
+                "passenger_count": int(r["load"]),
+                "vehicle_capacity": self.capacities[vehicle],
+                "next_stop": next_stop,
+                "in_transit": bool(r["in_transit"]),
+                "progress": float(r["progress"]),
+            }
+            if destinations:
+                entry["destinations"] = self.destinations(vehicle, r["time"])
+            track.append(entry)
+        return track
+
+    # mapping access keeps the old bus_tracks[vehicle_id] reads working
+    def __getitem__(self, vehicle_id):
+        return self.track(vehicle_id)
+
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self.vehicle_index
+
+    def __iter__(self):
+        return iter(self.vehicle_ids)
+
+    def __len__(self):
+        return len(self.vehicle_ids)
+
+    def keys(self):
+        return list(self.vehicle_ids)
@@ -0,0 +1,121 @@
+# travel_time.py
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 1440
+
+def parse_minute(value):
+    '''minute of day from an int or an "HH:MM" string'''
+    if isinstance(value, str):
+        hours, mins = map(int, value.split(":"))
+        return hours * 60 + mins
+    return int(value)
+
+class TravelTimeModel:
+    '''per-edge, per-time-bin travel times precomputed at setup, so a traversal costs one array lookup'''
+
+    def __init__(self, registry, bin_minutes=15):
+        self.registry = registry
+        self.bin_minutes = bin_minutes
+        self.bins = -(-MINUTES_PER_DAY // bin_minutes)
+        # (from id, to id) -> row in the tables
+        self.edge_index = {}
+        self.base = np.empty(0)
+        self.multipliers = np.ones((0, self.bins))
+        self.times = np.empty((0, self.bins))
+        # kept so edges added later get the same overrides
+        self.profile = None
+
+    @classmethod
+    def from_config(cls, graph, registry, config):
+        '''busy edges get busy_route_factor all day and peak_hours windows get rush_hour_traffic_factor on top'''
+        model = cls(registry, config.travel_time_bin_minutes)
+        edges = list(graph.edges(data=True))
+        busy = np.array([config.busy_route_factor if data.get("busy") else 1.0 for _, _, data in edges])
+        # the tables are allocated once for all edges, not grown edge by edge
+        model.extend(
+            [(a, b) for a, b, _ in edges],
+            [data["travel_time"] for _, _, data in edges],
+            busy[:, None] * model.peak_row(config))
+
+        if config.travel_time_profile is not None:
+            model.load_profile(config.travel_time_profile)
+        model.refresh()
+        return model
+
+    def peak_row(self, config):
+        '''multipliers of a quiet edge: 1 outside and rush_hour_traffic_factor inside the peak_hours windows'''
+        row = np.ones(self.bins)
+        peaks = config.peak_hours
+        for start, end in zip(peaks[0::2], peaks[1::2]):
+            row[self.bin_range(start, end)] *= config.rush_hour_traffic_factor
+        return row
+
+    def config_row(self, config, busy=False):
+        '''multipliers of an edge under config, before any profile overrides'''
+        return (config.busy_route_factor if busy else 1.0) * self.peak_row(config)
+
+    def bin_range(self, start, end):
+        '''bins overlapping the half-open window [start, end) in minutes of day'''
+        first = parse_minute(start) // self.bin_minutes
+        last = -(-parse_minute(end) // self.bin_minutes)
+        return slice(first, min(last, self.bins))
+
+    def extend(self, edges, travel_times, multipliers):
+        '''appends new (a, b) edges with their base times and multiplier rows in one allocation'''
+        start = len(self.base)
+        for offset, (a, b) in enumerate(edges):
+            self.edge_index[(self.registry.register(a), self.registry.register(b))] = start + offset
+        self.base = np.concatenate((self.base, np.asarray(travel_times, dtype=float)))
+        self.multipliers = np.concatenate((self.multipliers, np.broadcast_to(multipliers, (len(edges), self.bins))))
+        self.times = np.concatenate((self.times, np.empty((len(edges), self.bins))))
+        self.times[start:] = self.base[start:, None] * self.multipliers[start:]
+        return range(start, len(self.base))
+
+    def add_edge(self, a, b, travel_time, multiplier=1.0):
+        '''adds an edge with a flat multiplier or a row of them, or updates an existing one; returns its row'''
+        row = self.edge_index.get((self.registry.register(a), self.registry.register(b)))
+        if row is None:
+            return self.extend([(a, b)], [travel_time], multiplier)[0]
+        self.base[row] = travel_time
+        self.multipliers[row] = multiplier
+        self.times[row] = self.base[row] * self.multipliers[row]
+        return row
+
+    def load_profile(self, profile):
+        '''overrides multipliers from a CSV path or DataFrame with from, to, start, end, multiplier columns; "*" matches every stop'''
+        if not isinstance(profile, pd.DataFrame):
+            profile = pd.read_csv(profile)
+        self.profile = profile
+        self.apply_profile(self.edge_index.items())
+
+    def apply_profile(self, edges):
+        '''applies the loaded profile to ((from id, to id), row) edges and refreshes their times'''
+        edges = list(edges)
+        for entry in self.profile.itertuples(index=False):
+            rows = [
+                row for (a, b), row in edges
+                if entry[0] in ("*", self.registry.name_of(a)) and entry[1] in ("*", self.registry.name_of(b))
+            ]
+            self.multipliers[rows, self.bin_range(entry.start, entry.end)] = entry.multiplier
+        rows = [row for _, row in edges]
+        self.times[rows] = self.base[rows, None] * self.multipliers[rows]
+
+    def refresh(self):
+        '''recomputes the travel time table from the base times and multipliers'''
+        self.times = self.base[:, None] * self.multipliers
+
+    def edge(self, a, b):
+        return self.edge_index[(self.registry.id_of(a), self.registry.id_of(b))]
+
+    def set_base(self, a, b, travel_time):
+        '''changes the free-flow time of an edge and rescales its row of the table'''
+        row = self.edge(a, b)
+        self.base[row] = travel_time
+        self.times[row] = travel_time * self.multipliers[row]
+
+    def lookup(self, row, minute):
+        return float(self.times[row, int(minute % MINUTES_PER_DAY) // self.bin_minutes])
+
+    def travel_time(self, a, b, minute):
+        return self.lookup(self.edge(a, b), minute)
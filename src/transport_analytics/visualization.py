@@ -1,3 +1,4 @@
+import math
 import pygame
 import threading
 from src.transport_analytics.models import TransportNet, get_time
@@ -5,9 +6,11 @@ from collections import deque
 from src.transport_analytics.config import SimulationConfig
 
 class RealTimeMetrics:
-    def __init__(self, transport_network, max_points=100):
+    def __init__(self, transport_network, max_points=100, verify=False):
         self.tn = transport_network
         self.max_points = max_points
+        # verify recomputes every sample with the full scans below and checks the running aggregates against them
+        self.verify = verify
         
         self.time_data = deque(maxlen=max_points)
         self.satisfaction_data = deque(maxlen=max_points)
@@ -93,15 +96,43 @@ class RealTimeMetrics:
             total += len(vehicle.passengers)
         return total
     
+    def calculate_incremental(self):
+        '''reads all metrics from the running aggregates kept by the network, O(1) per sample'''
+        now = self.tn.env.now
+        aggregates = self.tn.aggregates
+        return (
+            aggregates.satisfaction(now),
+            aggregates.total_delay(now),
+            aggregates.avg_wait_time(now),
+            aggregates.vehicle_utilization(len(self.tn.vehicles)),
+            aggregates.passengers_in_system(),
+        )
+
+    def calculate_full_scan(self):
+        '''recomputes all metrics by scanning every queued and onboard passenger'''
+        return (
+            self.calculate_satisfaction(),
+            self.calculate_total_delay(),
+            self.calculate_avg_wait_time(),
+            self.calculate_vehicle_utilization(),
+            self.calculate_passengers_in_system(),
+        )
+
+    def verify_metrics(self, values):
+        expected = self.calculate_full_scan()
+        names = ("satisfaction", "total_delay", "avg_wait_time", "vehicle_utilization", "passengers_in_system")
+        for name, value, reference in zip(names, values, expected):
+            if not math.isclose(value, reference, rel_tol=1e-9, abs_tol=1e-6):
+                raise AssertionError(f"{name} drifted at {self.tn.env.now}: incremental {value}, full scan {reference}")
+
     def update_metrics(self):
         """Update all metrics for current simulation time"""
         with self.data_lock:
             current_time = self.tn.env.now
-            satisfaction = self.calculate_satisfaction()
-            total_delay = self.calculate_total_delay()
-            avg_wait = self.calculate_avg_wait_time()
-            utilization = self.calculate_vehicle_utilization()
-            passengers = self.calculate_passengers_in_system()
+            values = self.calculate_incremental()
+            if self.verify:
+                self.verify_metrics(values)
+            satisfaction, total_delay, avg_wait, utilization, passengers = values
             
             self.time_data.append(current_time)
             self.satisfaction_data.append(satisfaction)
@@ -110,6 +141,18 @@ class RealTimeMetrics:
             self.vehicle_utilization_data.append(utilization)
             self.passengers_in_system_data.append(passengers)
 
+    SERIES = ("time_data", "satisfaction_data", "total_delay_data", "avg_wait_time_data", "vehicle_utilization_data",
+              "passengers_in_system_data", "on_time_performance_data", "cost_efficiency_data")
+
+    def get_state(self):
+        with self.data_lock:
+            return {name: list(getattr(self, name)) for name in self.SERIES}
+
+    def set_state(self, state):
+        with self.data_lock:
+            for name in self.SERIES:
+                setattr(self, name, deque(state[name], maxlen=self.max_points))
+
 
 def count_destinations(passengers):
     counts = {}
@@ -186,12 +229,7 @@ def run_simulation_with_plots(
     
     stops_coords = tn.stop_locations 
 
-    for line in tn.bus_lines:
-        for departure in line.schedule:
-            tn.env.process(tn.create_vehicle(line, departure))
-
-    tn.env.process(tn.passenger_generator(interval=5))
-    tn.env.process(tn.report_status())
+    tn.start_processes(report=True)
 
     paused = False
     selected_stop = None
@@ -203,10 +241,14 @@ def run_simulation_with_plots(
     try:
         while minute < config.simulation_duration:
             if not paused:
-                tn.env.run(until=minute + 1)
+                tn.advance(minute + 1)
                 minute += 1
                 
-                metrics_tracker.update_metrics()
+                if tn.profiler is None:
+                    metrics_tracker.update_metrics()
+                else:
+                    with tn.profiler.section("metrics"):
+                        metrics_tracker.update_metrics()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -224,7 +266,7 @@ def run_simulation_with_plots(
                             break
 
                     for vehicle in tn.vehicles:
-                        x, y = vehicle.get_coordinates()
+                        x, y = vehicle.position_at(tn.env.now)
                         if (mx-x)**2 + (my-y)**2 <= 6**2:
                             selected_bus = vehicle
                             selected_stop = None
@@ -260,7 +302,7 @@ def run_simulation_with_plots(
                                      (position[0] + 10, position[1]), (100, 100, 100))
 
             for vehicle in tn.vehicles:
-                x, y = vehicle.get_coordinates()
+                x, y = vehicle.position_at(tn.env.now)
 
                 if vehicle.id.startswith("Line1"):
                     color = (255, 0, 0)
@@ -0,0 +1,32 @@
+import pytest
+from src.transport_analytics.config import SimulationConfig
+from src.transport_analytics.models import TransportNet
+
+@pytest.fixture
+def network_overrides():
+    # config attributes every network of a test module gets, override this fixture in the module
+    return {}
+
+@pytest.fixture
+def make_config(network_overrides):
+    '''builds the three stop line config; the module's network_overrides apply first, then the call's keywords'''
+    def make(**overrides):
+        config = SimulationConfig(
+            stop_locations={"A": (0, 0), "B": (10, 0), "C": (20, 0)},
+            connections=[("A", "B", 5, False), ("B", "C", 5, False)],
+            bus_lines=[{"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05"], "wait_time": 3, "capacity": 30}]
+        )
+        config.status_output = "silent"
+        for key, value in {**network_overrides, **overrides}.items():
+            setattr(config, key, value)
+        return config
+    return make
+
+@pytest.fixture
+def make_network(make_config):
+    '''a set up TransportNet for the given config, or for make_config with these keywords'''
+    def make(config=None, **overrides):
+        tn = TransportNet(config if config is not None else make_config(**overrides))
+        tn.setup_transport_network()
+        return tn
+    return make
@@ -0,0 +1,56 @@
+import random
+import pytest
+from src.transport_analytics.aggregates import SpawnTimeAggregate
+from src.transport_analytics.config import SimulationConfig
+from src.transport_analytics.models import TransportNet
+from src.transport_analytics.visualization import RealTimeMetrics
+
+def brute_force_satisfaction(spawn_times, now, decay):
+    return sum(max(0, 100 - (now - s) * decay) for s in spawn_times)
+
+def test_spawn_time_aggregate_matches_brute_force():
+    rng = random.Random(0)
+    aggregate = SpawnTimeAggregate(decay=2.0)
+    alive = []
+
+    for now in range(200):
+        for _ in range(rng.randint(0, 3)):
+            # older spawn times arrive too, like passengers boarding a vehicle
+            spawn = now - rng.randint(0, 80)
+            aggregate.add(spawn)
+            alive.append(spawn)
+        if alive and rng.random() < 0.5:
+            spawn = alive.pop(rng.randrange(len(alive)))
+            aggregate.remove(spawn)
+
+        assert aggregate.count == len(alive)
+        assert aggregate.total_age(now) == pytest.approx(sum(now - s for s in alive))
+        assert aggregate.total_satisfaction(now) == pytest.approx(brute_force_satisfaction(alive, now, 2.0))
+
+def test_zero_decay_never_saturates():
+    aggregate = SpawnTimeAggregate(decay=0)
+    aggregate.add(0, count=3)
+
+    assert aggregate.total_satisfaction(10_000) == 300
+
+def test_incremental_metrics_match_full_scan():
+    config = SimulationConfig(
+        stop_locations={"A": (0, 0), "B": (10, 0), "C": (20, 0), "D": (30, 0)},
+        connections=[("A", "B", 5, False), ("B", "C", 5, True), ("C", "D", 4, False)],
+        bus_lines=[
+            {"name": "Line1", "stops": ["A", "B", "C", "D"], "schedule": ["00:05", "02:00"], "wait_time": 3, "capacity": 10},
+            {"name": "Line2", "stops": ["D", "C", "B"], "schedule": ["00:10"], "wait_time": 2, "capacity": 25},
+        ]
+    )
+    config.seed = 5
+    tn = TransportNet(config)
+    tn.setup_transport_network()
+
+    # verify mode raises as soon as a sample disagrees with the full scan
+    metrics = RealTimeMetrics(tn, verify=True)
+    tn.run_batch(until=600, sample_interval=1, samplers=[metrics.update_metrics])
+
+    assert len(metrics.time_data) == metrics.max_points
+    # vehicles may have moved since the last sample, take one at the horizon
+    metrics.update_metrics()
+    assert metrics.passengers_in_system_data[-1] == metrics.calculate_passengers_in_system()
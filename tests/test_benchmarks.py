@@ -0,0 +1,33 @@
+import json
+from benchmarks.networks import synthetic_network
+from benchmarks.run_benchmarks import compare, run_case
+from src.transport_analytics.config import SimulationConfig
+
+def test_synthetic_network_lines_follow_connections():
+    topology = synthetic_network(60, 8, seed=3)
+    edges = {frozenset((a, b)) for a, b, *_ in topology["connections"]}
+
+    assert len(topology["stop_locations"]) == 60
+    assert topology["bus_lines"]
+    for line in topology["bus_lines"]:
+        assert len(set(line["stops"])) == len(line["stops"])
+        for a, b in zip(line["stops"], line["stops"][1:]):
+            assert frozenset((a, b)) in edges
+
+    # the topology is a valid simulation config
+    SimulationConfig(**topology)
+
+def test_synthetic_network_is_seeded():
+    assert synthetic_network(30, 4, seed=1) == synthetic_network(30, 4, seed=1)
+
+def test_run_case_reports_rates(tmp_path, capsys):
+    result = run_case("simulation", "example", seed=0, duration=120, ops=1)
+
+    assert result["setup_s"] > 0 and result["wall_s"] > 0
+    assert result["events"] > 0
+    assert result["events_per_s"] > 0
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": [dict(result, events_per_s=result["events_per_s"] / 2)]}))
+    compare([result], str(baseline))
+    assert "2.00" in capsys.readouterr().out
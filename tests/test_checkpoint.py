@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+from src.transport_analytics import checkpoint, codec
+from src.transport_analytics.visualization import RealTimeMetrics
+
+@pytest.fixture
+def network_overrides():
+    return {
+        "seed": 11,
+        "stop_locations": {"A": (0, 0), "B": (10, 0), "C": (20, 0), "D": (20, 10)},
+        "connections": [("A", "B", 10, False), ("B", "C", 10, True), ("C", "D", 8, False)],
+        "bus_lines": [
+            {"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05", "00:40", "06:00"], "wait_time": 3, "capacity": 30},
+            {"name": "Line2", "stops": ["B", "C", "D"], "schedule": ["00:10", "07:15"], "wait_time": 5, "capacity": 20},
+        ],
+    }
+
+def outcome(tn):
+    return (
+        tn.passengers.completed_rows().tolist(),
+        tn.trajectories.view().tolist(),
+        [(v.id, v.position_index, v.direction, len(v.passengers)) for v in tn.vehicles],
+        tn.retired_vehicles,
+        tn.aggregates.get_state(),
+    )
+
+@pytest.mark.parametrize("cut", [7, 43, 300, 451])
+def test_resumed_run_matches_uninterrupted(tmp_path, cut, make_network, make_config):
+    config = make_config()
+    straight = make_network(config).run_batch(until=900)
+
+    interrupted = make_network(config).run_batch(until=cut)
+    path = interrupted.save_checkpoint(str(tmp_path / "run.ckpt"))
+    resumed = make_network(config).restore_checkpoint(path).run_batch(until=900)
+
+    assert resumed.env.now == 900
+    assert outcome(resumed) == outcome(straight)
+
+def test_periodic_checkpoints_resume_with_samplers(tmp_path, make_network, make_config):
+    path = str(tmp_path / "run.ckpt")
+
+    straight = make_network()
+    metrics = RealTimeMetrics(straight)
+    straight.run_batch(until=600, samplers=[metrics.update_metrics])
+
+    config = make_config(checkpoint_interval=100, checkpoint_path=path)
+    first = make_network(config)
+    first.checkpoint_extras["metrics"] = RealTimeMetrics(first)
+    first.run_batch(until=250, samplers=[first.checkpoint_extras["metrics"].update_metrics])
+    assert checkpoint.load(path)["now"] == 200
+
+    resumed = make_network(config)
+    resumed_metrics = resumed.checkpoint_extras["metrics"] = RealTimeMetrics(resumed)
+    resumed.restore_checkpoint(path).run_batch(until=600, samplers=[resumed_metrics.update_metrics])
+
+    assert outcome(resumed) == outcome(straight)
+    assert resumed_metrics.get_state() == metrics.get_state()
+
+def test_restore_refuses_another_config(tmp_path, make_network):
+    path = make_network().run_batch(until=50).save_checkpoint(str(tmp_path / "run.ckpt"))
+    other = make_network(peak_multiplier=3.0)
+    with pytest.raises(ValueError):
+        other.restore_checkpoint(path)
+    assert make_network(peak_multiplier=3.0).restore_checkpoint(path, strict=False).env.now == 50
+
+def test_restore_needs_a_fresh_network(make_network):
+    state = make_network().run_batch(until=50).checkpoint()
+    with pytest.raises(RuntimeError):
+        make_network().run_batch(until=10).restore(state)
+
+def test_checkpoint_file_is_checked(tmp_path):
+    path = tmp_path / "bad.ckpt"
+    path.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        checkpoint.load(str(path))
+
+def test_codec_round_trips_arrays():
+    arrays = [np.arange(5, dtype=np.int32), np.zeros(3, dtype=[("t", "f8"), ("id", "i4")])]
+    for array, decoded in zip(arrays, codec.decode(codec.encode(arrays))):
+        assert decoded.dtype == array.dtype
+        assert decoded.tolist() == array.tolist()
+
+def test_fork_without_overrides_continues_the_run(make_network):
+    straight = make_network().run_batch(until=900)
+    fork = make_network().run_batch(until=420).fork()
+    assert outcome(fork.run_batch(until=900)) == outcome(straight)
+
+def test_forks_from_one_state_are_independent(make_network):
+    warm = make_network().run_batch(until=420)
+    state = warm.checkpoint()
+    first = warm.fork(state, satisfaction_decay_waiting=2.0).run_batch(until=900)
+    second = warm.fork(state, satisfaction_decay_waiting=2.0).run_batch(until=900)
+    plain = warm.fork(state).run_batch(until=900)
+
+    assert outcome(first) == outcome(second)
+    assert first.config.satisfaction_decay_waiting == 2.0
+    assert warm.env.now == 420
+    # the warm-up is shared, only the satisfaction accrued after the fork differs
+    done = plain.passengers.completed_rows()
+    assert done.tolist() == first.passengers.completed_rows().tolist()
+    assert plain.passengers.satisfaction[done].tolist() != first.passengers.satisfaction[done].tolist()
+
+def test_fork_with_another_decay_keeps_metrics_exact(make_network):
+    # riders aged past the warm-up's short horizon still count once a smaller decay applies
+    warm = make_network(satisfaction_decay_waiting=5.0)
+    warm.run_batch(until=420, samplers=[RealTimeMetrics(warm).update_metrics])
+    fork = warm.fork(satisfaction_decay_waiting=0.5, satisfaction_decay_traveling=0.1)
+    metrics = RealTimeMetrics(fork, verify=True)
+    fork.run_batch(until=900, samplers=[metrics.update_metrics])
+    assert len(metrics.time_data) == 48
+
+def test_fork_refuses_another_network(make_network):
+    warm = make_network().run_batch(until=60)
+    with pytest.raises(ValueError):
+        warm.fork(connections=[("A", "B", 12, False), ("B", "C", 10, True), ("C", "D", 8, False)])
+
+def test_status_reports_keep_their_cadence(tmp_path, make_network):
+    def run(until, tn=None):
+        if tn is None:
+            tn = make_network(snapshot_interval=7)
+            tn.start_processes(report=True)
+        return tn.run_batch(until=until)
+
+    straight = run(200)
+    path = run(100).save_checkpoint(str(tmp_path / "run.ckpt"))
+    resumed = run(200, make_network(snapshot_interval=7).restore_checkpoint(path))
+
+    assert list(resumed.snapshots.snapshots) == list(straight.snapshots.snapshots)
+    assert outcome(resumed) == outcome(straight)
+
+def test_run_samples_at_the_horizon(tmp_path, make_network):
+    def network():
+        tn = make_network(simulation_duration=300)
+        tn.checkpoint_extras["metrics"] = RealTimeMetrics(tn)
+        return tn
+
+    def run(tn, until=None):
+        metrics = tn.checkpoint_extras["metrics"]
+        tn.run_batch(until=until, samplers=[metrics.update_metrics])
+        return metrics
+
+    straight = run(network())
+    assert list(straight.time_data)[-2:] == [290, 300]
+
+    interrupted = network()
+    run(interrupted, 120)
+    path = interrupted.save_checkpoint(str(tmp_path / "run.ckpt"))
+    assert run(network().restore_checkpoint(path)).get_state() == straight.get_state()
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from src.transport_analytics import codec
+from src.transport_analytics.config import SimulationConfig
+
+def make_config():
+    return SimulationConfig(
+        stop_locations={"A": (0, 0), "B": (10, 0)},
+        connections=[("A", "B", 5, False)],
+        bus_lines=[{"name": "Line1", "stops": ["A", "B"], "schedule": ["00:05"], "wait_time": 3, "capacity": 30}]
+    )
+
+def test_codec_round_trip():
+    value = {"a": [1, 2.5, None, True], "b": ("x", b"\x00"), 3: {"nested": -2**70}}
+    assert codec.decode(codec.encode(value)) == value
+    assert isinstance(codec.decode(codec.encode((1, 2))), tuple)
+    with pytest.raises(TypeError):
+        codec.encode(object())
+
+def test_canonical_encoding_ignores_key_order():
+    assert codec.encode({"a": 1, "b": 2}, canonical=True) == codec.encode({"b": 2, "a": 1}, canonical=True)
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_save_load_round_trip(tmp_path, binary):
+    config = make_config()
+    config.report_directory = str(tmp_path)
+    config.seed = 7
+    config.peak_hours = (400, 500, 900, 1000)
+
+    loaded = SimulationConfig.load(config.save(binary=binary))
+    assert loaded.to_dict() == config.to_dict()
+    assert loaded.connections == [("A", "B", 5, False)]
+    assert loaded.peak_hours == (400, 500, 900, 1000)
+    assert loaded.content_hash() == config.content_hash()
+
+def test_dataframe_stop_locations_serialize_as_mapping():
+    config = make_config()
+    config.stop_locations = pd.DataFrame({"A": [0, 0], "B": [10, 0]})
+    loaded = SimulationConfig.from_json(config.to_json())
+    assert loaded.stop_locations == {"A": (0, 0), "B": (10, 0)}
+    assert loaded.content_hash() == make_config().content_hash()
+
+def test_newer_versions_are_rejected():
+    data = make_config().to_dict()
+    data["version"] += 1
+    with pytest.raises(ValueError):
+        SimulationConfig.from_dict(data)
+
+def test_copy_with_overrides_and_hash():
+    config = make_config()
+    copy = config.copy_with(busy_route_factor=2.0, seed=3)
+
+    assert copy.busy_route_factor == 2.0 and config.busy_route_factor == 1.3
+    # the topology is shared rather than copied
+    assert copy.bus_lines is config.bus_lines
+    assert copy.content_hash() != config.content_hash()
+    assert copy.content_hash() == config.copy_with(seed=3, busy_route_factor=2.0).content_hash()
+    with pytest.raises(AttributeError):
+        config.copy_with(no_such_setting=1)
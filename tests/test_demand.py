@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from src.transport_analytics.demand import ODSampler
+from src.transport_analytics.stops import StopRegistry
+
+def test_uniform_sampling_never_repeats_origin():
+    sampler = ODSampler([10, 11, 12, 13])
+    origins, destinations = sampler.sample(np.random.default_rng(0), 1000)
+
+    assert len(origins) == len(destinations) == 1000
+    assert (origins != destinations).all()
+    assert set(origins.tolist()) == {10, 11, 12, 13}
+
+def test_od_matrix_sampling_follows_demand():
+    registry = StopRegistry()
+    stops = ["A", "B", "C"]
+    for stop in stops:
+        registry.register(stop)
+
+    sampler = ODSampler.from_mapping(registry, stops, {"A": {"C": 3, "A": 5}, "B": {"A": 1}})
+    origins, destinations = sampler.sample(np.random.default_rng(0), 4000)
+
+    pairs = set(zip(origins.tolist(), destinations.tolist()))
+    assert pairs == {(0, 2), (1, 0)}
+    assert 0.7 < np.mean(origins == 0) < 0.8
+
+def test_od_matrix_shape_is_checked():
+    with pytest.raises(ValueError):
+        ODSampler([0, 1], np.ones((3, 3)))
+
+def test_pairs_stay_within_connected_components():
+    # stop 13 is alone in its component, so it never appears
+    sampler = ODSampler([10, 11, 12, 13, 14], components=[0, 1, 0, 2, 1])
+    origins, destinations = sampler.sample(np.random.default_rng(0), 1000)
+
+    component = {10: 0, 11: 1, 12: 0, 13: 2, 14: 1}
+    assert (origins != destinations).all()
+    assert all(component[o] == component[d] for o, d in zip(origins.tolist(), destinations.tolist()))
+    assert set(origins.tolist()) == {10, 11, 12, 14}
+
+def test_od_matrix_drops_demand_between_components():
+    registry = StopRegistry()
+    stops = ["A", "B", "C"]
+    for stop in stops:
+        registry.register(stop)
+
+    sampler = ODSampler.from_mapping(registry, stops, {"A": {"B": 1, "C": 5}}, components=[0, 0, 1])
+    origins, destinations = sampler.sample(np.random.default_rng(0), 100)
+    assert set(zip(origins.tolist(), destinations.tolist())) == {(0, 1)}
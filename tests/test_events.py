@@ -0,0 +1,55 @@
+import io
+import pytest
+from src.transport_analytics.events import (
+    EventLog, EventType, EventFormatter, Level, RingBufferSink, ConsoleSink, BinaryFileSink, read_binary_log
+)
+
+@pytest.fixture
+def network_overrides():
+    return {"seed": 2}
+
+def test_log_without_sinks_is_disabled():
+    log = EventLog(Level.DEBUG)
+    assert not any(log.enabled)
+
+    sink = log.add_sink(RingBufferSink())
+    assert all(log.enabled)
+    log.set_level(Level.INFO)
+    assert not log.enabled[EventType.BOARD]
+    assert log.enabled[EventType.ARRIVE]
+
+    log.remove_sink(sink)
+    assert not any(log.enabled)
+
+def test_ring_buffer_collects_raw_events(make_network):
+    tn = make_network()
+    buffer = tn.events.add_sink(RingBufferSink())
+    tn.run_batch(until=120)
+
+    events = buffer.drain()
+    assert events and buffer.drain() == []
+    types = {event_type for _, event_type, _ in events}
+    assert {EventType.SPAWN, EventType.BOARD, EventType.ALIGHT, EventType.ARRIVE} <= types
+    for _, _, fields in events:
+        assert all(isinstance(field, int) for field in fields)
+
+def test_console_sink_formats_messages(make_network):
+    tn = make_network(event_log_level="info")
+    stream = io.StringIO()
+    tn.events.add_sink(ConsoleSink(EventFormatter(tn), stream))
+    tn.run_batch(until=30)
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0].startswith("Line1_00:05 arrived at B: exiting 0, boarding")
+    assert all("arrived at" in line for line in lines)
+
+def test_binary_file_sink_round_trip(tmp_path, make_network):
+    path = tmp_path / "events.bin"
+    tn = make_network(event_log_file=str(path))
+    tn.config.simulation_duration = 120
+    buffer = tn.events.add_sink(RingBufferSink())
+    # reaching the horizon closes the file, no explicit close needed
+    tn.run_batch()
+    assert tn.events.sinks[0].file.closed
+
+    assert list(read_binary_log(path)) == [(t, EventType(e), tuple(f)) for t, e, f in buffer.drain()]
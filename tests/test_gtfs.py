@@ -0,0 +1,143 @@
+import os
+import zipfile
+import pytest
+from src.transport_analytics.config import SimulationConfig
+from src.transport_analytics.gtfs import GTFSFeed, ParsedNetwork, load_gtfs
+from src.transport_analytics.models import TransportNet
+
+FEED = {
+    "stops.txt": (
+        "stop_id,stop_name,stop_lat,stop_lon\n"
+        "S1,First,52.00,21.00\n"
+        "S2,Second,52.01,21.00\n"
+        "S3,Third,52.02,21.01\n"
+        "P1,Station,,\n"
+    ),
+    "routes.txt": "route_id,route_short_name,route_long_name,route_type\nR1,10,Main,3\n",
+    "trips.txt": "route_id,service_id,trip_id,direction_id\nR1,WK,T1,0\nR1,WK,T2,0\nR1,WK,T3,1\nR1,WK,T4,0\n",
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,08:00:00,08:00:00,S1,1\n"
+        "T1,08:06:00,08:07:00,S2,2\n"
+        "T1,08:12:00,08:12:00,S3,3\n"
+        "T2,25:30:00,25:30:00,S1,1\n"
+        "T2,25:34:00,25:35:00,S2,2\n"
+        "T2,25:40:00,25:40:00,S3,3\n"
+        "T3,09:05:00,09:05:00,S3,2\n"
+        "T3,09:00:00,09:00:00,S2,1\n"
+        "T4,08:00:30,08:00:30,S1,1\n"
+        "T4,08:06:30,08:07:30,S2,2\n"
+        "T4,08:12:30,08:12:30,S3,3\n"
+    ),
+}
+
+@pytest.fixture
+def feed_dir(tmp_path):
+    path = tmp_path / "feed"
+    path.mkdir()
+    for name, content in FEED.items():
+        (path / name).write_text(content)
+    return str(path)
+
+def test_feed_becomes_topology(feed_dir):
+    topology = load_gtfs(feed_dir, use_cache=False)
+
+    assert set(topology["stop_locations"]) == {"S1", "S2", "S3"}
+    assert sorted(topology["connections"]) == [("S1", "S2", 5, False), ("S2", "S3", 5, False)]
+
+    lines = {line["name"]: line for line in topology["bus_lines"]}
+    assert lines["10"]["stops"] == ["S1", "S2", "S3"]
+    # trips leaving in the same minute stay separate departures
+    assert lines["10"]["schedule"] == ["08:00", "08:00", "25:30"]
+    assert lines["10"]["one_way"] and "round_trips" not in lines["10"]
+    # the opposite direction has its own stop pattern, sorted by stop_sequence
+    assert lines["10_2"]["stops"] == ["S2", "S3"]
+    assert lines["10_2"]["schedule"] == ["09:00"]
+
+def test_stops_are_projected_onto_the_canvas(feed_dir):
+    locations = load_gtfs(feed_dir, use_cache=False, canvas=(200, 200), margin=0)["stop_locations"]
+    # north is up, so the northernmost stop has the smallest y
+    assert locations["S3"][1] == pytest.approx(0)
+    assert locations["S1"] == pytest.approx((0, 200))
+
+def test_parsed_network_is_cached_by_feed_hash(feed_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = load_gtfs(feed_dir, cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [f"{GTFSFeed(feed_dir).hash()}.npz"]
+
+    def fail(feed):
+        raise AssertionError("feed parsed again despite a warm cache")
+    monkeypatch.setattr(ParsedNetwork, "from_feed", classmethod(lambda cls, feed: fail(feed)))
+    assert load_gtfs(feed_dir, cache_dir=cache_dir) == first
+
+def test_service_date_keeps_that_days_trips(tmp_path):
+    path = tmp_path / "calendar"
+    path.mkdir()
+    files = dict(FEED)
+    files["trips.txt"] = "route_id,service_id,trip_id\nR1,WK,T1\nR1,WK,T2\nR1,WK,T3\nR1,SA,T4\n"
+    files["calendar.txt"] = (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "WK,1,1,1,1,1,0,0,20260101,20261231\n"
+        "SA,0,0,0,0,0,1,0,20260101,20261231\n"
+    )
+    # a Tuesday holiday runs the Saturday service
+    files["calendar_dates.txt"] = "service_id,date,exception_type\nWK,20261020,2\nSA,20261020,1\n"
+    for name, content in files.items():
+        (path / name).write_text(content)
+    cache_dir = str(tmp_path / "cache")
+
+    def schedules(date):
+        topology = load_gtfs(str(path), cache_dir=cache_dir, service_date=date)
+        return {line["name"]: line["schedule"] for line in topology["bus_lines"]}
+
+    assert schedules("20261019") == {"10": ["08:00", "25:30"], "10_2": ["09:00"]}
+    assert schedules("20261024") == {"10": ["08:00"]}
+    assert schedules("20261020") == schedules("20261024")
+    # every service filter has its own cache entry next to the unfiltered one
+    load_gtfs(str(path), cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 3
+    with pytest.raises(ValueError):
+        load_gtfs(str(path), use_cache=False, service_date="20270101")
+
+def test_zipped_feed_loads(feed_dir, tmp_path):
+    archive = str(tmp_path / "feed.zip")
+    with zipfile.ZipFile(archive, "w") as z:
+        for name in FEED:
+            z.write(os.path.join(feed_dir, name), name)
+    assert load_gtfs(archive, use_cache=False) == load_gtfs(feed_dir, use_cache=False)
+
+def test_gtfs_network_runs(feed_dir):
+    config = SimulationConfig(**load_gtfs(feed_dir, use_cache=False))
+    config.seed = 1
+    tn = TransportNet(config)
+    tn.setup_transport_network()
+    tn.run_batch(until=600)
+
+    assert sorted(v["id"] for v in tn.retired_vehicles) == ["10_08:00", "10_08:00_2", "10_2_09:00"]
+    assert all(v["round_trips"] == 0.5 for v in tn.retired_vehicles)
+
+def test_disconnected_feed_runs(tmp_path):
+    # two routes with no stop in common, like a ferry next to a town network
+    path = tmp_path / "islands"
+    path.mkdir()
+    (path / "stops.txt").write_text(
+        "stop_id,stop_name,stop_lat,stop_lon\n"
+        + "".join(f"S{i},Stop {i},52.0{i},21.00\n" for i in range(1, 7)))
+    (path / "routes.txt").write_text("route_id,route_short_name,route_long_name,route_type\nR1,1,,3\nR2,2,,4\n")
+    (path / "trips.txt").write_text("route_id,service_id,trip_id\nR1,WK,T1\nR2,WK,T2\n")
+    (path / "stop_times.txt").write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,01:00:00,01:00:00,S1,1\nT1,01:05:00,01:05:00,S2,2\nT1,01:10:00,01:10:00,S3,3\n"
+        "T2,02:00:00,02:00:00,S4,1\nT2,02:05:00,02:05:00,S5,2\nT2,02:10:00,02:10:00,S6,3\n")
+    config = SimulationConfig(**load_gtfs(str(path), use_cache=False))
+    config.seed = 1
+    tn = TransportNet(config)
+    tn.setup_transport_network()
+    tn.run_batch(until=300)
+
+    islands = ({"S1", "S2", "S3"}, {"S4", "S5", "S6"})
+    rows = range(tn.passengers.size)
+    assert len(rows) > 0
+    for row in rows:
+        origin, destination = (tn.stops.names[tn.passengers.column(name)[row]] for name in ("origin", "destination"))
+        assert any(origin in island and destination in island for island in islands)
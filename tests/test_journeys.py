@@ -0,0 +1,63 @@
+import pytest
+from src.transport_analytics.events import EventType, RingBufferSink
+from src.transport_analytics.visualization import RealTimeMetrics
+
+@pytest.fixture
+def network_overrides():
+    # two lines meeting at C, so A -> D needs a transfer
+    return {
+        "seed": 3,
+        "stop_locations": {"A": (0, 0), "B": (10, 0), "C": (20, 0), "D": (20, 10), "E": (30, 30)},
+        "connections": [("A", "B", 5, False), ("B", "C", 5, False), ("C", "D", 4, False), ("D", "E", 4, False)],
+        "bus_lines": [
+            {"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05", "00:20"], "wait_time": 3, "capacity": 30},
+            {"name": "Line2", "stops": ["C", "D"], "schedule": ["00:10"], "wait_time": 2, "capacity": 30},
+        ],
+        "od_matrix": {"A": {"D": 1}},
+    }
+
+def ids(tn, *stops):
+    return tuple(tn.stops.id_of(stop) for stop in stops)
+
+def test_itinerary_lists_transfer_stops(make_network):
+    tn = make_network()
+    a, b, c, d = ids(tn, "A", "B", "C", "D")
+
+    assert tn.journeys.plan(a, d, 60) == (c, d)
+    assert tn.journeys.plan(a, c, 60) == (c,)
+    assert tn.journeys.plan(d, b, 60) == (c, b)
+
+def test_itineraries_are_cached_per_time_bin(make_network):
+    tn = make_network()
+    a, d = ids(tn, "A", "D")
+
+    first = tn.journeys.plan(a, d, 61)
+    assert tn.journeys.plan(a, d, 74) is first
+    assert len(tn.journeys.cache) == 1
+    tn.journeys.plan(a, d, 75)
+    assert len(tn.journeys.cache) == 2
+
+def test_unreachable_destination_falls_back_to_direct_trip(make_network):
+    tn = make_network()
+    a, e = ids(tn, "A", "E")
+    assert tn.journeys.plan(a, e, 60) == (e,)
+
+def test_passengers_transfer_and_arrive(make_network):
+    tn = make_network()
+    buffer = tn.events.add_sink(RingBufferSink())
+    # verify mode checks the aggregates follow riders back into the waiting group at the transfer
+    metrics = RealTimeMetrics(tn, verify=True)
+    tn.run_batch(until=300, sample_interval=1, samplers=[metrics.update_metrics])
+
+    done = tn.completed_passengers
+    assert done
+    assert all(p.destination == "D" for p in done)
+    transfers = [fields for _, event_type, fields in buffer.drain() if event_type == EventType.TRANSFER]
+    assert len(transfers) >= len(done)
+    assert {stop for _, stop, _ in transfers} == {tn.stops.id_of("C")}
+
+def test_without_planner_transfers_never_happen(make_network):
+    tn = make_network(journey_planner=False)
+    tn.run_batch(until=300)
+    assert tn.journeys is None
+    assert not tn.completed_passengers
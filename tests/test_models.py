@@ -1,6 +1,7 @@
 import pytest
 import networkx as nx
 from src.transport_analytics.models import Passenger, TransportNet, Vehicle
+from src.transport_analytics.config import SimulationConfig
 
 @pytest.fixture
 def transport_net():
@@ -97,7 +98,6 @@ def test_vehicle_has_delay(transport_net):
     assert delay == 15
 
 def test_vehicle_record_position(transport_net):
-    transport_net.bus_tracks = {"V1": []}
     transport_net.stop_locations = {"A": (0, 0), "B": (10, 10)}
 
     vehicle = Vehicle(
@@ -113,7 +113,7 @@ def test_vehicle_record_position(transport_net):
 
     vehicle.record_position(
         env=transport_net.env,
-        stop_info="A -> B",
+        stop="A",
         lat=5,
         lon=5,
         next_stop="B",
@@ -150,4 +150,122 @@ def test_vehicle_get_coordinates(transport_net):
     assert x == 5
     assert y == 5
 
+def test_vehicle_position_at_interpolates_current_link(transport_net):
+    transport_net.stop_locations = {"A": (0, 0), "B": (10, 10)}
+    transport_net.graph["A"]["B"]["busy"] = False
+    vehicle = Vehicle(id="V1", stops=["A", "B"], transport_net=transport_net)
+    transport_net.env.process(vehicle.vehicle_process(transport_net.env))
+
+    transport_net.env.run(until=4)
+    assert vehicle.in_transit
+    assert vehicle.position_at(4) == (4, 4)
+    assert vehicle.position_at(7.5) == (7.5, 7.5)
+
+    # progress is clamped to the end of the link
+    assert vehicle.position_at(12) == (10, 10)
+
 ################################################################################
+
+@pytest.fixture
+def small_config():
+    return SimulationConfig(
+        stop_locations={"A": (0, 0), "B": (10, 0), "C": (20, 0)},
+        connections=[("A", "B", 5, False), ("B", "C", 5, True)],
+        bus_lines=[{"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05"], "wait_time": 3, "capacity": 30}]
+    )
+
+def test_run_batch_is_headless(small_config, capsys):
+    tn = TransportNet(small_config)
+    tn.setup_transport_network()
+
+    samples = []
+    tn.run_batch(until=120, sample_interval=10, samplers=[lambda: samples.append(tn.env.now)])
+
+    assert tn.env.now == 120
+    assert samples == list(range(10, 120, 10))
+    assert len(tn.vehicles) == 1
+    assert capsys.readouterr().out == ""
+
+def test_seeded_runs_are_reproducible(small_config):
+    small_config.seed = 123
+
+    outcomes = []
+    for _ in range(2):
+        tn = TransportNet(small_config)
+        tn.setup_transport_network()
+        tn.run_batch(until=300)
+        outcomes.append([(p.id, p.origin, p.destination, p.spawn_time) for p in tn.completed_passengers])
+
+    assert outcomes[0] and outcomes[0] == outcomes[1]
+
+def test_passenger_is_a_store_handle(transport_net):
+    passenger = Passenger(id=7, origin="A", destination="B", spawn_time=3, transport_net=transport_net)
+
+    assert not hasattr(passenger, "__dict__")
+    assert transport_net.passengers.column("id").tolist() == [7]
+    assert passenger.origin == "A" and passenger.destination == "B"
+    assert passenger.spawn_time == 3
+
+    transport_net.passengers.board(passenger.row, 5)
+    assert passenger.status == "traveling"
+    transport_net.passengers.alight(passenger.row, 15)
+    assert passenger.status == "arrived"
+    assert [p.id for p in transport_net.completed_passengers] == [7]
+
+def test_routes_are_shared_per_od_pair(transport_net):
+    first = Passenger(id=1, origin="A", destination="C", spawn_time=0, transport_net=transport_net)
+    second = Passenger(id=2, origin="A", destination="C", spawn_time=1, transport_net=transport_net)
+
+    assert first.route is second.route
+
+def test_vehicle_retires_after_round_trips(small_config):
+    small_config.bus_lines[0]["round_trips"] = 1
+    tn = TransportNet(small_config)
+    tn.setup_transport_network()
+    tn.run_batch(until=300)
+
+    assert tn.vehicles == []
+    assert len(tn.retired_vehicles) == 1
+    archived = tn.retired_vehicles[0]
+    assert archived["id"] == "Line1_00:05"
+    assert archived["round_trips"] == 1
+    # two links each way at 5 minutes free-flow
+    assert archived["distance_traveled"] == 20
+
+def test_vehicle_retires_after_service_end(small_config):
+    small_config.bus_lines[0]["service_end"] = "01:00"
+    tn = TransportNet(small_config)
+    tn.setup_transport_network()
+    tn.run_batch(until=300)
+
+    assert tn.vehicles == []
+    assert 60 <= tn.retired_vehicles[0]["end_time"] < 90
+
+def test_in_transit_positions_are_sampled_per_interval(small_config):
+    small_config.trajectory_sample_interval = 2
+    tn = TransportNet(small_config)
+    tn.setup_transport_network()
+    tn.run_batch(until=60)
+
+    records = tn.trajectories.view()
+    moving = records[records["in_transit"]]
+    assert len(moving) > 0
+    assert (moving["time"] % 2 == 0).all()
+    assert ((moving["progress"] >= 0) & (moving["progress"] <= 1)).all()
+
+def test_vehicles_share_their_lines_route_index(small_config):
+    small_config.bus_lines[0]["schedule"] = ["00:05", "00:20", "00:35"]
+    tn = TransportNet(small_config)
+    tn.setup_transport_network()
+    tn.run_batch(until=60)
+
+    line = tn.bus_lines[0]
+    assert len(tn.vehicles) == 3
+    assert all(vehicle.route_index is line.route_index for vehicle in tn.vehicles)
+    # keyed by stop id, like the queues riders board from
+    assert line.route_index.ahead(0, 1) == {tn.stops.id_of("B"), tn.stops.id_of("C")}
+
+    restored = TransportNet(small_config)
+    restored.setup_transport_network()
+    restored.restore(tn.checkpoint())
+    assert all(vehicle.route_index is restored.bus_lines[0].route_index for vehicle in restored.vehicles)
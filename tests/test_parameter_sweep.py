@@ -0,0 +1,38 @@
+import pytest
+from scripts import run_parameter_test as sweep
+
+TOPOLOGY = {
+    "stop_locations": {"A": (0, 0), "B": (10, 0), "C": (20, 0)},
+    "connections": [("A", "B", 10, False), ("B", "C", 10, True)],
+    "bus_lines": [{"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05", "00:35"], "wait_time": 3, "capacity": 30}],
+}
+SCENARIOS = [
+    {"passenger_generation_interval": 8, "satisfaction_decay_waiting": 0.25},
+    {"passenger_generation_interval": 12, "satisfaction_decay_waiting": 0.5},
+    {"passenger_generation_interval": 12, "satisfaction_decay_waiting": 0.25},
+]
+
+@pytest.fixture(autouse=True)
+def topology():
+    sweep.init_worker(TOPOLOGY)
+    yield
+    sweep.init_worker(None)
+
+def run(workers, chunksize):
+    return sweep.execute_replicated_search(
+        SCENARIOS, max_workers=workers, chunksize=chunksize, base_seed=3,
+        min_replicas=3, max_replicas=3, duration=180)
+
+def test_results_do_not_depend_on_workers_or_chunking():
+    inline = run(1, 1)
+    assert run(2, 2) == inline
+    assert [result["scenario_index"] for result in inline] == [0, 1, 2]
+    assert all(result["replicas"] == 3 for result in inline)
+
+def test_replicas_are_seeded_per_replica():
+    results = run(1, 1)
+    samples = results[0]["samples"]["avg_wait_time"]
+    # replicas draw independent streams, scenarios share them
+    assert len(set(samples)) == len(samples)
+    assert sweep.run_test_scenario(SCENARIOS[0], "again", seed=3, replica=1, save_report=False, duration=180)[
+        "avg_wait_time"] == samples[1]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from src.transport_analytics.passengers import PassengerStore
+from src.transport_analytics.stops import StopRegistry
+
+@pytest.fixture
+def store():
+    return PassengerStore(StopRegistry(), capacity=2)
+
+def test_store_grows_past_initial_capacity(store):
+    for i in range(5):
+        assert store.add(i, 0, 1, float(i)) == i
+
+    assert len(store) == 5
+    assert store.capacity >= 5
+    assert store.column("spawn_time").tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(store.column("board_time")).all()
+
+def test_add_batch(store):
+    rows = store.add_batch(range(10, 13), np.array([0, 1, 2]), np.array([2, 0, 1]), 7.0)
+
+    assert list(rows) == [0, 1, 2]
+    assert store.column("id").tolist() == [10, 11, 12]
+    assert store.column("destination").tolist() == [2, 0, 1]
+    assert (store.column("satisfaction") == 100).all()
+
+def test_alight_records_satisfaction(store):
+    row = store.add(0, 0, 1, 0.0)
+    store.board(row, 10.0)
+    store.alight(row, 30.0)
+
+    # 10 minutes waiting at 0.5 and 20 minutes travelling at 0.2
+    assert store.satisfaction[row] == pytest.approx(91.0)
+    assert store.completed_rows().tolist() == [row]
+
+def test_transfer_keeps_first_board_time(store):
+    row = store.add(0, 0, 1, 0.0)
+    store.board(row, 10.0, vehicle=0)
+    store.board(row, 25.0, vehicle=3)
+    store.alight(row, 30.0)
+
+    assert store.board_time[row] == 10.0
+    assert store.vehicle[row] == 3
+    assert store.satisfaction[row] == pytest.approx(91.0)
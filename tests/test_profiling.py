@@ -0,0 +1,70 @@
+import pytest
+import simpy
+from src.transport_analytics.profiling import Profiler
+from src.transport_analytics.visualization import RealTimeMetrics
+
+@pytest.fixture
+def network_overrides():
+    return {
+        "seed": 4,
+        "connections": [("A", "B", 10, False), ("B", "C", 10, True)],
+        "bus_lines": [{"name": "Line1", "stops": ["A", "B", "C"], "schedule": ["00:05", "06:00"], "wait_time": 3, "capacity": 30}],
+    }
+
+def test_profiler_is_off_by_default(make_network):
+    assert make_network().profiler is None
+
+def test_profiling_does_not_change_the_run(make_network):
+    plain = make_network().run_batch(until=600)
+    profiled = make_network(profiling=True).run_batch(until=600)
+    assert plain.passengers.completed_rows().tolist() == profiled.passengers.completed_rows().tolist()
+    assert plain.env.now == profiled.env.now
+
+def test_subsystems_are_counted(make_network):
+    tn = make_network(profiling=True)
+    metrics = RealTimeMetrics(tn)
+    tn.run_batch(until=600, sample_interval=10, samplers=[metrics.update_metrics])
+    stats = tn.profiler.stats
+
+    assert stats["vehicles"].processes == 4  # two departures, each a scheduling and a driving process
+    assert stats["metrics"].events == 60  # the first step plus one per sample before the horizon
+    assert stats["trajectories"].events == 600
+    assert stats["passenger_generator"].events > 0
+    assert all(s.wall >= 0 for s in stats.values())
+
+    table = tn.profiler.table()
+    for name in ("vehicles", "metrics", "trajectories", "passenger_generator", Profiler.SCHEDULER):
+        assert name in table
+
+def test_folded_stacks_export(tmp_path, make_network):
+    tn = make_network(profiling=True).run_batch(until=120)
+    path = tn.profiler.export_folded(str(tmp_path))
+
+    lines = open(path).read().splitlines()
+    stacks = {line.rsplit(" ", 1)[0] for line in lines}
+    assert "simulation;vehicles;vehicle_process;Line1" in stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+def test_wrapped_process_receives_interrupts_and_returns():
+    env = simpy.Environment()
+    profiler = Profiler()
+    seen = []
+
+    def sleeper():
+        try:
+            yield env.timeout(10)
+        except simpy.Interrupt as interrupt:
+            seen.append(interrupt.cause)
+        return "done"
+
+    process = env.process(profiler.wrap(sleeper(), "test"))
+
+    def interrupter():
+        yield env.timeout(1)
+        process.interrupt("wake")
+
+    env.process(interrupter())
+    profiler.run(env, 20)
+    assert seen == ["wake"]
+    assert process.value == "done"
+    assert profiler.stats["test"].events == 2
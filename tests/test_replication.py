@@ -0,0 +1,46 @@
+import math
+import numpy as np
+import pytest
+from src.transport_analytics.replication import KPIStats, ReplicationSet, t_quantile
+
+@pytest.mark.parametrize("df, expected", [(1, 12.706), (2, 4.303), (4, 2.776), (9, 2.262), (29, 2.045)])
+def test_t_quantile_matches_tables(df, expected):
+    assert t_quantile(0.975, df) == pytest.approx(expected, abs=2e-3)
+
+def test_kpi_stats_match_numpy():
+    values = np.random.default_rng(0).normal(50, 4, size=20)
+    stats = KPIStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var(ddof=1))
+    low, high = stats.interval(0.95)
+    assert (high - low) / 2 == pytest.approx(t_quantile(0.975, 19) * values.std(ddof=1) / math.sqrt(20))
+
+def test_single_replica_has_no_interval():
+    replicas = ReplicationSet(["kpi"], min_replicas=1)
+    replicas.add({"kpi": 3.0})
+    assert replicas.half_width() == math.inf
+    assert replicas.summary()["kpi_ci"] is None
+
+def test_stops_once_interval_is_narrow():
+    replicas = ReplicationSet(["kpi"], min_replicas=3, max_replicas=30, max_half_width=1.0)
+    assert replicas.additional_replicas() == 3
+    for value in (10.0, 10.2, 9.9):
+        replicas.add({"kpi": value})
+    assert replicas.converged()
+    assert replicas.additional_replicas() == 0
+
+def test_noisy_scenario_asks_for_more_within_budget():
+    replicas = ReplicationSet(["kpi", "other"], min_replicas=3, max_replicas=10, max_half_width=1.0)
+    for replica, value in enumerate((0.0, 10.0, 20.0)):
+        replicas.add({"kpi": value, "other": None}, replica)
+    assert not replicas.converged()
+    assert replicas.additional_replicas() == 7  # the variance estimate wants far more, capped by the budget
+
+    summary = replicas.summary()
+    assert summary["replicas"] == 3
+    assert summary["kpi"] == pytest.approx(10.0)
+    assert summary["other"] == 0.0
+    assert summary["samples"]["kpi"] == [0.0, 10.0, 20.0]
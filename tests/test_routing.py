@@ -0,0 +1,78 @@
+import pytest
+import networkx as nx
+from src.transport_analytics.models import TransportNet
+from src.transport_analytics.routing import RoutingTable
+
+@pytest.fixture
+def graph():
+    graph = nx.DiGraph()
+    for a, b, t in [("A", "B", 5), ("B", "C", 5), ("A", "C", 20), ("C", "D", 5)]:
+        graph.add_edge(a, b, travel_time=t)
+        graph.add_edge(b, a, travel_time=t)
+    return graph
+
+def test_routing_table_matches_dijkstra(graph):
+    table = RoutingTable(graph).build()
+
+    for origin in graph.nodes():
+        for destination in graph.nodes():
+            expected = nx.dijkstra_path_length(graph, origin, destination, weight="travel_time")
+            route = table.route(origin, destination)
+            assert route[0] == origin and route[-1] == destination
+            assert nx.path_weight(graph, route, weight="travel_time") == expected
+            assert table.travel_time(origin, destination) == expected
+
+def test_routing_table_next_hop(graph):
+    table = RoutingTable(graph).build()
+
+    assert table.route("A", "D") == ["A", "B", "C", "D"]
+    assert table.next_hop[table.index["A"], table.index["D"]] == table.index["B"]
+
+def test_update_edge_rebuilds_only_affected_rows(graph):
+    table = RoutingTable(graph).build()
+    rebuilds = table.rebuilds
+
+    graph["C"]["D"]["travel_time"] = 50
+    affected = table.update_edge("C", "D", 5, 50)
+
+    # every path into D from A, B and C used C -> D, D itself does not
+    assert affected == {"A", "B", "C"}
+    assert table.rebuilds == rebuilds + 3
+    assert table.travel_time("A", "D") == 60
+
+def test_update_travel_time_invalidates_cached_routes():
+    tn = TransportNet(config=None)
+    tn.add_connection("A", "B", 5)
+    tn.add_connection("B", "C", 5)
+    tn.add_connection("A", "C", 20)
+
+    assert tn.get_route("A", "C") == ["A", "B", "C"]
+
+    tn.update_travel_time("A", "C", 2)
+    assert tn.get_route("A", "C") == ["A", "C"]
+
+def test_stops_registered_after_the_build_have_no_route(graph):
+    table = RoutingTable(graph).build()
+    table.registry.register("Z")
+
+    assert "Z" not in table.index
+    with pytest.raises(nx.NetworkXNoPath):
+        table.route("A", "Z")
+    with pytest.raises(nx.NetworkXNoPath):
+        table.travel_time("Z", "A")
+    assert table.route("A", "D") == ["A", "B", "C", "D"]
+
+def test_rows_are_built_on_first_use(graph):
+    table = RoutingTable(graph)
+    assert table.rebuilds == 0
+
+    assert table.route("A", "D") == ["A", "B", "C", "D"]
+    assert table.travel_time("A", "D") == 15
+    # only the origin's row is needed
+    assert table.built.sum() == 1
+
+    graph["C"]["D"]["travel_time"] = 50
+    # rows built later already see the new weight
+    assert table.update_edge("C", "D", 5, 50) == {"A"}
+    assert table.travel_time("B", "D") == 55
+    assert table.travel_time("A", "D") == 60
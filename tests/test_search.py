@@ -0,0 +1,50 @@
+import numpy as np
+from src.transport_analytics.search import (
+    halving_horizons, latin_hypercube, peak_windows, space_from_grid, successive_halving
+)
+
+def test_space_from_grid():
+    space = space_from_grid({"interval": [8, 12, 10], "factor": [1.3, 1.6]})
+    assert space == {"interval": (8, 12, True), "factor": (1.3, 1.6, False)}
+
+def test_latin_hypercube_covers_every_slice():
+    space = {"interval": (0, 10, True), "factor": (0.0, 1000.0, False)}
+    samples = latin_hypercube(space, 10, np.random.default_rng(0))
+
+    assert len(samples) == 10
+    factors = sorted(s["factor"] for s in samples)
+    # one sample per tenth of the range
+    assert [int(f // 100) for f in factors] == list(range(10))
+    assert all(isinstance(s["interval"], int) and 0 <= s["interval"] <= 10 for s in samples)
+
+def test_halving_horizons_end_at_final():
+    assert halving_horizons(1440, eta=3, rungs=3) == [160, 480, 1440]
+    assert halving_horizons(360, eta=2, rungs=1) == [360]
+
+def test_successive_halving_prunes_and_ranks():
+    calls = []
+
+    def evaluate(candidates, horizon):
+        calls.append((horizon, list(candidates)))
+        return [{"avg_total_delay": abs(c - 5) + 1000 / horizon} for c in candidates]
+
+    rungs = successive_halving(range(9), evaluate, [10, 30, 90], eta=3, target="avg_total_delay")
+
+    assert [len(c) for _, c in calls] == [9, 3, 1]
+    assert [h for h, _ in rungs] == [10, 30, 90]
+    # delay is minimised, so the candidate closest to 5 wins
+    assert rungs[-1][1][0][0] == 5
+    assert calls[1][1] == [5, 4, 6]
+
+def test_short_rungs_cover_the_peaks():
+    peaks = (7 * 60, 9 * 60, 16 * 60, 18 * 60)
+    windows = peak_windows([160, 480, 1440], 1440, peaks)
+    assert windows[0] == (420, 580)
+    assert windows[-1] == (0, 1440)
+    for start, end in windows:
+        assert end - start in (160, 480, 1440)
+        assert start < 9 * 60 and end > 7 * 60
+    # a window longer than the gap between the peaks spans both
+    assert peak_windows([720], 1440, peaks) == [(420, 1140)]
+    # windows stay inside the horizon
+    assert peak_windows([200], 600, (500, 700)) == [(400, 600)]
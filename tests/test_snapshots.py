@@ -0,0 +1,54 @@
+import io
+import pytest
+from src.transport_analytics.snapshots import ConsoleStatusSink
+
+@pytest.fixture
+def network_overrides():
+    return {"seed": 4}
+
+def run_with_report(tn, until):
+    tn.start_processes(report=True)
+    tn.env.run(until=until)
+
+def test_silent_report_records_snapshots_at_interval(capsys, make_network):
+    tn = make_network(snapshot_interval=5)
+    run_with_report(tn, 60)
+
+    assert capsys.readouterr().out == ""
+    assert list(tn.stop_snapshots) == list(range(0, 60, 5))
+    assert set(tn.stop_snapshots[55]) == set(tn.passenger_queues)
+
+def test_snapshot_destinations_match_queue(make_network):
+    tn = make_network()
+    run_with_report(tn, 30)
+    snapshot = tn.snapshots.take()
+    for stop, queue in tn.passenger_queues.items():
+        expected = {}
+        for p in queue:
+            expected[p.destination] = expected.get(p.destination, 0) + 1
+        assert snapshot[stop]["destinations"] == dict(sorted(expected.items()))
+
+def test_delta_snapshots_replay_to_full_state(make_network):
+    full = make_network()
+    delta = make_network(snapshot_delta=True, snapshot_retention=10)
+    run_with_report(full, 120)
+    run_with_report(delta, 120)
+
+    assert len(delta.stop_snapshots) == 10
+    assert sum(len(s) for s in delta.stop_snapshots.values()) < 10 * len(delta.passenger_queues)
+    for time in delta.stop_snapshots:
+        assert delta.snapshots.state_at(time) == full.stop_snapshots[time]
+
+def test_retention_bounds_snapshots(make_network):
+    tn = make_network(snapshot_retention=3)
+    run_with_report(tn, 20)
+    assert list(tn.stop_snapshots) == [17, 18, 19]
+
+def test_console_sink_prints_report(make_network):
+    tn = make_network()
+    out = io.StringIO()
+    tn.snapshots.sink = ConsoleStatusSink(tn, stream=out)
+    tn.snapshots.take()
+    text = out.getvalue()
+    assert "=== Status Report at 00:00 ===" in text
+    assert "Bus stop A: No passengers" in text
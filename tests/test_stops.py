@@ -0,0 +1,63 @@
+import pytest
+from types import SimpleNamespace
+from src.transport_analytics.stops import StopRegistry, PassengerQueue, RouteIndex
+
+def make_passenger(id, destination_id):
+    return SimpleNamespace(id=id, destination_id=destination_id, target_id=destination_id)
+
+def test_stop_registry_assigns_dense_ids():
+    registry = StopRegistry()
+
+    assert registry.register("A") == 0
+    assert registry.register("B") == 1
+    assert registry.register("A") == 0
+    assert len(registry) == 2
+    assert registry.id_of("B") == 1
+    assert registry.name_of(0) == "A"
+    assert "C" not in registry
+
+@pytest.fixture
+def queue():
+    queue = PassengerQueue()
+    for i, dest in enumerate([1, 2, 1, 3, 2]):
+        queue.append(make_passenger(f"P{i}", dest))
+    return queue
+
+def test_passenger_queue_iterates_in_arrival_order(queue):
+    assert len(queue) == 5
+    assert [p.id for p in queue] == ["P0", "P1", "P2", "P3", "P4"]
+    assert queue.counts() == {1: 2, 2: 2, 3: 1}
+
+def test_pop_for_drains_eligible_buckets(queue):
+    boarding = queue.pop_for([1, 3], limit=10)
+
+    assert sorted(p.id for p in boarding) == ["P0", "P2", "P3"]
+    assert len(queue) == 2
+    assert queue.counts() == {2: 2}
+
+def test_pop_for_respects_limit_and_arrival_order(queue):
+    boarding = queue.pop_for([2, 3], limit=2)
+
+    assert [p.id for p in boarding] == ["P1", "P3"]
+    assert [p.id for p in queue] == ["P0", "P2", "P4"]
+
+def test_pop_for_without_eligible_passengers(queue):
+    assert queue.pop_for([7], limit=10) == []
+    assert queue.pop_for([1], limit=0) == []
+    assert len(queue) == 5
+
+def test_route_index_ahead_sets():
+    index = RouteIndex(["A", "B", "C", "D"])
+
+    assert index.position("C") == 2
+    assert index.ahead(1, 1) == {"C", "D"}
+    assert index.ahead(1, -1) == {"A"}
+    assert index.ahead(3, 1) == frozenset()
+    assert index.is_ahead("D", 0, 1)
+    assert not index.is_ahead("A", 2, 1)
+
+def test_pop_for_with_ahead_set(queue):
+    boarding = queue.pop_for(frozenset({1, 2, 8, 9}), limit=3)
+
+    assert [p.id for p in boarding] == ["P0", "P1", "P2"]
+    assert queue.counts() == {2: 1, 3: 1}
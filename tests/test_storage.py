@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from src.transport_analytics.storage import RunStore, RunReader
+
+@pytest.fixture
+def network_overrides(tmp_path):
+    return {"seed": 11, "report_directory": str(tmp_path)}
+
+def test_persisted_run_matches_in_memory_run(make_network):
+    reference = make_network().run_batch(until=600)
+    tn = make_network(persist_run=True, persist_interval=30).run_batch(until=600)
+
+    reader = RunReader(tn.run_store.path)
+    assert isinstance(reader.trips, np.memmap)
+    assert len(reader.trips) == len(reference.passengers.completed_rows())
+    assert len(reader.positions) == len(reference.trajectories.view())
+    assert reader.vehicle_ids == ["Line1_00:05"]
+
+    # finished trips and flushed positions no longer live in memory
+    assert len(tn.passengers) < len(reference.passengers)
+    assert len(tn.trajectories.view()) == 0
+
+    times, counts = reader.queue_lengths("A")
+    assert times.tolist() == list(range(30, 601, 30))
+
+def test_reader_rebuilds_destination_histograms(make_network):
+    tn = make_network(persist_run=True).run_batch(until=600)
+
+    reader = RunReader(tn.run_store.path)
+    track = reader.vehicle_positions("Line1_00:05")
+    # riders still on board at the end of the run have no finished trip yet
+    stop_records = track[~track["in_transit"] & (track["time"] < 540)]
+    assert len(stop_records)
+    for record in stop_records:
+        assert sum(reader.destinations("Line1_00:05", record["time"]).values()) == record["load"]
+
+def test_empty_tables_open(tmp_path):
+    store = RunStore.create(str(tmp_path), "empty")
+    store.close(stops=[], vehicle_ids=[])
+
+    reader = RunReader(store.path)
+    assert len(reader.positions) == 0 and len(reader.trips) == 0
+
+def test_store_is_closed_when_the_run_ends(make_network):
+    tn = make_network(persist_run=True, simulation_duration=300)
+
+    tn.run_batch(until=120)
+    assert not RunReader(tn.run_store.path).complete
+
+    tn.run_batch()
+    assert tn.run_store.closed
+    reader = RunReader(tn.run_store.path)
+    assert reader.complete
+    assert reader.manifest["sim_time"] == 300
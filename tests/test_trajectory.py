@@ -0,0 +1,47 @@
+import numpy as np
+from src.transport_analytics.stops import StopRegistry
+from src.transport_analytics.trajectory import TrajectoryRecorder
+
+def make_recorder(**kwargs):
+    registry = StopRegistry()
+    for stop in ("A", "B"):
+        registry.register(stop)
+    recorder = TrajectoryRecorder(registry, **kwargs)
+    return recorder, recorder.register("V1", 30)
+
+def test_ring_buffer_keeps_newest_records():
+    recorder, v = make_recorder(retention=3)
+    for t in range(5):
+        recorder.record(t, v, 0, 0, t, 1, stop=0, next_stop=1)
+
+    assert recorder.total == 5
+    assert recorder.view()["time"].tolist() == [2, 3, 4]
+    assert recorder.view()["load"].tolist() == [2, 3, 4]
+
+def test_buffer_grows_without_retention():
+    recorder, v = make_recorder(capacity=2)
+    for t in range(5):
+        recorder.record(t, v, 0, 0, 0, 1, stop=0, next_stop=-1)
+
+    assert len(recorder.view()) == 5
+    assert recorder["V1"][0]["next_stop"] == "Terminal"
+
+def test_sample_interval_thins_in_transit_records():
+    recorder, v = make_recorder(sample_interval=1.0)
+    for step in range(10):
+        recorder.record(step * 0.5, v, 0, 0, 0, 1, stop=0, next_stop=1, in_transit=True, progress=step / 10)
+    recorder.record(5.0, v, 0, 0, 0, 1, stop=1, next_stop=-1)
+
+    records = recorder.view()
+    assert records["time"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert records["in_transit"].tolist() == [True] * 5 + [False]
+
+def test_destination_histograms_are_computed_on_demand(make_network):
+    tn = make_network(seed=3).run_batch(until=600)
+
+    track = tn.bus_tracks.track("Line1_00:05", destinations=True)
+    assert track
+    for entry in track:
+        assert sum(entry["destinations"].values()) == entry["passenger_count"]
+    assert any(entry["destinations"] for entry in track)
+    assert "destinations" not in tn.bus_tracks["Line1_00:05"][0]
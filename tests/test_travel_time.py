@@ -0,0 +1,60 @@
+import io
+import pytest
+from src.transport_analytics.models import Vehicle
+
+@pytest.fixture
+def network_overrides():
+    return {"seed": 1, "connections": [("A", "B", 10, False), ("B", "C", 10, True)]}
+
+def test_config_factors_take_effect(make_network):
+    tn = make_network(rush_hour_traffic_factor=2.0, busy_route_factor=1.5)
+    model = tn.travel_times
+
+    assert model.travel_time("A", "B", 300) == 10
+    assert model.travel_time("A", "B", 7 * 60 + 30) == 20
+    assert model.travel_time("B", "C", 300) == 15
+    assert model.travel_time("C", "B", 17 * 60) == 30
+    # tables wrap around midnight
+    assert model.travel_time("A", "B", 1440 + 7 * 60) == 20
+
+def test_peak_windows_follow_config(make_network):
+    tn = make_network(peak_hours=(600, 660, 1200, 1260), rush_hour_traffic_factor=3.0)
+    assert tn.travel_times.travel_time("A", "B", 7 * 60 + 30) == 10
+    assert tn.travel_times.travel_time("A", "B", 630) == 30
+
+def test_vehicle_delegates_to_model(make_network):
+    tn = make_network(rush_hour_traffic_factor=2.0)
+    vehicle = Vehicle("V1", ["A", "B", "C"], tn)
+    assert vehicle.has_delay("A", "B", 450) == 20
+    assert vehicle.link_rows[1] == [tn.travel_times.edge("A", "B"), tn.travel_times.edge("B", "C")]
+    assert vehicle.link_rows[-1][2] == tn.travel_times.edge("C", "B")
+
+def test_csv_profile_overrides_multipliers(make_network):
+    profile = io.StringIO("from,to,start,end,multiplier\nA,B,12:00,13:00,4\n*,C,00:00,24:00,2\n")
+    tn = make_network(travel_time_profile=profile, travel_time_bin_minutes=30)
+    model = tn.travel_times
+
+    assert model.times.shape == (4, 48)
+    assert model.travel_time("A", "B", 12 * 60 + 10) == 40
+    assert model.travel_time("B", "A", 12 * 60 + 10) == 10
+    assert model.travel_time("B", "C", 300) == 20
+
+def test_update_travel_time_rescales_row(make_network):
+    tn = make_network(rush_hour_traffic_factor=2.0)
+    tn.update_travel_time("A", "B", 6)
+    assert tn.travel_times.travel_time("A", "B", 450) == 12
+    assert tn.travel_times.travel_time("B", "A", 300) == 6
+
+def test_add_connection_appends_rows_like_a_full_build(make_network):
+    profile = io.StringIO("from,to,start,end,multiplier\n*,D,12:00,13:00,4\n")
+    tn = make_network(travel_time_profile=profile, rush_hour_traffic_factor=2.0, busy_route_factor=1.5)
+    model = tn.travel_times
+    rows = model.edge("A", "B"), model.edge("C", "B")
+    tn.add_connection("C", "D", 8, busy=True)
+
+    assert tn.travel_times is model
+    assert (model.edge("A", "B"), model.edge("C", "B")) == rows
+    assert model.times.shape[0] == 6
+    assert model.travel_time("C", "D", 300) == 12
+    assert model.travel_time("D", "C", 450) == 24
+    assert model.travel_time("C", "D", 12 * 60 + 10) == 32